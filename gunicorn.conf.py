@@ -0,0 +1,29 @@
+# Gunicorn configuration, read from the working directory when gunicorn starts.
+# https://docs.gunicorn.org/en/stable/settings.html
+import multiprocessing
+import os
+
+LOCAL_CACHE_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+
+# Cached responses, list validators and API token credentials are invalidated
+# through the cache, which is private to each process unless CACHE_BACKEND names
+# a shared one such as Redis or Memcached. Other workers would keep serving stale
+# data after a write, so more than one is only started with a shared cache.
+shared_cache = os.getenv("CACHE_BACKEND", LOCAL_CACHE_BACKEND) != LOCAL_CACHE_BACKEND
+workers = int(
+    os.getenv(
+        "WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1
+    )
+)
+if workers > 1 and not shared_cache:
+    raise RuntimeError(
+        f"WEB_CONCURRENCY={workers} requires a shared CACHE_BACKEND, such as "
+        "django.core.cache.backends.redis.RedisCache, so that every worker sees "
+        "the invalidations of the others."
+    )
+
+# More than one thread per worker switches from the sync to the threaded worker.
+# Django keeps a persistent connection per thread (see CONN_MAX_AGE), so a container
+# holds up to workers * threads connections to Postgres, or to pgbouncer in front
+# of it, which bounds the connections Postgres itself sees.
+threads = int(os.getenv("GUNICORN_THREADS", 1))
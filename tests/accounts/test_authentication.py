@@ -0,0 +1,135 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+
+from voterguide.accounts.authentication import (
+    CachedTokenAuthentication,
+    _credentials,
+    forget_all,
+    forget_user,
+)
+from voterguide.accounts.models import CustomUser
+from voterguide.api.models import Seat
+from voterguide.api.views import SeatViewSet
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_credentials():
+    forget_all()
+    yield
+    forget_all()
+
+
+@pytest.fixture
+def token():
+    user = CustomUser.objects.create(email="test@example.com", password="unused")
+    return Token.objects.create(user=user)
+
+
+def create_seat(key):
+    request = APIRequestFactory().post(
+        reverse("seat-list"),
+        {"level": "F", "branch": "E", "role": "President"},
+        format="json",
+        HTTP_AUTHORIZATION=f"Token {key}",
+    )
+    return SeatViewSet.as_view({"post": "create"})(request).render()
+
+
+def authenticate(key):
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {key}")
+    with CaptureQueriesContext(connection) as context:
+        user, _ = CachedTokenAuthentication().authenticate(request)
+    return user, len(context.captured_queries)
+
+
+def test_token_authenticates_writes(token):
+    response = create_seat(token.key)
+
+    assert response.status_code == 201
+    assert Seat.objects.get().role == "President"
+
+
+def test_write_requires_valid_token(token):
+    response = create_seat("not-a-token")
+
+    assert response.status_code == 403
+
+
+def test_user_is_cached(token):
+    first, first_queries = authenticate(token.key)
+    second, second_queries = authenticate(token.key)
+
+    assert first == second == token.user
+    assert first_queries == 1
+    assert second_queries == 0
+
+
+def test_cached_user_expires(settings, token):
+    settings.API_TOKEN_CACHE_TIMEOUT = 0
+    authenticate(token.key)
+
+    _, queries = authenticate(token.key)
+
+    assert queries == 1
+
+
+def test_deactivated_user_is_forgotten(django_capture_on_commit_callbacks, token):
+    authenticate(token.key)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        token.user.is_active = False
+        token.user.save()
+
+    assert create_seat(token.key).status_code == 403
+
+
+def test_deleted_token_is_forgotten(django_capture_on_commit_callbacks, token):
+    authenticate(token.key)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        token.delete()
+
+    assert create_seat(token.key).status_code == 403
+
+
+def test_user_forgotten_by_another_process_is_forgotten(
+    django_capture_on_commit_callbacks, token
+):
+    authenticate(token.key)
+    cached = _credentials.copy()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        token.user.is_active = False
+        token.user.save()
+    # Entries of another process, which only share the cache with this one
+    _credentials.update(cached)
+
+    assert create_seat(token.key).status_code == 403
+
+
+def test_user_deactivated_while_resolving_is_not_cached(monkeypatch, token):
+    resolve = TokenAuthentication.authenticate_credentials
+
+    def resolve_then_deactivate(self, key):
+        user, token = resolve(self, key)
+        # Another process deactivates the user once the row has been read
+        CustomUser.objects.filter(pk=user.pk).update(is_active=False)
+        forget_user(user.pk)
+        return user, token
+
+    monkeypatch.setattr(
+        TokenAuthentication, "authenticate_credentials", resolve_then_deactivate
+    )
+    authenticate(token.key)
+    monkeypatch.undo()
+
+    with pytest.raises(AuthenticationFailed):
+        authenticate(token.key)
@@ -1,6 +1,7 @@
 from datetime import date
 
 import pytest
+from django.core.cache import caches
 from rest_framework.test import APIRequestFactory
 
 from voterguide.accounts.models import CustomUser
@@ -13,6 +14,14 @@ from voterguide.api.serializers import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cached responses and generation tokens would otherwise outlive the database
+    # state of a test
+    for cache in caches.all():
+        cache.clear()
+
+
 @pytest.fixture
 def user():
     return CustomUser.objects.create(
@@ -0,0 +1,136 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.test import force_authenticate
+
+from voterguide.api.models import Candidate, Seat, SeatEndorsement
+from voterguide.api.replicas import replica_alias
+from voterguide.api.views import CandidateViewSet, SeatEndorsementViewSet, SeatViewSet
+
+pytestmark = pytest.mark.django_db
+
+
+def call(view, request, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = async_to_sync(view)(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+    return response, context.captured_queries
+
+
+@pytest.fixture
+def endorsement(seat, endorser):
+    endorsement = baker.make(SeatEndorsement, seat=seat, endorser=endorser)
+    endorsement.candidates.set(
+        baker.make(Candidate, running_for_seat=seat, _quantity=2)
+    )
+    return endorsement
+
+
+@pytest.mark.parametrize(
+    "viewset,url_name",
+    [
+        (CandidateViewSet, "candidate-list"),
+        (SeatEndorsementViewSet, "seatendorsement-list"),
+    ],
+)
+def test_async_list_matches_sync(settings, drf_rf, endorsement, viewset, url_name):
+    # Render both responses rather than replay the first from the cache
+    settings.API_CACHE_TIMEOUT = 0
+    request = drf_rf.get(reverse(url_name), {"page_size": 1})
+    view = viewset.as_async_view({"get": "list"})
+
+    response, _ = call(view, request)
+    expected = viewset.as_view({"get": "list"})(request).render()
+
+    assert asyncio.iscoroutinefunction(view)
+    assert response.status_code == 200
+    assert json.loads(response.content) == json.loads(expected.content)
+    assert response["ETag"] == expected["ETag"]
+
+
+def test_async_retrieve(drf_rf, endorsement):
+    url = reverse("seatendorsement-detail", kwargs={"pk": endorsement.pk})
+    view = SeatEndorsementViewSet.as_async_view({"get": "retrieve"})
+
+    response, _ = call(view, drf_rf.get(url), pk=endorsement.pk)
+
+    assert response.status_code == 200
+    assert json.loads(response.content)["id"] == endorsement.pk
+    assert len(json.loads(response.content)["candidates"]) == 2
+
+
+def test_async_retrieve_not_found(drf_rf, candidate):
+    url = reverse("candidate-detail", kwargs={"pk": candidate.pk + 1})
+    view = CandidateViewSet.as_async_view({"get": "retrieve"})
+
+    response, _ = call(view, drf_rf.get(url), pk=candidate.pk + 1)
+
+    assert response.status_code == 404
+
+
+def test_async_list_is_cached_and_conditional(drf_rf, candidate):
+    view = CandidateViewSet.as_async_view({"get": "list"})
+    response, _ = call(view, drf_rf.get(reverse("candidate-list")))
+
+    cached, queries = call(view, drf_rf.get(reverse("candidate-list")))
+    not_modified, _ = call(
+        view,
+        drf_rf.get(reverse("candidate-list"), HTTP_IF_NONE_MATCH=response["ETag"]),
+    )
+
+    assert cached.content == response.content
+    assert not [query for query in queries if "api_candidate" in query["sql"]]
+    assert not_modified.status_code == 304
+
+
+def test_async_cache_miss_is_rendered_from_the_primary(drf_rf, candidate):
+    view = CandidateViewSet.as_async_view({"get": "list"})
+    # Not a configured database, so reading from it would fail
+    token = replica_alias.set("replica_1")
+    try:
+        response, _ = call(view, drf_rf.get(reverse("candidate-list")))
+        cached, queries = call(view, drf_rf.get(reverse("candidate-list")))
+    finally:
+        replica_alias.reset(token)
+
+    assert response.status_code == 200
+    assert cached.content == response.content
+    assert not queries
+
+
+def test_async_list_falls_back_for_expand(drf_rf, seat):
+    baker.make(Candidate, running_for_seat=seat)
+    request = drf_rf.get(reverse("candidate-list"), {"expand": "running_for_seat"})
+
+    response, _ = call(CandidateViewSet.as_async_view({"get": "list"}), request)
+
+    (result,) = json.loads(response.content)["results"]
+    assert result["running_for_seat"]["role"] == "Governor"
+
+
+def test_async_view_writes_synchronously(drf_rf, user):
+    request = drf_rf.post(
+        reverse("seat-list"),
+        {"level": "F", "branch": "E", "role": "President"},
+        format="json",
+    )
+    force_authenticate(request, user=user)
+    view = SeatViewSet.as_async_view({"get": "list", "post": "create"})
+
+    response, _ = call(view, request)
+
+    assert response.status_code == 201
+    assert Seat.objects.get().role == "President"
+
+
+def test_as_view_is_async_when_enabled(settings):
+    settings.API_ASYNC_VIEWS = True
+
+    assert asyncio.iscoroutinefunction(CandidateViewSet.as_view({"get": "list"}))
@@ -0,0 +1,331 @@
+import json
+from datetime import date
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from model_bakery import baker
+
+from voterguide.api import ballot
+from voterguide.api.ballot import (
+    discard_ballot_snapshots,
+    get_ballot_document,
+    render_ballot,
+)
+from voterguide.api.models import (
+    BallotSnapshot,
+    Candidate,
+    Endorser,
+    Measure,
+    MeasureEndorsement,
+    Seat,
+    SeatEndorsement,
+)
+from voterguide.api.replicas import replica_alias
+from voterguide.api.signals import ALL_SNAPSHOTS
+from voterguide.api.views import BallotViewSet
+
+pytestmark = pytest.mark.django_db
+
+ELECTION_DATE = date(2022, 11, 8)
+
+
+@pytest.fixture
+def seats():
+    seats = {
+        "president": Seat.objects.create(level="F", branch="E", role="President"),
+        "governor": Seat.objects.create(
+            level="S", branch="E", role="Governor", state="OR"
+        ),
+        "senate_1": Seat.objects.create(
+            level="S", branch="L", body="S", district=1, state="OR"
+        ),
+        "senate_2": Seat.objects.create(
+            level="S", branch="L", body="S", district=2, state="OR"
+        ),
+        "mayor": Seat.objects.create(
+            level="C", branch="E", role="Mayor", state="OR", city="Portland"
+        ),
+        "other_mayor": Seat.objects.create(
+            level="C", branch="E", role="Mayor", state="OR", city="Eugene"
+        ),
+        "wa_governor": Seat.objects.create(
+            level="S", branch="E", role="Governor", state="WA"
+        ),
+        "uncontested": Seat.objects.create(
+            level="S", branch="E", role="Treasurer", state="OR"
+        ),
+    }
+    for name, seat in seats.items():
+        if name != "uncontested":
+            baker.make(Candidate, running_for_seat=seat, _quantity=2)
+    return seats
+
+
+@pytest.fixture
+def measures():
+    return {
+        "statewide": baker.make(
+            Measure, level="S", state="OR", election_date=ELECTION_DATE
+        ),
+        "county": baker.make(
+            Measure,
+            level="T",
+            state="OR",
+            county="Multnomah",
+            election_date=ELECTION_DATE,
+        ),
+        "other_county": baker.make(
+            Measure,
+            level="T",
+            state="OR",
+            county="Lane",
+            election_date=ELECTION_DATE,
+        ),
+        "other_date": baker.make(
+            Measure, level="S", state="OR", election_date=date(2024, 11, 5)
+        ),
+    }
+
+
+def get_ballot(drf_rf, **params):
+    request = drf_rf.get(reverse("ballot-list"), data=params)
+    response = BallotViewSet.as_view({"get": "list"})(request).render()
+    return response, json.loads(response.content)
+
+
+def test_ballot_contents(drf_rf, seats, measures):
+    endorser = baker.make(Endorser)
+    incumbent = baker.make(Candidate, seat=seats["governor"])
+    endorsed = seats["governor"].candidate_set.first()
+    seat_endorsement = baker.make(
+        SeatEndorsement,
+        endorser=endorser,
+        seat=seats["governor"],
+        election_date=ELECTION_DATE,
+        candidates=[endorsed],
+    )
+    baker.make(
+        MeasureEndorsement,
+        endorser=endorser,
+        measure=measures["statewide"],
+        election_date=ELECTION_DATE,
+        recommendation="Y",
+    )
+
+    response, data = get_ballot(
+        drf_rf,
+        state="OR",
+        county="Multnomah",
+        city="Portland",
+        district=1,
+        election_date=ELECTION_DATE,
+    )
+
+    assert response.status_code == 200
+    assert {seat["id"] for seat in data["seats"]} == {
+        seats[name].id for name in ("president", "governor", "senate_1", "mayor")
+    }
+    assert {measure["id"] for measure in data["measures"]} == {
+        measures["statewide"].id,
+        measures["county"].id,
+    }
+
+    governor = next(s for s in data["seats"] if s["id"] == seats["governor"].id)
+    assert len(governor["candidates"]) == 2
+    assert [c["id"] for c in governor["incumbents"]] == [incumbent.id]
+    (endorsement,) = governor["endorsements"]
+    assert endorsement["id"] == seat_endorsement.id
+    assert endorsement["endorser"]["abbreviation"] == endorser.abbreviation
+    assert endorsement["candidates"][0].endswith(f"/candidates/{endorsed.id}/")
+
+    statewide = next(m for m in data["measures"] if m["id"] == measures["statewide"].id)
+    assert statewide["endorsements"][0]["recommendation"] == "Y"
+
+
+def test_ballot_query_count_is_fixed(
+    drf_rf, seats, measures, django_assert_num_queries
+):
+    endorsers = baker.make(Endorser, _quantity=3)
+    for endorser in endorsers:
+        for seat in seats.values():
+            baker.make(
+                SeatEndorsement,
+                endorser=endorser,
+                seat=seat,
+                election_date=ELECTION_DATE,
+                candidates=list(seat.candidate_set.all()),
+            )
+        for measure in measures.values():
+            baker.make(
+                MeasureEndorsement,
+                endorser=endorser,
+                measure=measure,
+                election_date=ELECTION_DATE,
+            )
+
+    # Seats, running candidates, incumbents, seat endorsements and their
+    # candidates, then measures and their endorsements.
+    with django_assert_num_queries(7):
+        document = render_ballot("OR", ELECTION_DATE)
+
+    assert all(len(seat["endorsements"]) == 3 for seat in document["seats"])
+
+
+def test_ballot_is_read_from_snapshot(
+    drf_rf, seats, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        response, data = get_ballot(drf_rf, state="OR", election_date=ELECTION_DATE)
+    assert response.status_code == 200
+    assert BallotSnapshot.objects.count() == 1
+    # Bypass the response cache to exercise the snapshot read path
+    cache.clear()
+
+    with django_assert_num_queries(1):
+        response, cached = get_ballot(drf_rf, state="OR", election_date=ELECTION_DATE)
+
+    assert cached == data
+    assert cached["seats"][0]["url"].startswith("http://testserver/seats/")
+
+
+def test_missing_snapshot_is_rendered_from_the_primary(
+    monkeypatch, seats, django_capture_on_commit_callbacks
+):
+    aliases = []
+
+    def render(*args):
+        aliases.append(replica_alias.get())
+        return render_ballot(*args)
+
+    monkeypatch.setattr(ballot, "render_ballot", render)
+    # The test database has no replicas, so the primary stands in for one
+    token = replica_alias.set("default")
+    try:
+        with django_capture_on_commit_callbacks(execute=True):
+            document = get_ballot_document("OR", ELECTION_DATE)
+    finally:
+        replica_alias.reset(token)
+
+    assert aliases == [None]
+    assert BallotSnapshot.objects.get().document == document
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda seats, measures: baker.make(
+            Candidate, running_for_seat=seats["uncontested"]
+        ),
+        lambda seats, measures: seats["governor"].candidate_set.first().delete(),
+        lambda seats, measures: measures["statewide"].delete(),
+        lambda seats, measures: Measure.objects.create(
+            name="New", level="S", state="OR", election_date=ELECTION_DATE
+        ),
+        lambda seats, measures: baker.make(
+            SeatEndorsement,
+            seat=seats["senate_2"],
+            election_date=ELECTION_DATE,
+            candidates=list(seats["senate_2"].candidate_set.all()),
+        ),
+    ],
+)
+def test_snapshot_is_discarded_on_change(
+    drf_rf, seats, measures, change, django_capture_on_commit_callbacks
+):
+    params = {"state": "OR", "election_date": ELECTION_DATE}
+    with django_capture_on_commit_callbacks(execute=True):
+        get_ballot(drf_rf, **params)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        change(seats, measures)
+
+    assert not BallotSnapshot.objects.exists()
+    _, data = get_ballot(drf_rf, **params)
+    BallotSnapshot.objects.all().delete()
+    _, fresh = get_ballot(drf_rf, **params)
+    assert data == fresh
+
+
+def test_endorser_rename_discards_snapshot(
+    drf_rf, seats, django_capture_on_commit_callbacks
+):
+    endorsement = baker.make(
+        SeatEndorsement, seat=seats["governor"], election_date=ELECTION_DATE
+    )
+    with django_capture_on_commit_callbacks(execute=True):
+        get_ballot(drf_rf, state="OR", election_date=ELECTION_DATE)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        endorsement.endorser.name = "Renamed"
+        endorsement.endorser.save()
+
+    _, data = get_ballot(drf_rf, state="OR", election_date=ELECTION_DATE)
+    governor = next(s for s in data["seats"] if s["id"] == seats["governor"].id)
+    assert governor["endorsements"][0]["endorser"]["name"] == "Renamed"
+
+
+@pytest.mark.parametrize(
+    "location,stored",
+    [
+        ({"city": "Portland"}, True),
+        ({"county": "multnomah"}, True),
+        ({"district": 2}, True),
+        ({"city": "Nowhere"}, False),
+        ({"county": "Nowhere"}, False),
+        ({"district": 99}, False),
+    ],
+)
+def test_snapshot_is_stored_for_known_jurisdictions(
+    drf_rf, seats, measures, location, stored, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        response, data = get_ballot(
+            drf_rf, state="OR", election_date=ELECTION_DATE, **location
+        )
+
+    assert response.status_code == 200
+    assert data["seats"]
+    assert BallotSnapshot.objects.exists() == stored
+
+
+def test_empty_ballot_is_not_stored(drf_rf, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        response, data = get_ballot(drf_rf, state="OR", election_date=ELECTION_DATE)
+
+    assert response.status_code == 200
+    assert data["seats"] == data["measures"] == []
+    assert not BallotSnapshot.objects.exists()
+
+
+def test_snapshot_rendered_before_a_write_is_not_stored(
+    monkeypatch, seats, django_capture_on_commit_callbacks
+):
+    def render(*args):
+        document = render_ballot(*args)
+        # A write commits while the document renders, and finds no snapshot yet
+        baker.make(Candidate, running_for_seat=seats["uncontested"])
+        discard_ballot_snapshots(ALL_SNAPSHOTS)
+        return document
+
+    monkeypatch.setattr(ballot, "render_ballot", render)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        get_ballot_document("OR", ELECTION_DATE)
+
+    assert not BallotSnapshot.objects.exists()
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"election_date": "2022-11-08"},
+        {"state": "OR"},
+        {"state": "ZZ", "election_date": "2022-11-08"},
+        {"state": "OR", "election_date": "2022-11-08", "district": "one"},
+    ],
+)
+def test_ballot_requires_valid_params(drf_rf, params):
+    response, _ = get_ballot(drf_rf, **params)
+
+    assert response.status_code == 400
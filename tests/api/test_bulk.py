@@ -0,0 +1,280 @@
+import json
+from datetime import date
+from unittest import mock
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.test import force_authenticate
+
+from voterguide.api.models import (
+    BallotSnapshot,
+    Candidate,
+    Endorser,
+    Seat,
+    SeatEndorsement,
+)
+from voterguide.api.views import (
+    BallotViewSet,
+    CandidateViewSet,
+    SeatEndorsementViewSet,
+    SeatViewSet,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def bulk_write(drf_rf, viewset, url_name, items, user=None, method="post"):
+    request = getattr(drf_rf, method)(reverse(url_name), data=items, format="json")
+    if user is not None:
+        force_authenticate(request, user=user)
+    view = viewset.as_view({"post": "bulk", "put": "bulk_upsert"})
+    # Stands in for ATOMIC_REQUESTS, which rolls back any request that fails
+    with transaction.atomic():
+        response = view(request).render()
+    return response, json.loads(response.content)
+
+
+def hyperlink(url_name, pk):
+    return f"http://testserver{reverse(url_name, kwargs={'pk': pk})}"
+
+
+def candidate_items(seats, count):
+    return [
+        {
+            "first_name": f"Candidate {n}",
+            "last_name": "Howe",
+            "party": "D",
+            "running_for_seat": hyperlink("seat-detail", seats[n % len(seats)].pk),
+        }
+        for n in range(count)
+    ]
+
+
+def test_bulk_requires_authentication(drf_rf):
+    response, _ = bulk_write(
+        drf_rf, CandidateViewSet, "candidate-bulk", [{"first_name": "Cameron"}]
+    )
+
+    assert response.status_code == 403
+    assert not Candidate.objects.exists()
+
+
+@pytest.mark.parametrize("count", [3, 30])
+def test_bulk_create_query_count_is_constant(drf_rf, user, count):
+    seats = baker.make(
+        Seat, level="F", role="Representative", district=iter([1, 2]), _quantity=2
+    )
+
+    with CaptureQueriesContext(connection) as context:
+        response, data = bulk_write(
+            drf_rf,
+            CandidateViewSet,
+            "candidate-bulk",
+            candidate_items(seats, count),
+            user,
+        )
+
+    # The seats, the INSERT, the seat states behind the ballots to rebuild and
+    # the written rows for the response, besides savepoints
+    queries = [
+        query["sql"]
+        for query in context.captured_queries
+        if not query["sql"].startswith(("SAVEPOINT", "RELEASE SAVEPOINT"))
+    ]
+    assert len(queries) == 4
+    assert response.status_code == 201
+    assert len(data) == count
+    assert [item["first_name"] for item in data] == [
+        f"Candidate {n}" for n in range(count)
+    ]
+    assert Candidate.objects.filter(running_for_seat=seats[1]).count() == count // 2
+
+
+def test_bulk_create_reports_invalid_items(drf_rf, user):
+    items = [
+        {"level": "S", "role": "Governor", "state": "OR"},
+        # Non-federal seats must have a state
+        {"level": "S", "role": "Governor"},
+    ]
+
+    response, data = bulk_write(drf_rf, SeatViewSet, "seat-bulk", items, user)
+
+    assert response.status_code == 400
+    assert data == [{}, {"non_field_errors": [mock.ANY]}]
+    assert not Seat.objects.exists()
+
+    items.append({"level": "Q", "role": "Governor", "state": "OR"})
+    response, data = bulk_write(drf_rf, SeatViewSet, "seat-bulk", items, user)
+
+    # Serializer errors are reported before the models validate
+    assert response.status_code == 400
+    assert data[:2] == [{}, {}]
+    assert "level" in data[2]
+
+
+def test_bulk_create_reports_unknown_hyperlinks(drf_rf, user):
+    seat = baker.make(Seat, level="F", role="President")
+    items = candidate_items([seat], 2)
+    items[1]["running_for_seat"] = hyperlink("seat-detail", seat.pk + 1)
+
+    response, data = bulk_write(drf_rf, CandidateViewSet, "candidate-bulk", items, user)
+
+    assert response.status_code == 400
+    assert data[0] == {}
+    assert "running_for_seat" in data[1]
+
+
+def test_bulk_create_conflict_writes_nothing(drf_rf, user):
+    baker.make(Candidate, first_name="Cameron", last_name="Howe")
+    items = [
+        {"first_name": "Joe", "last_name": "MacMillan"},
+        {"first_name": "CAMERON", "last_name": "howe"},
+    ]
+
+    response, data = bulk_write(drf_rf, CandidateViewSet, "candidate-bulk", items, user)
+
+    assert response.status_code == 400
+    assert "non_field_errors" in data
+    assert Candidate.objects.count() == 1
+
+
+def test_bulk_upsert_matches_unique_constraints(drf_rf, user):
+    no_dob = baker.make(Candidate, first_name="Cameron", last_name="Howe", party="U")
+    with_dob = baker.make(
+        Candidate,
+        first_name="Cameron",
+        last_name="Howe",
+        date_of_birth=date(1961, 1, 1),
+        party="U",
+    )
+    items = [
+        {"first_name": "CAMERON", "last_name": "Howe", "party": "D"},
+        {
+            "first_name": "Cameron",
+            "last_name": "howe",
+            "date_of_birth": "1961-01-01",
+            "party": "G",
+        },
+        {"first_name": "Donna", "last_name": "Clark", "party": "W"},
+    ]
+
+    response, data = bulk_write(
+        drf_rf, CandidateViewSet, "candidate-bulk", items, user, method="put"
+    )
+
+    assert response.status_code == 200
+    assert [item["id"] for item in data[:2]] == [no_dob.pk, with_dob.pk]
+    assert [item["party"] for item in data] == ["D", "G", "W"]
+    assert data[0]["first_name"] == "CAMERON"
+    assert Candidate.objects.count() == 3
+
+
+def test_bulk_upsert_repeated_item(drf_rf, user):
+    item = {"first_name": "Cameron", "last_name": "Howe"}
+
+    response, data = bulk_write(
+        drf_rf, CandidateViewSet, "candidate-bulk", [item, item], user, method="put"
+    )
+
+    assert response.status_code == 400
+    assert "non_field_errors" in data
+    assert not Candidate.objects.exists()
+
+
+def test_bulk_upsert_replaces_endorsed_candidates(drf_rf, user):
+    endorser = baker.make(Endorser)
+    seat = baker.make(Seat, level="F", role="President")
+    joe, cameron, gordon = baker.make(Candidate, _quantity=3)
+    existing = baker.make(
+        SeatEndorsement,
+        endorser=endorser,
+        seat=seat,
+        election_date=date(2024, 11, 5),
+        candidates=[joe, cameron],
+    )
+    item = {
+        "endorser": hyperlink("endorser-detail", endorser.pk),
+        "seat": hyperlink("seat-detail", seat.pk),
+        "election_date": "2024-11-05",
+        "url": "https://example.com/endorsements",
+        "candidates": [
+            hyperlink("candidate-detail", cameron.pk),
+            hyperlink("candidate-detail", gordon.pk),
+        ],
+    }
+
+    response, data = bulk_write(
+        drf_rf,
+        SeatEndorsementViewSet,
+        "seatendorsement-bulk",
+        [item],
+        user,
+        method="put",
+    )
+
+    assert response.status_code == 200
+    assert data[0]["id"] == existing.pk
+    assert data[0]["candidates"] == item["candidates"]
+    existing.refresh_from_db()
+    assert existing.url == "https://example.com/endorsements"
+    assert set(existing.candidates.all()) == {cameron, gordon}
+
+
+def test_bulk_create_reports_duplicate_seats(drf_rf, user, django_assert_num_queries):
+    baker.make(Seat, level="S", role="Governor", state="OR")
+    items = [
+        {"level": "S", "role": "governor", "state": "OR"},
+        {"level": "S", "role": "Governor", "state": "WA"},
+        {"level": "S", "role": "GOVERNOR", "state": "WA"},
+    ]
+
+    response, data = bulk_write(drf_rf, SeatViewSet, "seat-bulk", items, user)
+
+    assert response.status_code == 400
+    assert [bool(item) for item in data] == [True, False, True]
+    assert "Seat must be unique" in data[0]["non_field_errors"][0]
+
+
+def test_bulk_upsert_seats_on_identity(drf_rf, user):
+    governor = baker.make(Seat, level="S", branch="", role="Governor", state="OR")
+    items = [
+        {"level": "S", "branch": "E", "role": "Governor", "state": "OR"},
+        {"level": "S", "role": "GOVERNOR", "state": "OR"},
+    ]
+
+    response, data = bulk_write(
+        drf_rf, SeatViewSet, "seat-bulk", items, user, method="put"
+    )
+
+    assert response.status_code == 200
+    assert data[1]["id"] == governor.pk
+    assert data[1]["role"] == "GOVERNOR"
+    assert Seat.objects.count() == 2
+
+
+def test_bulk_write_updates_snapshots_and_cache(
+    drf_rf, user, django_capture_on_commit_callbacks
+):
+    seat = baker.make(Seat, level="S", role="Governor", state="OR")
+    baker.make(Candidate, running_for_seat=seat)
+    ballot = {"state": "OR", "election_date": "2024-11-05"}
+    list_view = CandidateViewSet.as_view({"get": "list"})
+    list_view(drf_rf.get(reverse("candidate-list"))).render()
+    ballot_view = BallotViewSet.as_view({"get": "list"})
+    with django_capture_on_commit_callbacks(execute=True):
+        ballot_view(drf_rf.get(reverse("ballot-list"), data=ballot)).render()
+    assert BallotSnapshot.objects.count() == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        bulk_write(
+            drf_rf, CandidateViewSet, "candidate-bulk", candidate_items([seat], 2), user
+        )
+
+    response = list_view(drf_rf.get(reverse("candidate-list"))).render()
+    assert len(json.loads(response.content)["results"]) == 3
+    assert not BallotSnapshot.objects.exists()
+    response = ballot_view(drf_rf.get(reverse("ballot-list"), data=ballot)).render()
+    assert len(json.loads(response.content)["seats"][0]["candidates"]) == 3
@@ -0,0 +1,174 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.test import force_authenticate
+
+from voterguide.api.generations import get_cache, get_generation
+from voterguide.api.models import Candidate, Seat
+from voterguide.api.replicas import PIN_COOKIE
+from voterguide.api.views import CandidateViewSet, SeatViewSet
+
+pytestmark = pytest.mark.django_db
+
+
+def list_candidates(drf_rf, user=None, **headers):
+    request = drf_rf.get(reverse("candidate-list"), **headers)
+    if user is not None:
+        force_authenticate(request, user=user)
+    return CandidateViewSet.as_view({"get": "list"})(request).render()
+
+
+def test_repeated_list_is_served_from_cache(drf_rf, django_assert_num_queries):
+    baker.make(Candidate, _quantity=3)
+    first = list_candidates(drf_rf)
+
+    with django_assert_num_queries(0):
+        second = list_candidates(drf_rf)
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second["Content-Type"] == first["Content-Type"]
+
+
+def test_retrieve_is_served_from_cache(drf_rf, django_assert_num_queries):
+    candidate = baker.make(Candidate)
+    view = CandidateViewSet.as_view({"get": "retrieve"})
+    url = reverse("candidate-detail", kwargs={"pk": candidate.pk})
+    first = view(drf_rf.get(url), pk=candidate.pk).render()
+
+    with django_assert_num_queries(0):
+        second = view(drf_rf.get(url), pk=candidate.pk).render()
+
+    assert second.content == first.content
+
+
+@pytest.mark.parametrize(
+    "variant",
+    [
+        {"data": {"page_size": 1}},
+        {"HTTP_ACCEPT": "application/json; version=2"},
+        {"HTTP_HOST": "127.0.0.1"},
+        {"authenticated": True},
+    ],
+)
+def test_cache_key_varies(drf_rf, user, variant, django_assert_num_queries):
+    baker.make(Candidate, _quantity=2)
+    list_candidates(drf_rf)
+    variant = dict(variant)
+    authenticated = variant.pop("authenticated", False)
+    data = variant.pop("data", None)
+    request = drf_rf.get(reverse("candidate-list"), data=data, **variant)
+    if authenticated:
+        force_authenticate(request, user=user)
+
+    # A cache miss: one query for the page
+    with django_assert_num_queries(1):
+        response = CandidateViewSet.as_view({"get": "list"})(request).render()
+
+    assert response.status_code == 200
+
+
+def test_write_invalidates_resource(drf_rf, user, django_capture_on_commit_callbacks):
+    candidate = baker.make(Candidate, first_name="Gordon")
+    list_candidates(drf_rf)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        request = drf_rf.patch(
+            reverse("candidate-detail", kwargs={"pk": candidate.pk}),
+            data={"first_name": "Joe"},
+            format="json",
+        )
+        force_authenticate(request, user=user)
+        CandidateViewSet.as_view({"patch": "partial_update"})(
+            request, pk=candidate.pk
+        ).render()
+
+    results = json.loads(list_candidates(drf_rf).content)["results"]
+    assert results[0]["first_name"] == "Joe"
+
+
+def test_seat_delete_invalidates_candidates(drf_rf, django_capture_on_commit_callbacks):
+    seat = baker.make(Seat, level="F", role="President")
+    baker.make(Candidate, running_for_seat=seat)
+    before = json.loads(list_candidates(drf_rf).content)["results"]
+    seats = SeatViewSet.as_view({"get": "list"})
+    seats(drf_rf.get(reverse("seat-list"))).render()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        seat.delete()
+
+    after = json.loads(list_candidates(drf_rf).content)["results"]
+    assert before[0]["running_for_seat"] is not None
+    assert after[0]["running_for_seat"] is None
+    assert (
+        json.loads(seats(drf_rf.get(reverse("seat-list"))).render().content)["results"]
+        == []
+    )
+
+
+def test_uncommitted_write_keeps_cache(drf_rf, django_assert_num_queries):
+    baker.make(Candidate)
+    list_candidates(drf_rf)
+
+    # The test transaction never commits, so invalidation is still pending
+    baker.make(Candidate)
+
+    with django_assert_num_queries(0):
+        response = list_candidates(drf_rf)
+
+    assert len(json.loads(response.content)["results"]) == 1
+
+
+def test_pinned_client_bypasses_cache(drf_rf, django_assert_num_queries):
+    baker.make(Candidate)
+    view = CandidateViewSet.as_view({"get": "list"})
+
+    def list_pinned():
+        request = drf_rf.get(reverse("candidate-list"))
+        request.COOKIES[PIN_COOKIE] = "1"
+        return view(request).render()
+
+    list_pinned()
+    # Neither stored by the pinned client, nor read by it
+    with django_assert_num_queries(1):
+        list_candidates(drf_rf)
+    with django_assert_num_queries(1):
+        response = list_pinned()
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        reverse("candidate-list"),
+        f"{reverse('ballot-list')}?state=OR&election_date=2022-11-08",
+    ],
+)
+def test_replicas_keep_caching(client, settings, seat, url):
+    # Not a configured database, so reading from it would fail: cache misses are
+    # rendered from the primary instead, and cached as without replicas
+    settings.DATABASE_REPLICAS = ["replica_1"]
+    baker.make(Candidate, running_for_seat=seat)
+    first = client.get(url)
+
+    with CaptureQueriesContext(connection) as context:
+        second = client.get(url)
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == first.content
+    # Only the savepoint of the request's transaction
+    assert not [q for q in context.captured_queries if "SAVEPOINT" not in q["sql"]]
+
+
+def test_culling_responses_keeps_generations():
+    generation = get_generation("candidate")
+
+    # Past the default MAX_ENTRIES of 300, which culls a third of the entries
+    get_cache().set_many({f"response-{number}": number for number in range(1000)})
+
+    assert get_generation("candidate") == generation
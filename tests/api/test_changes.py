@@ -0,0 +1,141 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from voterguide.api.models import Candidate, Seat, SeatEndorsement, Tombstone
+from voterguide.api.views import (
+    CandidateViewSet,
+    SeatEndorsementViewSet,
+    TombstoneViewSet,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def get_changes(drf_rf, viewset, url_name, **params):
+    request = drf_rf.get(reverse(url_name), data=params)
+    response = viewset.as_view({"get": "list"})(request).render()
+    return response, json.loads(response.content)
+
+
+def follow(drf_rf, viewset, data):
+    results = list(data["results"])
+    while data["next"]:
+        view = viewset.as_view({"get": "list"})
+        data = json.loads(view(drf_rf.get(data["next"])).render().content)
+        results.extend(data["results"])
+    return results
+
+
+@pytest.fixture(autouse=True)
+def feed_delay(settings):
+    # Rows made by a test are committed as soon as they are saved
+    settings.API_CHANGE_FEED_DELAY = 0
+
+
+@pytest.fixture
+def since():
+    return timezone.now() - timedelta(hours=1)
+
+
+def backdate(queryset, hours):
+    queryset.update(last_updated=timezone.now() - timedelta(hours=hours))
+
+
+def test_modified_since_returns_changes_in_order(drf_rf, since):
+    old = baker.make(Candidate, _quantity=3)
+    backdate(Candidate.objects.filter(pk__in=[c.pk for c in old]), hours=2)
+    changed = baker.make(Candidate, _quantity=4)
+    # Touch the first candidate last so that it sorts after the others
+    changed[0].save()
+
+    response, data = get_changes(
+        drf_rf,
+        CandidateViewSet,
+        "candidate-list",
+        modified_since=since.isoformat(),
+        page_size=2,
+    )
+    results = follow(drf_rf, CandidateViewSet, data)
+
+    assert response.status_code == 200
+    assert [r["id"] for r in results] == [c.pk for c in changed[1:]] + [changed[0].pk]
+    assert results == sorted(results, key=lambda r: (r["last_updated"], r["id"]))
+
+
+def test_modified_since_leaves_out_recent_changes(settings, drf_rf, since):
+    settings.API_CHANGE_FEED_DELAY = 60
+    settled = baker.make(Candidate)
+    backdate(Candidate.objects.filter(pk=settled.pk), hours=0.5)
+    baker.make(Candidate)
+
+    _, data = get_changes(
+        drf_rf, CandidateViewSet, "candidate-list", modified_since=since.isoformat()
+    )
+
+    assert [r["id"] for r in data["results"]] == [settled.pk]
+
+
+@pytest.mark.parametrize("value", ["yesterday", "2022-13-01T00:00:00"])
+def test_invalid_modified_since(drf_rf, value):
+    response, data = get_changes(
+        drf_rf, CandidateViewSet, "candidate-list", modified_since=value
+    )
+
+    assert response.status_code == 400
+    assert "modified_since" in data
+
+
+def test_deletion_leaves_tombstone(drf_rf, since):
+    candidate = baker.make(Candidate)
+    candidate_id = candidate.pk
+    seat = baker.make(Seat, level="F", role="President")
+    seat_id = seat.pk
+    candidate.delete()
+    seat.delete()
+
+    _, data = get_changes(
+        drf_rf,
+        TombstoneViewSet,
+        "tombstone-list",
+        resource="candidate",
+        modified_since=since.isoformat(),
+    )
+
+    (tombstone,) = data["results"]
+    assert tombstone["object_id"] == candidate_id
+    assert tombstone["resource"] == "candidate"
+    assert Tombstone.objects.filter(resource="seat", object_id=seat_id).exists()
+
+
+def test_seat_deletion_surfaces_candidates(drf_rf, since):
+    seat = baker.make(Seat, level="F", role="President")
+    candidate = baker.make(Candidate, running_for_seat=seat)
+    backdate(Candidate.objects.all(), hours=2)
+
+    seat.delete()
+    _, data = get_changes(
+        drf_rf, CandidateViewSet, "candidate-list", modified_since=since.isoformat()
+    )
+
+    assert [r["id"] for r in data["results"]] == [candidate.pk]
+    assert data["results"][0]["running_for_seat"] is None
+
+
+def test_endorsed_candidates_change_surfaces_endorsement(drf_rf, since):
+    endorsement = baker.make(SeatEndorsement, seat__level="F", seat__role="President")
+    backdate(SeatEndorsement.objects.all(), hours=2)
+
+    endorsement.candidates.add(baker.make(Candidate))
+    _, data = get_changes(
+        drf_rf,
+        SeatEndorsementViewSet,
+        "seatendorsement-list",
+        modified_since=since.isoformat(),
+    )
+
+    assert [r["id"] for r in data["results"]] == [endorsement.pk]
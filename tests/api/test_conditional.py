@@ -0,0 +1,168 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.http import parse_http_date
+from model_bakery import baker
+
+from voterguide.api.models import Endorser
+from voterguide.api.replicas import replica_alias
+from voterguide.api.views import EndorserViewSet
+
+pytestmark = pytest.mark.django_db
+
+
+def list_endorsers(drf_rf, **headers):
+    request = drf_rf.get(reverse("endorser-list"), **headers)
+    return EndorserViewSet.as_view({"get": "list"})(request)
+
+
+def retrieve_endorser(drf_rf, pk, **headers):
+    request = drf_rf.get(reverse("endorser-detail", kwargs={"pk": pk}), **headers)
+    return EndorserViewSet.as_view({"get": "retrieve"})(request, pk=pk)
+
+
+def test_list_emits_validators(drf_rf):
+    endorsers = baker.make(Endorser, _quantity=2)
+    latest = max(endorser.last_updated for endorser in endorsers)
+
+    response = list_endorsers(drf_rf).render()
+
+    assert response.status_code == 200
+    assert response["ETag"].startswith('"')
+    # When the resource's generation started, which is after its last write
+    last_modified = parse_http_date(response["Last-Modified"])
+    assert last_modified >= int(latest.timestamp())
+
+
+def test_list_if_none_match_skips_serialization(
+    settings, drf_rf, django_assert_num_queries
+):
+    # Validate the list rather than replay it from the cache
+    settings.API_CACHE_TIMEOUT = 0
+    baker.make(Endorser, _quantity=2)
+    etag = list_endorsers(drf_rf).render()["ETag"]
+
+    # No aggregate over the table, e.g. a COUNT(*), runs for the validators
+    with django_assert_num_queries(0):
+        response = list_endorsers(drf_rf, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert response.content == b""
+
+
+def test_cached_response_answers_conditional_request(drf_rf, django_assert_num_queries):
+    baker.make(Endorser)
+    etag = list_endorsers(drf_rf).render()["ETag"]
+
+    with django_assert_num_queries(0):
+        response = list_endorsers(drf_rf, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+
+
+def rename(endorser):
+    endorser.name = "Renamed"
+    endorser.save()
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda endorsers: endorsers[0].delete(),
+        lambda endorsers: baker.make(Endorser),
+        lambda endorsers: rename(endorsers[1]),
+    ],
+)
+def test_list_etag_changes_with_data(
+    settings, drf_rf, django_capture_on_commit_callbacks, change
+):
+    settings.API_CACHE_TIMEOUT = 0
+    endorsers = baker.make(Endorser, _quantity=2)
+    etag = list_endorsers(drf_rf).render()["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        change(endorsers)
+    response = list_endorsers(drf_rf, HTTP_IF_NONE_MATCH=etag).render()
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_filtered_list_etag_changes_when_a_row_leaves_it(
+    settings, drf_rf, django_capture_on_commit_callbacks
+):
+    settings.API_CACHE_TIMEOUT = 0
+    endorser = baker.make(Endorser, abbreviation="BRO")
+    url = reverse("endorser-list")
+    view = EndorserViewSet.as_view({"get": "list"})
+    etag = view(drf_rf.get(url, {"abbreviation": "BRO"})).render()["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        endorser.abbreviation = "OBR"
+        endorser.save()
+    response = view(
+        drf_rf.get(url, {"abbreviation": "BRO"}, HTTP_IF_NONE_MATCH=etag)
+    ).render()
+
+    assert response.status_code == 200
+    assert json.loads(response.content)["results"] == []
+
+
+def test_list_etag_varies_with_page(drf_rf):
+    baker.make(Endorser, _quantity=3)
+    first = list_endorsers(drf_rf).render()
+    request = drf_rf.get(reverse("endorser-list"), data={"page_size": 1})
+    paged = EndorserViewSet.as_view({"get": "list"})(request).render()
+
+    assert first["ETag"] != paged["ETag"]
+
+
+def test_detail_if_modified_since(drf_rf, django_assert_num_queries):
+    endorser = baker.make(Endorser)
+    last_modified = retrieve_endorser(drf_rf, endorser.pk).render()["Last-Modified"]
+    cache.clear()
+
+    with django_assert_num_queries(1):
+        response = retrieve_endorser(
+            drf_rf, endorser.pk, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+    assert response.status_code == 304
+
+    Endorser.objects.filter(pk=endorser.pk).update(
+        last_updated=endorser.last_updated + timedelta(seconds=5)
+    )
+    response = retrieve_endorser(
+        drf_rf, endorser.pk, HTTP_IF_MODIFIED_SINCE=last_modified
+    ).render()
+
+    assert response.status_code == 200
+
+
+def test_missing_detail_is_not_found(drf_rf):
+    response = retrieve_endorser(drf_rf, 0, HTTP_IF_NONE_MATCH="*").render()
+
+    assert response.status_code == 404
+    assert not response.has_header("ETag")
+
+
+def test_replica_reads_validate_only_details(settings, drf_rf):
+    # Read from the replica rather than render cache misses from the primary
+    settings.API_CACHE_TIMEOUT = 0
+    endorser = baker.make(Endorser)
+    # The test database has no replicas, so the primary stands in for one
+    token = replica_alias.set("default")
+    try:
+        listed = list_endorsers(drf_rf).render()
+        retrieved = retrieve_endorser(drf_rf, endorser.pk).render()
+    finally:
+        replica_alias.reset(token)
+
+    assert listed.status_code == retrieved.status_code == 200
+    # The list's generation may be newer than the replica's rows
+    assert "ETag" not in listed
+    assert "ETag" in retrieved
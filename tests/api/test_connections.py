@@ -0,0 +1,18 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_connections():
+    conn_max_age = connection.settings_dict["CONN_MAX_AGE"]
+    stdout = StringIO()
+
+    call_command("benchmark_connections", requests=3, stdout=stdout)
+
+    per_request, persistent = stdout.getvalue().splitlines()
+    assert per_request.endswith("connections opened: 3")
+    assert persistent.endswith("connections opened: 1")
+    assert connection.settings_dict["CONN_MAX_AGE"] == conn_max_age
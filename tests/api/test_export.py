@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+
+import pytest
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.request import Request
+
+from voterguide.api.models import Candidate, Seat, SeatEndorsement
+from voterguide.api.replicas import replica_alias
+from voterguide.api.serializers import CandidateSerializer, SeatEndorsementSerializer
+from voterguide.api.views import CandidateViewSet, SeatEndorsementViewSet, SeatViewSet
+
+pytestmark = pytest.mark.django_db
+
+
+def export(drf_rf, viewset, url_name, **kwargs):
+    request = drf_rf.get(reverse(url_name), **kwargs)
+    response = viewset.as_view({"get": "export"})(request)
+    return response, b"".join(response.streaming_content).decode()
+
+
+def test_export_ndjson_matches_serializer(drf_rf):
+    candidates = baker.make(Candidate, _quantity=3)
+
+    response, content = export(drf_rf, CandidateViewSet, "candidate-export")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    assert 'filename="candidate.ndjson"' in response["Content-Disposition"]
+    rows = [json.loads(line) for line in content.splitlines()]
+    request = drf_rf.get("/")
+    expected = CandidateSerializer(
+        candidates, many=True, context={"request": request}
+    ).data
+    assert rows == json.loads(json.dumps(expected))
+
+
+def test_export_csv(drf_rf):
+    endorsement = baker.make(
+        SeatEndorsement, seat__level="F", seat__role="President", _fill_optional=True
+    )
+    endorsement.candidates.set(baker.make(Candidate, _quantity=2))
+
+    response, content = export(
+        drf_rf,
+        SeatEndorsementViewSet,
+        "seatendorsement-export",
+        data={"format": "csv"},
+    )
+
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    (row,) = csv.DictReader(io.StringIO(content))
+    assert list(row) == list(SeatEndorsementSerializer().fields)
+    assert row["id"] == str(endorsement.pk)
+    assert len(row["candidates"].split(" ")) == 2
+
+
+def test_export_accept_header(drf_rf):
+    baker.make(Seat, level="F", role="President")
+
+    response, content = export(
+        drf_rf, SeatViewSet, "seat-export", HTTP_ACCEPT="text/csv"
+    )
+
+    assert response["Content-Type"].startswith("text/csv")
+    assert content.splitlines()[0].startswith("id,last_updated,level")
+
+
+def test_export_streams_in_chunks(drf_rf, monkeypatch, django_assert_num_queries):
+    seat = baker.make(Seat, level="F", role="President")
+    endorsements = baker.make(SeatEndorsement, seat=seat, _quantity=5)
+    monkeypatch.setattr(SeatEndorsementViewSet, "export_chunk_size", 2)
+
+    # Nothing is read until the response is consumed
+    with django_assert_num_queries(0):
+        response = SeatEndorsementViewSet.as_view({"get": "export"})(
+            drf_rf.get(reverse("seatendorsement-export"))
+        )
+    # The rows, then the candidates for each of the three chunks
+    with django_assert_num_queries(4):
+        content = b"".join(response.streaming_content).decode()
+
+    assert [json.loads(line)["id"] for line in content.splitlines()] == [
+        endorsement.pk for endorsement in endorsements
+    ]
+
+
+def test_export_applies_filters(drf_rf):
+    oregon = baker.make(Seat, level="S", role="Governor", state="OR")
+    baker.make(Seat, level="S", role="Governor", state="WA")
+
+    _, content = export(drf_rf, SeatViewSet, "seat-export", data={"state": "OR"})
+
+    assert [json.loads(line)["id"] for line in content.splitlines()] == [oregon.pk]
+
+
+def test_export_errors_are_rendered(drf_rf):
+    response = SeatViewSet.as_view({"get": "export"})(
+        drf_rf.get(reverse("seat-export"), data={"district": "third"})
+    ).render()
+
+    assert response.status_code == 400
+    assert "district" in json.loads(response.content)
+
+
+def test_export_reads_from_the_database_of_the_request(drf_rf):
+    view = CandidateViewSet(action="export", kwargs={}, format_kwarg=None)
+    view.request = Request(drf_rf.get(reverse("candidate-export")))
+    token = replica_alias.set("replica_1")
+    try:
+        queryset = view.get_export_queryset()
+    finally:
+        replica_alias.reset(token)
+
+    # Still, once the rows are streamed after the request
+    assert queryset.db == "replica_1"
@@ -0,0 +1,107 @@
+from datetime import date, timedelta
+from unittest import mock
+
+import pytest
+from model_bakery import baker
+from model_bakery.recipe import seq
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from voterguide.api.fields import TemplatedHyperlinkedRelatedField
+from voterguide.api.models import Candidate, Endorser, Seat, SeatEndorsement
+from voterguide.api.serializers import (
+    CandidateSerializer,
+    EndorserSerializer,
+    SeatEndorsementSerializer,
+    SeatSerializer,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def stock_serializer(serializer):
+    """
+    Return a copy of `serializer` that uses DRF's own hyperlinked fields.
+    """
+
+    class Meta(serializer.Meta):
+        pass
+
+    return type(
+        f"Stock{serializer.__name__}",
+        (serializers.HyperlinkedModelSerializer,),
+        {"Meta": Meta},
+    )
+
+
+@pytest.fixture
+def seats():
+    return baker.make(
+        Seat,
+        level="S",
+        branch="L",
+        role="Senator",
+        body="S",
+        district=seq(1),
+        state="OR",
+        _quantity=3,
+    )
+
+
+@pytest.fixture
+def endorsements(seats):
+    candidates = baker.make(Candidate, running_for_seat=seats[0], _quantity=2)
+    return [
+        baker.make(
+            SeatEndorsement,
+            seat=seat,
+            election_date=date(2022, 11, 8) + timedelta(days=i),
+            candidates=candidates,
+        )
+        for i, seat in enumerate(seats)
+    ]
+
+
+@pytest.mark.parametrize(
+    "serializer, model",
+    [
+        (CandidateSerializer, Candidate),
+        (EndorserSerializer, Endorser),
+        (SeatSerializer, Seat),
+        (SeatEndorsementSerializer, SeatEndorsement),
+    ],
+)
+@pytest.mark.parametrize("host", ["testserver", "guide.example.org:8443"])
+@pytest.mark.parametrize("format", [None, "json", "api"])
+def test_output_matches_stock_fields(
+    drf_rf, settings, endorsements, serializer, model, host, format
+):
+    settings.ALLOWED_HOSTS = ["testserver", "guide.example.org"]
+    request = drf_rf.get("/", HTTP_HOST=host)
+    context = {"request": request, "format": format}
+    queryset = model.objects.order_by("id")
+
+    templated = serializer(queryset, many=True, context=context).data
+    stock = stock_serializer(serializer)(queryset, many=True, context=context).data
+
+    assert templated == stock
+
+
+def test_reverses_each_route_once_per_request(drf_rf, endorsements):
+    request = drf_rf.get("/")
+    queryset = SeatEndorsement.objects.prefetch_related("candidates")
+
+    serializer = SeatEndorsementSerializer(
+        queryset, many=True, context={"request": request}
+    )
+    tracked = mock.MagicMock(side_effect=reverse)
+    for field in serializer.child.fields.values():
+        target = getattr(field, "child_relation", field)
+        if isinstance(target, TemplatedHyperlinkedRelatedField):
+            target.reverse = tracked
+
+    data = serializer.data
+
+    assert len(data) == len(endorsements)
+    # One reverse each for the endorser, seat and candidate routes
+    assert tracked.call_count == 3
@@ -0,0 +1,251 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from voterguide.api.models import Candidate, MeasureEndorsement, SeatEndorsement
+from voterguide.api.serializers import CandidateSerializer
+from voterguide.api.views import (
+    CandidateViewSet,
+    MeasureEndorsementViewSet,
+    SeatEndorsementViewSet,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def get(drf_rf, viewset, url_name, action="list", **params):
+    kwargs = {"pk": params.pop("pk")} if "pk" in params else {}
+    request = drf_rf.get(reverse(url_name, kwargs=kwargs), data=params)
+    with CaptureQueriesContext(connection) as context:
+        response = viewset.as_view({"get": action})(request, **kwargs).render()
+    return response, context.captured_queries
+
+
+def test_fields_trims_rows_and_columns(drf_rf, seat):
+    baker.make(Candidate, running_for_seat=seat, _quantity=2)
+
+    response, queries = get(
+        drf_rf, CandidateViewSet, "candidate-list", fields="id,first_name,party"
+    )
+
+    results = json.loads(response.content)["results"]
+    assert [list(result) for result in results] == [["id", "first_name", "party"]] * 2
+    (select,) = [query["sql"] for query in queries if "ORDER BY" in query["sql"]]
+    assert '"first_name"' in select
+    assert '"date_of_birth"' not in select
+    assert '"running_for_seat_id"' not in select
+
+
+def test_exclude_skips_many_to_many_prefetch(drf_rf, seat):
+    endorsement = baker.make(SeatEndorsement, seat=seat)
+    endorsement.candidates.set(baker.make(Candidate, _quantity=2))
+
+    response, queries = get(drf_rf, SeatEndorsementViewSet, "seatendorsement-list")
+    (full,) = json.loads(response.content)["results"]
+    response, sparse_queries = get(
+        drf_rf,
+        SeatEndorsementViewSet,
+        "seatendorsement-list",
+        exclude="candidates,url",
+    )
+    (sparse,) = json.loads(response.content)["results"]
+
+    assert len(full["candidates"]) == 2
+    assert set(full) - set(sparse) == {"candidates", "url"}
+    assert len(sparse_queries) == len(queries) - 1
+
+
+def test_retrieve_with_fields(drf_rf, candidate):
+    response, _ = get(
+        drf_rf,
+        CandidateViewSet,
+        "candidate-detail",
+        action="retrieve",
+        pk=candidate.pk,
+        fields="url,seat",
+    )
+
+    assert set(json.loads(response.content)) == {"url", "seat"}
+
+
+def test_unknown_fields_are_rejected(drf_rf, candidate):
+    response, _ = get(
+        drf_rf, CandidateViewSet, "candidate-list", fields="id,nickname,age"
+    )
+
+    assert response.status_code == 400
+    assert json.loads(response.content) == {
+        "fields": ["Unknown fields: age, nickname."]
+    }
+
+
+def test_export_with_fields(drf_rf, candidate):
+    request = drf_rf.get(
+        reverse("candidate-export"), data={"format": "csv", "exclude": "url"}
+    )
+    response = CandidateViewSet.as_view({"get": "export"})(request)
+    content = b"".join(response.streaming_content).decode()
+
+    (row,) = csv.DictReader(io.StringIO(content))
+    assert "url" not in row
+    assert row["first_name"] == candidate.first_name
+
+
+@pytest.mark.parametrize("count", [2, 10])
+def test_expand_costs_constant_queries(drf_rf, endorser, seat, count):
+    for endorsement in baker.make(
+        SeatEndorsement,
+        endorser=endorser,
+        seat=seat,
+        election_date=iter(date(2000 + 2 * n, 11, 1) for n in range(count)),
+        _quantity=count,
+    ):
+        endorsement.candidates.set(baker.make(Candidate, _quantity=2))
+
+    response, queries = get(
+        drf_rf,
+        SeatEndorsementViewSet,
+        "seatendorsement-list",
+        expand="endorser,seat,candidates",
+    )
+
+    # The page with its endorser and seat, and the candidates
+    assert len(queries) == 2
+    results = json.loads(response.content)["results"]
+    assert len(results) == count
+    assert results[0]["endorser"]["abbreviation"] == endorser.abbreviation
+    assert results[0]["seat"]["role"] == seat.role
+    assert [list(c) for c in results[0]["candidates"]] == [
+        list(CandidateSerializer().fields)
+    ] * 2
+
+
+def test_expand_with_fields(drf_rf, candidate, seat):
+    candidate.seat = seat
+    candidate.save()
+
+    response, _ = get(
+        drf_rf,
+        CandidateViewSet,
+        "candidate-detail",
+        action="retrieve",
+        pk=candidate.pk,
+        fields="id,running_for_seat,seat",
+        expand="running_for_seat,seat",
+    )
+
+    data = json.loads(response.content)
+    assert data["running_for_seat"] is None
+    assert data["seat"]["id"] == seat.pk
+
+
+def test_measure_endorsement_expand(drf_rf, endorser, measure):
+    baker.make(MeasureEndorsement, endorser=endorser, measure=measure)
+
+    response, _ = get(
+        drf_rf,
+        MeasureEndorsementViewSet,
+        "measureendorsement-list",
+        expand="measure",
+    )
+
+    (result,) = json.loads(response.content)["results"]
+    assert result["measure"]["name"] == measure.name
+    assert result["endorser"].startswith("http://testserver/")
+
+
+def test_unknown_expansions_are_rejected(drf_rf):
+    response, _ = get(
+        drf_rf, SeatEndorsementViewSet, "seatendorsement-list", expand="measure"
+    )
+
+    assert response.status_code == 400
+    assert "expand" in json.loads(response.content)
+
+
+def rename(instance, field, value):
+    setattr(instance, field, value)
+    instance.save()
+    return field, value
+
+
+def fetch(drf_rf, viewset, url_name, action, pk, expand, **headers):
+    kwargs = {"pk": pk} if action == "retrieve" else {}
+    suffix = "detail" if action == "retrieve" else "list"
+    request = drf_rf.get(
+        reverse(f"{url_name}-{suffix}", kwargs=kwargs), {"expand": expand}, **headers
+    )
+    response = viewset.as_view({"get": action})(request, **kwargs).render()
+    data = json.loads(response.content) if response.content else None
+    if data and action == "list":
+        (data,) = data["results"]
+    return response, data
+
+
+@pytest.mark.parametrize(
+    "viewset,url_name,expand,change",
+    [
+        (
+            SeatEndorsementViewSet,
+            "seatendorsement",
+            "endorser",
+            lambda endorsement: rename(endorsement.endorser, "name", "Renamed"),
+        ),
+        (
+            SeatEndorsementViewSet,
+            "seatendorsement",
+            "seat",
+            lambda endorsement: rename(endorsement.seat, "role", "Secretary of State"),
+        ),
+        (
+            MeasureEndorsementViewSet,
+            "measureendorsement",
+            "endorser",
+            lambda endorsement: rename(endorsement.endorser, "name", "Renamed"),
+        ),
+        (
+            MeasureEndorsementViewSet,
+            "measureendorsement",
+            "measure",
+            lambda endorsement: rename(endorsement.measure, "name", "Renamed"),
+        ),
+    ],
+)
+@pytest.mark.parametrize("action", ["list", "retrieve"])
+@pytest.mark.parametrize("cache_timeout", [300, 0])
+def test_related_write_changes_expanded_response(
+    settings,
+    drf_rf,
+    django_capture_on_commit_callbacks,
+    endorser,
+    seat,
+    measure,
+    viewset,
+    url_name,
+    expand,
+    change,
+    action,
+    cache_timeout,
+):
+    # Without caching, only the validators stand between a client and stale data
+    settings.API_CACHE_TIMEOUT = cache_timeout
+    model = viewset.queryset.model
+    related = {"seat": seat} if model is SeatEndorsement else {"measure": measure}
+    endorsement = baker.make(model, endorser=endorser, **related)
+    args = (drf_rf, viewset, url_name, action, endorsement.pk, expand)
+    first, _ = fetch(*args)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        field, value = change(endorsement)
+    response, data = fetch(*args, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert response.status_code == 200
+    assert data[expand][field] == value
+    assert response["ETag"] != first["ETag"]
@@ -0,0 +1,340 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from voterguide.api.filters import FieldFilter, SearchFilter
+from voterguide.api.models import (
+    Candidate,
+    Endorser,
+    Measure,
+    MeasureEndorsement,
+    Seat,
+    SeatEndorsement,
+    Tombstone,
+)
+from voterguide.api.views import (
+    CandidateViewSet,
+    MeasureEndorsementViewSet,
+    MeasureViewSet,
+    SeatEndorsementViewSet,
+    SeatViewSet,
+    TombstoneViewSet,
+)
+
+pytestmark = pytest.mark.django_db
+
+STATES = ["CA", "ID", "NV", "OR", "WA"]
+ELECTION_DATES = [date(2000, 11, 7) + timedelta(weeks=26 * n) for n in range(40)]
+
+
+def list_filtered(drf_rf, viewset, url_name, **params):
+    request = drf_rf.get(reverse(url_name), data=params)
+    response = viewset.as_view({"get": "list"})(request).render()
+    return response, json.loads(response.content)
+
+
+def list_search(drf_rf, **params):
+    _, data = list_filtered(
+        drf_rf, CandidateViewSet, "candidate-list", search="tina", **params
+    )
+    return data["results"]
+
+
+def test_seat_filters(drf_rf):
+    governor = baker.make(Seat, level="S", branch="E", role="Governor", state="OR")
+    house = baker.make(Seat, level="F", role="Representative", state="OR", district=3)
+    baker.make(Seat, level="S", branch="E", role="Governor", state="WA")
+
+    _, data = list_filtered(drf_rf, SeatViewSet, "seat-list", state="OR", level="S")
+    assert [r["id"] for r in data["results"]] == [governor.pk]
+
+    _, data = list_filtered(drf_rf, SeatViewSet, "seat-list", district=3)
+    assert [r["id"] for r in data["results"]] == [house.pk]
+
+    # An empty value on a nullable field matches NULL
+    _, data = list_filtered(drf_rf, SeatViewSet, "seat-list", state="OR", district="")
+    assert [r["id"] for r in data["results"]] == [governor.pk]
+
+
+def test_foreign_key_filters(drf_rf, endorser, seat):
+    running = baker.make(Candidate, running_for_seat=seat)
+    baker.make(Candidate)
+    endorsement = baker.make(
+        SeatEndorsement, endorser=endorser, seat=seat, election_date=date(2022, 11, 8)
+    )
+    baker.make(SeatEndorsement, seat=seat, election_date=date(2022, 11, 8))
+
+    _, data = list_filtered(
+        drf_rf, CandidateViewSet, "candidate-list", running_for_seat=seat.pk
+    )
+    assert [r["id"] for r in data["results"]] == [running.pk]
+
+    _, data = list_filtered(
+        drf_rf,
+        SeatEndorsementViewSet,
+        "seatendorsement-list",
+        election_date="2022-11-08",
+        endorser=endorser.pk,
+    )
+    assert [r["id"] for r in data["results"]] == [endorsement.pk]
+
+
+@pytest.mark.parametrize(
+    "viewset,url_name,params",
+    [
+        (MeasureViewSet, "measure-list", {"election_date": "next tuesday"}),
+        (SeatViewSet, "seat-list", {"district": "third"}),
+        (MeasureEndorsementViewSet, "measureendorsement-list", {"endorser": "BRO"}),
+    ],
+)
+def test_invalid_filter_value(drf_rf, viewset, url_name, params):
+    response, data = list_filtered(drf_rf, viewset, url_name, **params)
+
+    assert response.status_code == 400
+    assert list(data) == list(params)
+
+
+def test_unlisted_parameters_are_ignored(drf_rf, measure):
+    _, data = list_filtered(drf_rf, MeasureViewSet, "measure-list", name="other")
+
+    assert [r["id"] for r in data["results"]] == [measure.pk]
+
+
+def test_tombstone_resource_filter(drf_rf):
+    baker.make(Tombstone, resource="seat", object_id=1)
+    candidate = baker.make(Tombstone, resource="candidate", object_id=1)
+
+    _, data = list_filtered(
+        drf_rf, TombstoneViewSet, "tombstone-list", resource="candidate"
+    )
+
+    assert [r["id"] for r in data["results"]] == [candidate.pk]
+
+
+@pytest.fixture
+def candidates():
+    return [
+        baker.make(Candidate, first_name="Tina", last_name="Kotek"),
+        baker.make(
+            Candidate, first_name="Betsy", middle_name="Tina", last_name="Johnson"
+        ),
+        baker.make(Candidate, first_name="Christine", last_name="Drazan"),
+    ]
+
+
+def test_candidate_search(drf_rf, candidates):
+    kotek, johnson, _ = candidates
+
+    _, data = list_filtered(drf_rf, CandidateViewSet, "candidate-list", search="tina")
+    # A first name matches both as a word and by its trigrams
+    assert [r["id"] for r in data["results"]] == [kotek.pk, johnson.pk]
+
+    # Misspelt and partly typed names are matched by trigrams
+    _, data = list_filtered(drf_rf, CandidateViewSet, "candidate-list", search="Kotk")
+    assert [r["id"] for r in data["results"]] == [kotek.pk]
+    _, data = list_filtered(drf_rf, CandidateViewSet, "candidate-list", search="Dra")
+    assert [r["first_name"] for r in data["results"]] == ["Christine"]
+
+    _, data = list_filtered(drf_rf, CandidateViewSet, "candidate-list", search="Smith")
+    assert data["results"] == []
+
+
+def test_measure_search(drf_rf):
+    firearms = baker.make(
+        Measure, name="Measure 114", description="Requires a permit to buy firearms"
+    )
+    permits = baker.make(Measure, name="Permit Fees", description="Raises fees")
+    baker.make(Measure, name="Measure 111", description="Makes health care a right")
+
+    _, data = list_filtered(drf_rf, MeasureViewSet, "measure-list", search="permits")
+
+    # Words are stemmed, and ranked higher in the name than in the description
+    assert [r["id"] for r in data["results"]] == [permits.pk, firearms.pk]
+
+
+def test_search_pages_by_rank(drf_rf, candidates):
+    baker.make(Candidate, first_name="Tina", last_name="Turner")
+    expected = [r["id"] for r in list_search(drf_rf, page_size=100)]
+
+    ids = []
+    params = {"search": "tina", "page_size": 1}
+    url = reverse("candidate-list")
+    while url:
+        request = drf_rf.get(url, data=params)
+        response = CandidateViewSet.as_view({"get": "list"})(request).render()
+        data = json.loads(response.content)
+        ids += [r["id"] for r in data["results"]]
+        url, params = data["next"], None
+
+    assert len(expected) == 3
+    assert ids == expected
+
+
+def test_search_with_other_orderings(drf_rf, candidates):
+    kotek, johnson, _ = candidates
+
+    by_id = list_search(drf_rf, ordering="id")
+    expanded = list_search(drf_rf, expand="seat")
+
+    assert [r["id"] for r in by_id] == sorted([kotek.pk, johnson.pk])
+    assert [r["id"] for r in expanded] == [kotek.pk, johnson.pk]
+
+
+def test_rank_ordering_requires_search(drf_rf, candidates):
+    response, _ = list_filtered(
+        drf_rf, CandidateViewSet, "candidate-list", ordering="rank"
+    )
+
+    assert response.status_code == 404
+
+
+def test_search_is_ignored_without_indexes(drf_rf, seat):
+    _, data = list_filtered(drf_rf, SeatViewSet, "seat-list", search="Governor")
+
+    assert [r["id"] for r in data["results"]] == [seat.pk]
+
+
+class TestIndexUsage:
+    """
+    Each filter path is planned at a realistic volume against its index, in the
+    shape the list view runs it: filtered, ordered by id and limited to a page.
+    """
+
+    @pytest.fixture(autouse=True)
+    def dataset(self):
+        endorsers = Endorser.objects.bulk_create(
+            Endorser(name=f"Endorser {n}", abbreviation=f"E{n}") for n in range(50)
+        )
+        seats = Seat.objects.bulk_create(
+            Seat(
+                level=level,
+                role="Representative",
+                state=state,
+                county=f"County {district % 30}" if level == "T" else "",
+                district=district,
+            )
+            for state in STATES
+            for level in ("F", "S", "T")
+            for district in range(1, 501)
+        )
+        Candidate.objects.bulk_create(
+            Candidate(
+                first_name=f"Candidate {n}",
+                # Most candidates are not running for anything at any one time
+                running_for_seat=seats[n] if n % 10 == 0 else None,
+            )
+            for n in range(len(seats))
+        )
+        measures = Measure.objects.bulk_create(
+            Measure(
+                level="S",
+                name=f"Measure {n}",
+                state=state,
+                election_date=election_date,
+            )
+            for state in STATES
+            for election_date in ELECTION_DATES
+            for n in range(25)
+        )
+        MeasureEndorsement.objects.bulk_create(
+            MeasureEndorsement(
+                endorser=endorsers[n % len(endorsers)],
+                measure=measure,
+                election_date=measure.election_date,
+                url="https://example.com",
+                recommendation="Y",
+            )
+            for n, measure in enumerate(measures)
+        )
+        SeatEndorsement.objects.bulk_create(
+            SeatEndorsement(
+                endorser=endorsers[n % len(endorsers)],
+                seat=seat,
+                election_date=ELECTION_DATES[n % len(ELECTION_DATES)],
+                url="https://example.com",
+            )
+            for n, seat in enumerate(seats)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return {"endorsers": endorsers, "seats": seats}
+
+    def explain(self, viewset, **params):
+        view = viewset()
+        request = Request(APIRequestFactory().get("/", data=params))
+        queryset = FieldFilter().filter_queryset(request, view.queryset, view)
+        return queryset.order_by("id")[:101].explain()
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"state": "OR", "level": "S", "district": 12},
+            {"state": "OR", "level": "T", "county": "County 7"},
+            {"state": "WA", "level": "F", "county": "", "city": "", "district": 3},
+        ],
+    )
+    def test_seat_jurisdiction(self, params):
+        assert "seat_jurisdiction" in self.explain(SeatViewSet, **params)
+
+    def test_measure_state_date(self):
+        plan = self.explain(
+            MeasureViewSet, state="OR", election_date=ELECTION_DATES[3].isoformat()
+        )
+        assert "measure_state_date" in plan
+
+    @pytest.mark.parametrize(
+        "viewset,index",
+        [
+            (SeatEndorsementViewSet, "seat_endorsement_date"),
+            (MeasureEndorsementViewSet, "measure_endorsement_date"),
+        ],
+    )
+    def test_endorsement_date(self, dataset, viewset, index):
+        plan = self.explain(
+            viewset,
+            election_date=ELECTION_DATES[5].isoformat(),
+            endorser=dataset["endorsers"][5].pk,
+        )
+        assert index in plan
+
+    def test_candidate_running_for_seat(self, dataset):
+        plan = self.explain(CandidateViewSet, running_for_seat=dataset["seats"][120].pk)
+        assert "candidate_running_for_seat" in plan
+
+    def explain_search(self, viewset, search):
+        # Rows inserted into a GIN index wait in its pending list until VACUUM,
+        # which would make the plan depend on whether autovacuum has run yet
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT gin_clean_pending_list(indexrelid) FROM pg_index "
+                "JOIN pg_class ON pg_class.oid = indexrelid "
+                "JOIN pg_am ON pg_am.oid = relam WHERE amname = 'gin'"
+            )
+        view = viewset()
+        request = Request(APIRequestFactory().get("/", data={"search": search}))
+        queryset = SearchFilter().filter_queryset(request, view.queryset, view)
+        return queryset.order_by("-search_rank", "id")[:101].explain()
+
+    @pytest.mark.parametrize(
+        "viewset,indexes",
+        [
+            (
+                CandidateViewSet,
+                [
+                    "candidate_search",
+                    "candidate_first_name_trgm",
+                    "candidate_last_name_trgm",
+                ],
+            ),
+            (MeasureViewSet, ["measure_search", "measure_name_trgm"]),
+        ],
+    )
+    def test_search(self, viewset, indexes):
+        plan = self.explain_search(viewset, "Kotek")
+        assert all(index in plan for index in indexes)
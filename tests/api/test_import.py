@@ -0,0 +1,388 @@
+import json
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from model_bakery import baker
+
+from voterguide.api.importer import CopyImporter
+from voterguide.api.models import (
+    BallotSnapshot,
+    Candidate,
+    Endorser,
+    Measure,
+    MeasureEndorsement,
+    Seat,
+    SeatEndorsement,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def import_file(path, resource, *args):
+    stdout, stderr = StringIO(), StringIO()
+    call_command(
+        "import_election_data", resource, str(path), *args, stdout=stdout, stderr=stderr
+    )
+    return stdout.getvalue(), stderr.getvalue()
+
+
+def write_ndjson(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return path
+
+
+def test_import_seats_then_candidates(tmp_path):
+    seats = tmp_path / "seats.csv"
+    seats.write_text(
+        "level,branch,role,body,district,state\n" "S,E,Governor,,,OR\n" "F,L,,H,3,OR\n"
+    )
+    candidates = write_ndjson(
+        tmp_path / "candidates.ndjson",
+        [
+            {
+                "first_name": "Tina",
+                "last_name": "Kotek",
+                "party": "D",
+                "running_for_seat": {
+                    "level": "S",
+                    "branch": "E",
+                    "role": "governor",
+                    "state": "OR",
+                },
+            },
+            {
+                "first_name": "Earl",
+                "last_name": "Blumenauer",
+                "party": "D",
+                "date_of_birth": "1948-08-16",
+                "seat": {
+                    "level": "F",
+                    "branch": "L",
+                    "body": "H",
+                    "district": 3,
+                    "state": "OR",
+                },
+            },
+        ],
+    )
+
+    import_file(seats, "seats")
+    _, errors = import_file(candidates, "candidates")
+
+    assert errors == ""
+    governor = Seat.objects.get(role="Governor")
+    representative = Seat.objects.get(role="Representative", district=3)
+    kotek = Candidate.objects.get(last_name="Kotek")
+    assert kotek.running_for_seat == governor
+    assert kotek.date_of_birth is None
+    blumenauer = Candidate.objects.get(last_name="Blumenauer")
+    assert blumenauer.seat == representative
+    assert blumenauer.date_of_birth == date(1948, 8, 16)
+
+
+def test_reimport_updates_rows(tmp_path):
+    path = write_ndjson(
+        tmp_path / "measures.ndjson",
+        [
+            {
+                "level": "S",
+                "name": "26-232",
+                "state": "OR",
+                "election_date": "2022-11-08",
+            }
+        ],
+    )
+    import_file(path, "measures")
+    measure = Measure.objects.get()
+
+    write_ndjson(
+        path,
+        [
+            {
+                "level": "S",
+                "name": "26-232",
+                "state": "OR",
+                "election_date": "2022-11-08",
+                "passed": True,
+            }
+        ],
+    )
+    import_file(path, "measures")
+
+    (updated,) = Measure.objects.all()
+    assert updated.pk == measure.pk
+    assert updated.passed is True
+
+
+def test_rejected_rows_are_reported(tmp_path, seat):
+    path = tmp_path / "candidates.jsonl"
+    path.write_text(
+        '{"first_name": "Tina", "last_name": "Kotek"}\n'
+        "\n"
+        "not json\n"
+        '{"last_name": "Drazan", "party": "R"}\n'
+        '{"first_name": "Betsy", "seat": {"level": "S", "role": "Mayor", "state": "OR"}}\n'
+        '{"first_name": "Christine", "nickname": "Chris"}\n'
+    )
+
+    output, errors = import_file(path, "candidates")
+
+    lines = errors.splitlines()
+    assert [line.split(" rejected")[0] for line in lines] == [
+        "Line 3",
+        "Line 4",
+        "Line 5",
+        "Line 6",
+    ]
+    assert "first_name" in lines[1]
+    assert 'seat: No seat matches {"level": "S"' in lines[2]
+    assert "nickname: Unknown field." in lines[3]
+    assert "Imported 1 candidates, rejected 4." in output
+    assert list(Candidate.objects.values_list("first_name", flat=True)) == ["Tina"]
+
+
+def test_chunks_are_written_separately(tmp_path):
+    rows = [{"name": f"Endorser {n}", "abbreviation": f"E{n}"} for n in range(5)]
+    # The last row with a key wins, across chunks as within one
+    rows[1]["abbreviation"] = "E0"
+    rows.append({"name": "Endorser 4, renamed", "abbreviation": "E4"})
+    path = write_ndjson(tmp_path / "endorsers.ndjson", rows)
+
+    output, _ = import_file(path, "endorsers", "--chunk-size", "2")
+
+    assert [line.split(" (")[0] for line in output.splitlines()[:3]] == [
+        "2 rows read: 1 written, 0 rejected",
+        "4 rows read: 3 written, 0 rejected",
+        "6 rows read: 4 written, 0 rejected",
+    ]
+    assert dict(Endorser.objects.values_list("abbreviation", "name")) == {
+        "E0": "Endorser 1",
+        "E2": "Endorser 2",
+        "E3": "Endorser 3",
+        "E4": "Endorser 4, renamed",
+    }
+
+
+def test_import_seat_endorsements_from_csv(tmp_path, endorser, seat):
+    cameron, joe, _ = baker.make(
+        Candidate,
+        first_name=iter(["Cameron", "Joe", "Gordon"]),
+        last_name=iter(["Howe", "MacMillan", "Clark"]),
+        _quantity=3,
+    )
+    existing = baker.make(
+        SeatEndorsement,
+        endorser=endorser,
+        seat=seat,
+        election_date=date(2022, 11, 8),
+        candidates=[joe],
+    )
+    path = tmp_path / "endorsements.csv"
+    path.write_text(
+        "endorser,election_date,url,seat.level,seat.branch,seat.role,seat.state,"
+        "candidates.0.first_name,candidates.0.last_name,"
+        "candidates.1.first_name,candidates.1.last_name\n"
+        "BRO,2022-11-08,https://example.com/a,S,E,Governor,OR,cameron,howe,,\n"
+        "BRO,2024-11-05,https://example.com/b,S,E,Governor,OR,Joe,MacMillan,"
+        "Cameron,Howe\n"
+    )
+
+    _, errors = import_file(path, "seat-endorsements")
+
+    assert errors == ""
+    existing.refresh_from_db()
+    assert existing.url == "https://example.com/a"
+    assert list(existing.candidates.all()) == [cameron]
+    later = SeatEndorsement.objects.get(election_date=date(2024, 11, 5))
+    assert set(later.candidates.all()) == {cameron, joe}
+
+
+@pytest.mark.parametrize("args", [(), ("--copy",)])
+def test_reimport_without_candidates_keeps_them(tmp_path, endorser, seat, args):
+    existing = baker.make(
+        SeatEndorsement,
+        endorser=endorser,
+        seat=seat,
+        election_date=date(2022, 11, 8),
+        candidates=baker.make(Candidate, _quantity=2),
+    )
+    path = tmp_path / "endorsements.csv"
+    path.write_text(
+        "endorser,election_date,url,seat.level,seat.branch,seat.role,seat.state\n"
+        "BRO,2022-11-08,https://example.com/new,S,E,Governor,OR\n"
+    )
+
+    _, errors = import_file(path, "seat-endorsements", *args)
+
+    assert errors == ""
+    existing.refresh_from_db()
+    assert existing.url == "https://example.com/new"
+    assert existing.candidates.count() == 2
+
+
+def test_empty_candidate_columns_clear_them(tmp_path, endorser, seat):
+    existing = baker.make(
+        SeatEndorsement,
+        endorser=endorser,
+        seat=seat,
+        election_date=date(2022, 11, 8),
+        candidates=baker.make(Candidate, _quantity=2),
+    )
+    path = tmp_path / "endorsements.csv"
+    path.write_text(
+        "endorser,election_date,url,seat.level,seat.branch,seat.role,seat.state,"
+        "candidates.0.first_name,candidates.0.last_name\n"
+        "BRO,2022-11-08,https://example.com,S,E,Governor,OR,,\n"
+    )
+
+    _, errors = import_file(path, "seat-endorsements")
+
+    assert errors == ""
+    assert not existing.candidates.exists()
+
+
+def test_import_measure_endorsements(tmp_path, endorser, measure):
+    path = write_ndjson(
+        tmp_path / "endorsements.ndjson",
+        [
+            {
+                "endorser": {"abbreviation": "BRO"},
+                "measure": {
+                    "name": "26-232",
+                    "election_date": "2022-11-08",
+                    "state": "OR",
+                },
+                "election_date": "2022-11-08",
+                "url": "https://example.com",
+                "recommendation": "Y",
+            }
+        ],
+    )
+
+    import_file(path, "measure-endorsements")
+
+    (endorsement,) = MeasureEndorsement.objects.all()
+    assert endorsement.measure == measure
+    assert endorsement.endorser == endorser
+
+
+def test_import_discards_snapshots(tmp_path, django_capture_on_commit_callbacks):
+    BallotSnapshot.objects.create(
+        key=BallotSnapshot.make_key("OR", date(2024, 11, 5)),
+        state="OR",
+        election_date=date(2024, 11, 5),
+        document={},
+    )
+    path = write_ndjson(
+        tmp_path / "seats.ndjson", [{"level": "S", "role": "Governor", "state": "OR"}]
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        import_file(path, "seats")
+
+    assert not BallotSnapshot.objects.exists()
+
+
+def test_format_must_be_known(tmp_path):
+    path = tmp_path / "seats.txt"
+    path.write_text("")
+
+    with pytest.raises(CommandError, match="--format"):
+        import_file(path, "seats")
+
+
+class TestCopy:
+    def test_copy_merges_on_each_constraint(self, tmp_path, seat):
+        no_dob = baker.make(Candidate, first_name="Cameron", last_name="Howe")
+        with_dob = baker.make(
+            Candidate,
+            first_name="Cameron",
+            last_name="Howe",
+            date_of_birth=date(1961, 1, 1),
+        )
+        path = tmp_path / "candidates.csv"
+        path.write_text(
+            "first_name,last_name,date_of_birth,party,"
+            "running_for_seat.level,running_for_seat.branch,"
+            "running_for_seat.role,running_for_seat.state\n"
+            "CAMERON,Howe,,D,,,,\n"
+            "cameron,howe,1961-01-01,G,S,E,Governor,OR\n"
+            "Donna,Clark,,W,,,,\n"
+            # Tabs, backslashes and newlines survive the COPY
+            '"Joe\tMac\\Millan","Mac\nMillan",,R,,,,\n'
+            "Donna,Clark,,C,,,,\n"
+        )
+
+        output, errors = import_file(path, "candidates", "--copy", "--chunk-size", "2")
+
+        assert errors == ""
+        assert "Imported 4 candidates, rejected 0." in output
+        assert Candidate.objects.count() == 4
+        no_dob.refresh_from_db()
+        assert (no_dob.first_name, no_dob.party) == ("CAMERON", "D")
+        with_dob.refresh_from_db()
+        assert (with_dob.party, with_dob.running_for_seat) == ("G", seat)
+        assert Candidate.objects.get(first_name="Donna").party == "C"
+        joe = Candidate.objects.get(party="R")
+        assert (joe.first_name, joe.last_name) == ("Joe\tMac\\Millan", "Mac\nMillan")
+
+    def test_copy_sets_many_to_many(self, tmp_path, endorser, seat):
+        cameron, joe = baker.make(
+            Candidate, first_name=iter(["Cameron", "Joe"]), _quantity=2
+        )
+        existing = baker.make(
+            SeatEndorsement,
+            endorser=endorser,
+            seat=seat,
+            election_date=date(2022, 11, 8),
+            candidates=[cameron],
+        )
+        reference = {"level": "S", "branch": "E", "role": "Governor", "state": "OR"}
+        path = write_ndjson(
+            tmp_path / "endorsements.ndjson",
+            [
+                {
+                    "endorser": "BRO",
+                    "seat": reference,
+                    "election_date": "2022-11-08",
+                    "url": "https://example.com",
+                    "candidates": [{"first_name": "joe", "last_name": ""}],
+                },
+                {
+                    "endorser": "BRO",
+                    "seat": reference,
+                    "election_date": "2024-11-05",
+                    "url": "https://example.com",
+                    "candidates": [{"first_name": "Cameron", "last_name": ""}],
+                },
+            ],
+        )
+
+        import_file(path, "seat-endorsements", "--copy")
+
+        assert list(existing.candidates.all()) == [joe]
+        later = SeatEndorsement.objects.get(election_date=date(2024, 11, 5))
+        assert list(later.candidates.all()) == [cameron]
+
+    def test_failed_merge_rejects_every_row(self, tmp_path, monkeypatch):
+        def merge(*args):
+            raise IntegrityError("conflict")
+
+        monkeypatch.setattr(CopyImporter, "merge", merge)
+        path = write_ndjson(
+            tmp_path / "endorsers.ndjson",
+            [{"name": "Basic Rights Oregon", "abbreviation": "BRO"}, {"name": ""}],
+        )
+
+        output, errors = import_file(path, "endorsers", "--copy")
+
+        assert [line.split(" rejected")[0] for line in errors.splitlines()] == [
+            "Line 2",
+            "Line 1",
+        ]
+        assert "Line 1 rejected: __all__: conflict" in errors
+        assert "Imported 0 endorsers, rejected 2." in output
+        assert not Endorser.objects.exists()
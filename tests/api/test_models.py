@@ -718,6 +718,48 @@ def test_seat_unique_validation(data):
         Seat.objects.create(**data)
 
 
+def test_seat_unique_validation_ignores_case():
+    Seat.objects.create(level="C", role="Mayor", state="OR", city="Portland")
+    with pytest.raises(ValidationError, match="Seat must be unique"):
+        Seat.objects.create(level="C", role="mayor", state="OR", city="PORTLAND")
+
+
+def test_seat_update_is_not_a_duplicate():
+    seat = Seat.objects.create(level="F", branch="E", role="President")
+    seat.role = "president"
+    seat.save()
+
+
+def test_seat_unique_identity_constraint():
+    # bulk_create() skips validation, leaving uniqueness to the database
+    seats = [
+        Seat(level="S", role="Governor", state="OR"),
+        Seat(level="S", role="governor", state="OR"),
+    ]
+    with pytest.raises(IntegrityError, match="seat_unique_identity"):
+        Seat.objects.bulk_create(seats)
+
+
+def test_seat_find_duplicates(django_assert_num_queries):
+    stored = Seat.objects.create(
+        level="F", body="H", role="Representative", state="OR", district=1
+    )
+    seats = [
+        stored,
+        Seat(level="F", body="H", role="Representative", state="OR", district=2),
+        Seat(level="F", body="H", role="REPRESENTATIVE", state="OR", district=1),
+        Seat(level="F", body="H", role="Representative", state="OR", district=2),
+        Seat(level="F", branch="E", role="President"),
+    ]
+
+    with django_assert_num_queries(1):
+        duplicates = Seat.objects.find_duplicates(seats)
+
+    assert duplicates == {2, 3}
+    assert Seat.objects.find_duplicates(seats, existing=False) == {2, 3}
+    assert Seat.objects.find_duplicates(seats[1:], existing=False) == {2}
+
+
 # MeasureEndorsement
 def test_measure_endorsement_create_valid_instance(endorser, measure):
     e = MeasureEndorsement.objects.create(
@@ -0,0 +1,93 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from model_bakery import baker
+
+from voterguide.api.models import Candidate, Endorser
+from voterguide.api.views import CandidateViewSet, EndorserViewSet
+
+pytestmark = pytest.mark.django_db
+
+
+def get_page(drf_rf, viewset, url):
+    view = viewset.as_view({"get": "list"})
+    response = view(drf_rf.get(url)).render()
+    return response, json.loads(response.content)
+
+
+def test_pages_follow_primary_key(drf_rf):
+    candidates = baker.make(Candidate, _quantity=7)
+    url = f"{reverse('candidate-list')}?page_size=3"
+
+    seen = []
+    while url:
+        response, data = get_page(drf_rf, CandidateViewSet, url)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in data["results"])
+        url = data["next"]
+
+    assert seen == sorted(c.id for c in candidates)
+
+
+def test_previous_link_returns_prior_page(drf_rf):
+    baker.make(Candidate, _quantity=5)
+    _, first = get_page(
+        drf_rf, CandidateViewSet, f"{reverse('candidate-list')}?page_size=2"
+    )
+    _, second = get_page(drf_rf, CandidateViewSet, first["next"])
+    _, previous = get_page(drf_rf, CandidateViewSet, second["previous"])
+
+    assert first["previous"] is None
+    assert previous["results"] == first["results"]
+    assert previous["previous"] is None
+
+
+def test_last_updated_ordering_breaks_ties_on_id(drf_rf):
+    endorsers = baker.make(Endorser, _quantity=4)
+    # Give two rows an identical timestamp so the id tiebreaker is exercised.
+    stamp = timezone.now() - timedelta(days=1)
+    Endorser.objects.filter(pk__in=[endorsers[3].pk, endorsers[1].pk]).update(
+        last_updated=stamp
+    )
+    url = f"{reverse('endorser-list')}?ordering=last_updated&page_size=1"
+
+    seen = []
+    while url:
+        _, data = get_page(drf_rf, EndorserViewSet, url)
+        seen.extend(item["id"] for item in data["results"])
+        url = data["next"]
+
+    assert seen[:2] == [endorsers[1].pk, endorsers[3].pk]
+    assert sorted(seen) == sorted(e.pk for e in endorsers)
+
+
+def test_deep_page_issues_no_offset_or_count(drf_rf):
+    baker.make(Candidate, _quantity=6)
+    _, data = get_page(
+        drf_rf, CandidateViewSet, f"{reverse('candidate-list')}?page_size=2"
+    )
+    _, data = get_page(drf_rf, CandidateViewSet, data["next"])
+
+    with CaptureQueriesContext(connection) as queries:
+        get_page(drf_rf, CandidateViewSet, data["next"])
+
+    sql = " ".join(query["sql"].upper() for query in queries.captured_queries)
+    assert len(queries.captured_queries) == 1
+    assert "OFFSET" not in sql
+    assert "COUNT(" not in sql
+
+
+@pytest.mark.parametrize(
+    "query", ["cursor=not-a-cursor", "cursor=eyJvIjoiaWQifQ%3D%3D", "ordering=name"]
+)
+def test_invalid_cursor_or_ordering(drf_rf, query):
+    response, _ = get_page(
+        drf_rf, CandidateViewSet, f"{reverse('candidate-list')}?{query}"
+    )
+
+    assert response.status_code == 404
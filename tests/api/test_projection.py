@@ -0,0 +1,144 @@
+import json
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
+
+from voterguide.api.models import (
+    Candidate,
+    Endorser,
+    Measure,
+    MeasureEndorsement,
+    Seat,
+    SeatEndorsement,
+    Tombstone,
+)
+from voterguide.api.projection import get_projection
+from voterguide.api.serializers import (
+    CandidateSerializer,
+    EndorserSerializer,
+    MeasureEndorsementSerializer,
+    MeasureSerializer,
+    SeatEndorsementSerializer,
+    SeatSerializer,
+    TombstoneSerializer,
+)
+from voterguide.api.views import (
+    CandidateViewSet,
+    EndorserViewSet,
+    MeasureEndorsementViewSet,
+    MeasureViewSet,
+    SeatEndorsementViewSet,
+    SeatViewSet,
+    TombstoneViewSet,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def get(drf_rf, viewset, url_name, **params):
+    request = drf_rf.get(reverse(url_name), data=params)
+    with CaptureQueriesContext(connection) as context:
+        response = viewset.as_view({"get": "list"})(request).render()
+    return json.loads(response.content), context.captured_queries
+
+
+def serialize(drf_rf, serializer_class, queryset):
+    context = {"request": drf_rf.get("/")}
+    data = serializer_class(queryset.order_by("pk"), many=True, context=context).data
+    return json.loads(JSONRenderer().render(data))
+
+
+@pytest.fixture
+def rows(seat, measure, endorser):
+    candidates = [
+        baker.make(Candidate, running_for_seat=seat, seat=seat),
+        baker.make(Candidate, date_of_birth=None, middle_name="Q"),
+    ]
+    city_seat = Seat.objects.create(
+        level="C", branch="E", role="Mayor", state="OR", city="Portland", district=3
+    )
+    baker.make(Measure, level="S", state="WA", election_date=date(2024, 11, 5))
+    baker.make(MeasureEndorsement, endorser=endorser, measure=measure)
+    endorsement = baker.make(SeatEndorsement, endorser=endorser, seat=seat)
+    endorsement.candidates.set(candidates)
+    baker.make(SeatEndorsement, endorser=endorser, seat=city_seat)
+    baker.make(Tombstone, resource="candidate", object_id=123)
+
+
+@pytest.mark.parametrize(
+    "viewset,url_name,serializer_class,model",
+    [
+        (CandidateViewSet, "candidate-list", CandidateSerializer, Candidate),
+        (EndorserViewSet, "endorser-list", EndorserSerializer, Endorser),
+        (MeasureViewSet, "measure-list", MeasureSerializer, Measure),
+        (SeatViewSet, "seat-list", SeatSerializer, Seat),
+        (
+            MeasureEndorsementViewSet,
+            "measureendorsement-list",
+            MeasureEndorsementSerializer,
+            MeasureEndorsement,
+        ),
+        (
+            SeatEndorsementViewSet,
+            "seatendorsement-list",
+            SeatEndorsementSerializer,
+            SeatEndorsement,
+        ),
+        (TombstoneViewSet, "tombstone-list", TombstoneSerializer, Tombstone),
+    ],
+)
+def test_list_matches_serializer(
+    drf_rf, rows, viewset, url_name, serializer_class, model
+):
+    data, _ = get(drf_rf, viewset, url_name)
+
+    assert data["results"] == serialize(drf_rf, serializer_class, model.objects)
+    assert [list(result) for result in data["results"]] == [
+        list(serializer_class().fields)
+    ] * model.objects.count()
+
+
+def test_list_reads_values(drf_rf, rows):
+    data, queries = get(drf_rf, SeatEndorsementViewSet, "seatendorsement-list")
+
+    # The page and the candidates of every row on it
+    assert len(queries) == 2
+    assert sorted(len(result["candidates"]) for result in data["results"]) == [0, 2]
+
+
+def test_list_pages_from_values(drf_rf, rows):
+    data, _ = get(drf_rf, CandidateViewSet, "candidate-list", page_size=1)
+    request = drf_rf.get(data["next"])
+    response = CandidateViewSet.as_view({"get": "list"})(request).render()
+    following = json.loads(response.content)
+
+    assert [data["results"][0]["id"], following["results"][0]["id"]] == list(
+        Candidate.objects.order_by("pk").values_list("pk", flat=True)
+    )
+
+
+def test_list_with_fields(drf_rf, rows):
+    data, queries = get(
+        drf_rf, SeatEndorsementViewSet, "seatendorsement-list", fields="id,seat"
+    )
+
+    assert [list(result) for result in data["results"]] == [["id", "seat"]] * 2
+    assert len(queries) == 1
+
+
+def test_expanded_list_uses_serializer(drf_rf, rows):
+    data, _ = get(drf_rf, CandidateViewSet, "candidate-list", expand="seat")
+
+    assert data["results"][0]["seat"]["role"] == "Governor"
+
+
+def test_projection_declines_nested_serializers(drf_rf):
+    serializer = CandidateSerializer(context={"request": drf_rf.get("/")})
+    serializer.fields["seat"] = SeatSerializer(read_only=True)
+
+    assert get_projection(serializer) is None
@@ -0,0 +1,120 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import StringIO
+
+import msgpack
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import force_authenticate
+
+from voterguide.api.models import Candidate, Endorser, Seat, SeatEndorsement
+from voterguide.api.renderers import ORJSONRenderer
+from voterguide.api.serializers import CandidateSerializer, SeatEndorsementSerializer
+from voterguide.api.views import CandidateViewSet, EndorserViewSet
+
+pytestmark = pytest.mark.django_db
+
+
+def test_orjson_matches_json_renderer(drf_rf, seat):
+    candidates = baker.make(Candidate, running_for_seat=seat, _quantity=3)
+    endorsement = baker.make(SeatEndorsement, seat=seat, candidates=candidates)
+    context = {"request": drf_rf.get("/")}
+    data = {
+        "candidates": CandidateSerializer(candidates, many=True, context=context).data,
+        "endorsement": SeatEndorsementSerializer(endorsement, context=context).data,
+        "decimal": Decimal("1.50"),
+        "lazy": gettext_lazy("Federal"),
+        "datetime": datetime(2024, 11, 5, 20, 0, 0, 123456, tzinfo=timezone.utc),
+        "separators": "\u2028\u2029",
+        "unicode": "Gómez",
+        1: None,
+    }
+
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_orjson_indent_falls_back_to_stdlib():
+    rendered = ORJSONRenderer().render(
+        {"a": [1]}, "application/json; encoder=orjson; indent=4"
+    )
+
+    assert rendered == b'{\n    "a": [\n        1\n    ]\n}'
+
+
+@pytest.mark.parametrize(
+    "params,headers",
+    [
+        ({"format": "orjson"}, {}),
+        ({}, {"HTTP_ACCEPT": "application/json; encoder=orjson"}),
+    ],
+)
+def test_orjson_is_negotiated(drf_rf, candidate, params, headers):
+    request = drf_rf.get(reverse("candidate-list"), data=params, **headers)
+    response = CandidateViewSet.as_view({"get": "list"})(request).render()
+
+    assert response["Content-Type"] == "application/json; encoder=orjson"
+    assert json.loads(response.content)["results"][0]["id"] == candidate.pk
+
+
+def test_json_stays_the_default(drf_rf, candidate):
+    request = drf_rf.get(reverse("candidate-list"), HTTP_ACCEPT="application/json")
+    response = CandidateViewSet.as_view({"get": "list"})(request).render()
+
+    assert response["Content-Type"] == "application/json"
+
+
+def test_benchmark_renderers_rolls_back():
+    stdout = StringIO()
+
+    call_command("benchmark_renderers", rows=3, repeat=1, stdout=stdout)
+
+    assert "3 candidates" in stdout.getvalue()
+    assert "orjson" in stdout.getvalue()
+    assert "values" in stdout.getvalue()
+    assert not Seat.objects.exists()
+
+
+def test_msgpack_list_with_version(drf_rf, candidate):
+    request = drf_rf.get(
+        reverse("candidate-list"), HTTP_ACCEPT="application/msgpack; version=2"
+    )
+    response = CandidateViewSet.as_view({"get": "list"})(request).render()
+
+    assert response["Content-Type"] == "application/msgpack"
+    assert response.renderer_context["request"].version == "2"
+    data = msgpack.unpackb(response.content)
+    assert data["results"][0]["first_name"] == candidate.first_name
+    assert data["results"][0]["date_of_birth"] == "1961-01-01"
+    assert len(response.content) < len(JSONRenderer().render(response.data))
+
+
+def test_msgpack_request_body(drf_rf, user):
+    body = msgpack.packb({"name": "Basic Rights Oregon", "abbreviation": "BRO"})
+    request = drf_rf.post(
+        reverse("endorser-list"),
+        data=body,
+        content_type="application/msgpack",
+    )
+    force_authenticate(request, user=user)
+
+    response = EndorserViewSet.as_view({"post": "create"})(request).render()
+
+    assert response.status_code == 201
+    assert Endorser.objects.get().abbreviation == "BRO"
+
+
+def test_invalid_msgpack_request_body(drf_rf, user):
+    request = drf_rf.post(
+        reverse("endorser-list"), data=b"\xc1", content_type="application/msgpack"
+    )
+    force_authenticate(request, user=user)
+
+    response = EndorserViewSet.as_view({"post": "create"})(request).render()
+
+    assert response.status_code == 400
+    assert "MessagePack parse error" in json.loads(response.content)["detail"]
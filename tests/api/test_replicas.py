@@ -0,0 +1,80 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import router
+from django.http import HttpResponse
+
+from voterguide.api.models import Candidate
+from voterguide.api.replicas import PIN_COOKIE, replica_middleware
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica_1"]
+    return settings.DATABASE_REPLICAS
+
+
+def read_alias(request, status=200):
+    aliases = []
+
+    def view(request):
+        aliases.append(Candidate.objects.all().db)
+        return HttpResponse(status=status)
+
+    response = replica_middleware(view)(request)
+    return aliases[0], response
+
+
+def test_reads_go_to_a_replica(rf, replicas):
+    alias, response = read_alias(rf.get("/candidates/"))
+
+    assert alias == "replica_1"
+    assert PIN_COOKIE not in response.cookies
+    assert Candidate.objects.all().db == "default"
+
+
+def test_writes_go_to_the_primary_and_pin_the_client(rf, replicas):
+    alias, response = read_alias(rf.post("/candidates/"))
+
+    assert alias == "default"
+    assert router.db_for_write(Candidate) == "default"
+    assert response.cookies[PIN_COOKIE]["max-age"] == 5
+
+
+def test_failed_writes_do_not_pin_the_client(rf, replicas):
+    _, response = read_alias(rf.post("/candidates/"), status=400)
+
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_pinned_client_reads_from_the_primary(rf, replicas):
+    request = rf.get("/candidates/")
+    request.COOKIES[PIN_COOKIE] = "1"
+
+    alias, _ = read_alias(request)
+
+    assert alias == "default"
+
+
+def test_reads_go_to_the_primary_without_replicas(rf, settings):
+    settings.DATABASE_REPLICAS = []
+
+    alias, _ = read_alias(rf.get("/candidates/"))
+
+    assert alias == "default"
+
+
+def test_async_reads_go_to_a_replica(rf, replicas):
+    aliases = []
+
+    async def view(request):
+        aliases.append(Candidate.objects.all().db)
+        return HttpResponse()
+
+    async_to_sync(replica_middleware(view))(rf.get("/candidates/"))
+
+    assert aliases == ["replica_1"]
+
+
+def test_replicas_are_not_migrated(replicas):
+    assert not router.allow_migrate("replica_1", "api")
+    assert router.allow_migrate("default", "api")
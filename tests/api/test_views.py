@@ -102,7 +102,7 @@ class TestList:
         response = view(request).render()
 
         assert response.status_code == 200
-        assert len(json.loads(response.content)) == 3
+        assert len(json.loads(response.content)["results"]) == 3
 
     @pytest.mark.parametrize("authenticated, status_code", [(True, 201), (False, 403)])
     def test_create(
@@ -403,7 +403,7 @@ class TestEndorsements:
         response = view(request).render()
 
         assert response.status_code == 200
-        assert len(json.loads(response.content)) == 3
+        assert len(json.loads(response.content)["results"]) == 3
 
     @pytest.mark.parametrize("authenticated, status_code", [(True, 201), (False, 403)])
     def test_create(
@@ -573,3 +573,57 @@ class TestEndorsements:
                 ObjectDoesNotExist, match=r"matching query does not exist"
             ):
                 model.objects.get(pk=resource_id)
+
+
+class TestSeatEndorsementQueries:
+    @pytest.fixture
+    def endorsements(self):
+        seats = baker.make(
+            Seat,
+            level="S",
+            branch="L",
+            role="Senator",
+            body="S",
+            district=seq(1),
+            state="OR",
+            _quantity=25,
+        )
+        candidates = baker.make(Candidate, _quantity=3)
+        return [
+            baker.make(
+                SeatEndorsement,
+                seat=seat,
+                election_date=date(2022, 11, 8),
+                candidates=candidates,
+            )
+            for seat in seats
+        ]
+
+    def test_list_query_count_is_constant(
+        self, drf_rf, endorsements, django_assert_num_queries
+    ):
+        request = drf_rf.get(f"{reverse('seatendorsement-list')}?page_size=1000")
+        view = SeatEndorsementViewSet.as_view({"get": "list"})
+
+        # One query for the page of endorsements and one for all of their
+        # candidates
+        with django_assert_num_queries(2):
+            response = view(request).render()
+
+        results = json.loads(response.content)["results"]
+        assert len(results) == len(endorsements)
+        assert all(len(result["candidates"]) == 3 for result in results)
+
+    def test_retrieve_query_count(
+        self, drf_rf, endorsements, django_assert_num_queries
+    ):
+        resource = endorsements[0]
+        request = drf_rf.get(
+            reverse("seatendorsement-detail", kwargs={"pk": resource.id})
+        )
+        view = SeatEndorsementViewSet.as_view({"get": "retrieve"})
+
+        with django_assert_num_queries(3):
+            response = view(request, pk=resource.id).render()
+
+        assert json.loads(response.content)["id"] == resource.id
@@ -0,0 +1,57 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from voterguide.accounts.models import CustomUser
+
+
+@pytest.fixture
+def lean(settings):
+    settings.MIDDLEWARE = settings.MIDDLEWARE_PROFILES["lean"]
+
+
+@pytest.mark.django_db
+def test_anonymous_api_request_skips_sessions(lean):
+    response = Client().get("/endorsers/")
+
+    assert response.status_code == 200
+    assert not hasattr(response.wsgi_request, "session")
+    assert not response.cookies
+
+
+@pytest.mark.django_db
+def test_session_request_runs_every_middleware(lean):
+    user = CustomUser.objects.create(email="moira@rosebud.motel")
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+
+    response = client.get("/endorsers/")
+    forbidden = client.post(
+        "/endorsers/", {"name": "Rose Apothecary", "abbreviation": "RA"}
+    )
+
+    assert response.wsgi_request.user == user
+    assert forbidden.status_code == 403
+    assert "CSRF" in forbidden.json()["detail"]
+
+
+@pytest.mark.django_db
+def test_session_paths_run_every_middleware(lean):
+    response = Client().get("/admin/login/")
+
+    assert response.status_code == 200
+    assert "csrftoken" in response.cookies
+
+
+def test_benchmark_middleware():
+    stdout = StringIO()
+
+    call_command("benchmark_middleware", repeat=2, stdout=stdout)
+
+    assert [line.split(" ")[0] for line in stdout.getvalue().splitlines()] == [
+        "default",
+        "lean",
+        "none",
+    ]
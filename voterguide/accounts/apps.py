@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "voterguide.accounts"
+
+    def ready(self):
+        # Connect signal handlers that expire cached token credentials
+        from voterguide.accounts import signals  # noqa: F401
@@ -0,0 +1,78 @@
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Resolved tokens by key, as (user, token, expiry, revision) tuples
+_credentials = {}
+
+
+def revision_key(key):
+    return f"credentials:{key}"
+
+
+def get_revision(key):
+    """
+    Return the revision of a token's credentials, which is replaced whenever
+    the token or its user changes. It is read before the token is resolved, so
+    that a change committed meanwhile leaves the entry under a revision that no
+    longer matches.
+    """
+    return caches[settings.API_GENERATION_CACHE_ALIAS].get(revision_key(key))
+
+
+def forget_tokens(keys):
+    """
+    Drop the cached credentials of the given tokens, in this process and, as
+    their revisions in the shared cache change, in every other one.
+    """
+    caches[settings.API_GENERATION_CACHE_ALIAS].set_many(
+        {revision_key(key): uuid4().hex for key in keys},
+        settings.API_TOKEN_CACHE_TIMEOUT,
+    )
+    for key in keys:
+        _credentials.pop(key, None)
+
+
+def forget_user(user_id):
+    """
+    Drop the cached credentials of a user, e.g. when they are deactivated.
+    """
+    keys = {key for key, (user, *_) in _credentials.items() if user.pk == user_id}
+    keys.update(Token.objects.filter(user_id=user_id).values_list("key", flat=True))
+    forget_tokens(keys)
+
+
+def forget_all():
+    _credentials.clear()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication, with each token's user kept in process memory for
+    `API_TOKEN_CACHE_TIMEOUT` seconds so that repeated calls with a token cost
+    no queries, and no password hashing as with basic authentication.
+
+    Entries are dropped when their user or token is saved or deleted, in other
+    processes too as long as they share the cache (see `CACHES`). Tokens are
+    issued in the admin, or with `manage.py drf_create_token <email>`.
+    """
+
+    def authenticate_credentials(self, key):
+        now = time.monotonic()
+        revision = get_revision(key)
+        cached = _credentials.get(key)
+        if cached is not None and cached[2] > now and cached[3] == revision:
+            return cached[0], cached[1]
+
+        user, token = super().authenticate_credentials(key)
+        _credentials[key] = (
+            user,
+            token,
+            now + settings.API_TOKEN_CACHE_TIMEOUT,
+            revision,
+        )
+        return user, token
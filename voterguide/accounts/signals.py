@@ -0,0 +1,23 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from voterguide.accounts.authentication import forget_tokens, forget_user
+
+# Credentials are forgotten once the change is committed, so that no other
+# process caches the old row again under the new revision
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def forget_user_credentials(sender, instance, **kwargs):
+    # A deactivated user must not stay authenticated through a cached token
+    transaction.on_commit(partial(forget_user, instance.pk))
+
+
+@receiver([post_save, post_delete], sender=Token)
+def forget_token_credentials(sender, instance, **kwargs):
+    transaction.on_commit(partial(forget_tokens, [instance.key]))
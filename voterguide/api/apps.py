@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "voterguide.api"
+
+    def ready(self):
+        # Connect signal handlers that keep ballot snapshots and cached responses current
+        from voterguide.api import signals  # noqa: F401
@@ -0,0 +1,122 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.core.handlers.base import BaseHandler
+from django.db import connections, transaction
+from django.http import Http404
+from rest_framework.response import Response
+
+from voterguide.api.projection import get_projection
+
+
+class AsyncReadMixin:
+    """
+    Serve `list` and `retrieve` from async views using the async ORM, when the
+    `API_ASYNC_VIEWS` setting is enabled for a deployment behind an ASGI server.
+    An async view holds no worker thread while it waits on the database, so a
+    process can keep many slow requests open at once.
+
+    Authentication, permissions, versioning and content negotiation still run
+    synchronously, as does any other action, e.g. writes, which are wrapped in a
+    transaction as with `ATOMIC_REQUESTS`. Rows are rendered by a `Projection`
+    of the serializer, and serializers that a projection cannot render are
+    handled synchronously too. Cached responses and conditional GETs are served
+    by the async handlers of `CacheResponseMixin` and `ConditionalGetMixin`.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        if settings.API_ASYNC_VIEWS:
+            return cls.as_async_view(actions, **initkwargs)
+        return super().as_view(actions, **initkwargs)
+
+    @classmethod
+    def as_async_view(cls, actions, **initkwargs):
+        sync_view = super().as_view(actions, **initkwargs)
+        # Only reads are async; the rest are atomic as any synchronous view
+        atomic_view = sync_to_async(BaseHandler().make_view_atomic(sync_view))
+        actions = dict(actions)
+        if "get" in actions and "head" not in actions:
+            actions["head"] = actions["get"]
+
+        async def view(request, *args, **kwargs):
+            action = actions.get(request.method.lower())
+            if not hasattr(cls, f"a{action}"):
+                return await atomic_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            for method, name in actions.items():
+                setattr(self, method, getattr(self, name))
+                if handler := getattr(self, f"a{name}", None):
+                    setattr(self, f"a{method}", handler)
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        # As for any DRF view, CSRF is enforced by session authentication
+        view.csrf_exempt = True
+        for alias in connections:
+            view = transaction.non_atomic_requests(using=alias)(view)
+        return view
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Dispatch as `APIView.dispatch()` to the async handler of the request's
+        method, e.g. `aget`.
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{request.method.lower()}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        projection = get_projection(self.get_serializer())
+        if projection is None:
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+
+        queryset = projection.values(self.filter_queryset(self.get_queryset()))
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(await projection.arepresent(page))
+        rows = [row async for row in queryset]
+        return Response(await projection.arepresent(rows))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        projection = get_projection(self.get_serializer())
+        if projection is None:
+            return await sync_to_async(self.retrieve)(request, *args, **kwargs)
+
+        queryset = projection.values(self.filter_queryset(self.get_queryset()))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            row = await queryset.aget(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        # As in `get_object_or_404()`, an invalid lookup value is not found
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        (result,) = await projection.arepresent([row])
+        return Response(result)
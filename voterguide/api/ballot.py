@@ -0,0 +1,242 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch, Q
+
+from voterguide.api import generations
+from voterguide.api.models import (
+    BallotSnapshot,
+    Candidate,
+    Measure,
+    MeasureEndorsement,
+    Seat,
+    SeatEndorsement,
+)
+from voterguide.api.replicas import read_from_primary
+from voterguide.api.serializers import BallotSerializer
+
+# Keys in a ballot document whose values are (lists of) hyperlinks into the API.
+HYPERLINK_KEYS = frozenset(("url", "seat", "running_for_seat", "candidates"))
+
+# Generation replaced whenever snapshots are discarded, so that a document
+# rendered before a write is not stored after it. See `store_ballot_snapshot()`.
+SNAPSHOT_GENERATION = "ballotsnapshot"
+
+
+def jurisdiction_filter(county="", city=""):
+    """
+    Match rows that apply to a voter in the given jurisdiction.
+
+    A blank location field means the row applies to the whole of the enclosing
+    jurisdiction, e.g. a seat without a county covers every county in its
+    state. Omitting a location argument matches only rows that leave it blank.
+    """
+    query = Q(county="") | Q(county__iexact=county) if county else Q(county="")
+    query &= Q(city="") | Q(city__iexact=city) if city else Q(city="")
+    return query
+
+
+def get_ballot_seats(state, election_date, county="", city="", district=None):
+    """
+    Return the contested seats on a ballot, with their running candidates,
+    incumbents and the endorsements made for `election_date` prefetched.
+
+    Evaluating the queryset costs five queries regardless of the number of seats.
+    """
+    candidate_ids = Candidate.objects.only("id")
+    endorsements = (
+        SeatEndorsement.objects.filter(election_date=election_date)
+        .select_related("endorser")
+        .prefetch_related(Prefetch("candidates", queryset=candidate_ids))
+        .order_by("endorser__name", "id")
+    )
+    running = Candidate.objects.filter(running_for_seat=OuterRef("pk"))
+    endorsed = SeatEndorsement.objects.filter(
+        seat=OuterRef("pk"), election_date=election_date
+    )
+    district_query = Q(district__isnull=True)
+    if district is not None:
+        district_query |= Q(district=district)
+
+    return (
+        Seat.objects.filter(
+            # Federal seats such as President are not tied to a state
+            Q(state=state) | Q(state="", level="F"),
+            jurisdiction_filter(county, city),
+            district_query,
+        )
+        .filter(Exists(running) | Exists(endorsed))
+        .prefetch_related(
+            Prefetch(
+                "candidate_set",
+                queryset=Candidate.objects.order_by("last_name", "first_name", "id"),
+                to_attr="running_candidates",
+            ),
+            Prefetch(
+                "incumbent",
+                queryset=Candidate.objects.order_by("id"),
+                to_attr="incumbents",
+            ),
+            Prefetch(
+                "seatendorsement_set",
+                queryset=endorsements,
+                to_attr="ballot_endorsements",
+            ),
+        )
+        .order_by("level", "role", "district", "id")
+    )
+
+
+def get_ballot_measures(state, election_date, county="", city=""):
+    """
+    Return the measures on a ballot with their endorsements prefetched.
+
+    Evaluating the queryset costs two queries regardless of the number of measures.
+    """
+    endorsements = MeasureEndorsement.objects.filter(
+        election_date=election_date
+    ).select_related("endorser")
+
+    return (
+        Measure.objects.filter(
+            jurisdiction_filter(county, city),
+            state=state,
+            election_date=election_date,
+        )
+        .prefetch_related(
+            Prefetch(
+                "measureendorsement_set",
+                queryset=endorsements.order_by("endorser__name", "id"),
+                to_attr="ballot_endorsements",
+            )
+        )
+        .order_by("name", "id")
+    )
+
+
+def get_ballot(state, election_date, county="", city="", district=None):
+    """
+    Assemble everything on the ballot for a jurisdiction and election date.
+
+    The returned mapping is consumed by `BallotSerializer`.
+    """
+    return {
+        "state": state,
+        "county": county,
+        "city": city,
+        "district": district,
+        "election_date": election_date,
+        "seats": get_ballot_seats(state, election_date, county, city, district),
+        "measures": get_ballot_measures(state, election_date, county, city),
+    }
+
+
+def render_ballot(state, election_date, county="", city="", district=None):
+    """
+    Render a ballot document with hyperlinks relative to the site root.
+    """
+    ballot = get_ballot(state, election_date, county, city, district)
+    return BallotSerializer(ballot, context={"request": None}).data
+
+
+def is_known_jurisdiction(state, county="", city="", district=None):
+    """
+    Return whether each location given for a ballot appears on a seat or a
+    measure in `state`, so that snapshots are never stored for made-up ones.
+    """
+    for field, value in (("county", county), ("city", city)):
+        if value:
+            lookup = {"state": state, f"{field}__iexact": value}
+            if not (
+                Seat.objects.filter(**lookup).exists()
+                or Measure.objects.filter(**lookup).exists()
+            ):
+                return False
+    # Measures are not tied to a district
+    return (
+        district is None or Seat.objects.filter(state=state, district=district).exists()
+    )
+
+
+def get_ballot_document(state, election_date, county="", city="", district=None):
+    """
+    Return the rendered ballot document for a jurisdiction, reading it from its
+    snapshot when one exists and materializing the snapshot otherwise.
+
+    A missing snapshot is rendered from the primary, since it is served until
+    the next write discards it and must not reflect a lagging replica. It is
+    stored once the request commits, and only for a non-empty ballot of a known
+    jurisdiction.
+    """
+    key = BallotSnapshot.make_key(state, election_date, county, city, district)
+    snapshot = BallotSnapshot.objects.filter(pk=key).only("document").first()
+    if snapshot is not None:
+        return snapshot.document
+
+    generation = generations.get_generation(SNAPSHOT_GENERATION)
+    with read_from_primary():
+        document = render_ballot(state, election_date, county, city, district)
+        if (document["seats"] or document["measures"]) and is_known_jurisdiction(
+            state, county, city, district
+        ):
+            fields = {
+                "state": state,
+                "county": county,
+                "city": city,
+                "district": district,
+                "election_date": election_date,
+                "document": document,
+            }
+            transaction.on_commit(
+                partial(store_ballot_snapshot, key, generation, fields)
+            )
+    return document
+
+
+def store_ballot_snapshot(key, generation, fields):
+    """
+    Store a snapshot rendered under the given snapshot generation, unless one was
+    stored meanwhile.
+
+    A write that commits while the document renders may discard snapshots
+    before this insert, so the generation is checked again once the snapshot
+    is stored, and a stale one is deleted.
+    """
+    _, created = BallotSnapshot.objects.get_or_create(key=key, defaults=fields)
+    if created and generations.get_generation(SNAPSHOT_GENERATION) != generation:
+        BallotSnapshot.objects.filter(pk=key).delete()
+
+
+def discard_ballot_snapshots(query):
+    """
+    Delete every stored ballot snapshot matching `query`, to be rendered again
+    on its next read.
+    """
+    # Replaced first, so that a document rendered before the write and stored
+    # after this delete is caught by `store_ballot_snapshot()`.
+    generations.invalidate(SNAPSHOT_GENERATION)
+    BallotSnapshot.objects.filter(query).delete()
+
+
+def absolutize_hyperlinks(document, base_url):
+    """
+    Return a copy of a stored ballot document with its root-relative hyperlinks
+    prefixed by `base_url`, e.g. `https://example.org`.
+    """
+    if isinstance(document, list):
+        return [absolutize_hyperlinks(item, base_url) for item in document]
+    if not isinstance(document, dict):
+        return document
+
+    absolute = {}
+    for key, value in document.items():
+        if key not in HYPERLINK_KEYS:
+            absolute[key] = absolutize_hyperlinks(value, base_url)
+        elif isinstance(value, str) and value.startswith("/"):
+            absolute[key] = f"{base_url}{value}"
+        elif isinstance(value, list) and value and isinstance(value[0], str):
+            absolute[key] = [f"{base_url}{link}" for link in value]
+        else:
+            # External links, nulls and lists of nested objects
+            absolute[key] = absolutize_hyperlinks(value, base_url)
+    return absolute
@@ -0,0 +1,94 @@
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.test import Client
+from rest_framework.test import APIRequestFactory
+
+from voterguide.api.models import Candidate, Endorser, Seat, SeatEndorsement
+
+
+def seed(rows):
+    """
+    Create `rows` seats, candidates and seat endorsements, each endorsement of
+    two candidates, as a realistic volume for the list endpoints.
+    """
+    endorsers = Endorser.objects.bulk_create(
+        Endorser(name=f"Benchmark Endorser {n}", abbreviation=f"BENCH{n}")
+        for n in range(10)
+    )
+    seats = Seat.objects.bulk_create(
+        Seat(level="S", branch="L", role="Representative", state="OR", district=n)
+        for n in range(rows)
+    )
+    candidates = Candidate.objects.bulk_create(
+        Candidate(
+            first_name=f"Benchmark {n}",
+            last_name="Candidate",
+            party="D",
+            date_of_birth=date(1960, 1, 1),
+            running_for_seat=seats[n],
+        )
+        for n in range(rows)
+    )
+    endorsements = SeatEndorsement.objects.bulk_create(
+        SeatEndorsement(
+            endorser=endorsers[n % len(endorsers)],
+            seat=seat,
+            election_date=date(2024, 11, 5),
+            url="https://example.com/endorsements",
+        )
+        for n, seat in enumerate(seats)
+    )
+    SeatEndorsement.candidates.through.objects.bulk_create(
+        SeatEndorsement.candidates.through(
+            seatendorsement_id=endorsement.pk, candidate_id=candidate.pk
+        )
+        for n, endorsement in enumerate(endorsements)
+        for candidate in (candidates[n], candidates[n - 1])
+    )
+
+
+def allowed_host():
+    """
+    Return one of the allowed hosts, since requests are built outside of the
+    test runner.
+    """
+    return settings.ALLOWED_HOSTS[0].lstrip(".").replace("*", "localhost")
+
+
+def request_factory():
+    return APIRequestFactory(SERVER_NAME=allowed_host())
+
+
+def client():
+    """
+    Return a test client, whose requests go through the middleware chain.
+    """
+    return Client(SERVER_NAME=allowed_host())
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run a block in a transaction that is always rolled back, so that seeded
+    rows never outlive a benchmark.
+    """
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def timed(func, repeat):
+    """
+    Call `func` `repeat` times and return the median duration in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
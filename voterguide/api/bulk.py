@@ -0,0 +1,380 @@
+from collections import defaultdict
+
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, ProgrammingError, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.db.models.sql import Query
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
+from rest_framework.relations import ManyRelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import as_serializer_error
+from rest_framework.settings import api_settings
+
+from voterguide.api.fields import TemplatedHyperlinkMixin
+from voterguide.api.signals import handle_bulk_write
+
+# Postgres reports an upsert that would update the same row twice with this code
+CARDINALITY_VIOLATION = "21000"
+
+
+def resolve_related_objects(serializer, items):
+    """
+    Load every object that the hyperlinks in `items` refer to, with one query
+    per related model, as `{model: {pk: object}}`.
+
+    Hyperlinks that do not resolve are left out, so they fail validation as
+    usual when the serializer looks them up.
+    """
+    querysets = {}
+    lookups = defaultdict(set)
+    for field in serializer.fields.values():
+        if field.read_only:
+            continue
+        relation = (
+            field.child_relation if isinstance(field, ManyRelatedField) else field
+        )
+        if not isinstance(relation, TemplatedHyperlinkMixin):
+            continue
+        queryset = relation.get_queryset()
+        querysets.setdefault(queryset.model, queryset)
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            values = item.get(field.field_name)
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                lookup_value = relation.get_lookup_value(value)
+                if lookup_value is not None and lookup_value.isdigit():
+                    lookups[queryset.model].add(int(lookup_value))
+    return {
+        model: querysets[model].in_bulk(pks) for model, pks in lookups.items() if pks
+    }
+
+
+def get_error_detail(exc):
+    """
+    Return the API error detail for a Django `ValidationError` raised by a model.
+    """
+    detail = as_serializer_error(exc)
+    if NON_FIELD_ERRORS in detail:
+        detail[api_settings.NON_FIELD_ERRORS_KEY] = detail.pop(NON_FIELD_ERRORS)
+    return detail
+
+
+def compile_expressions(model, expressions):
+    """
+    Return the SQL and params of expressions over the fields of `model`, which
+    may be given by name, with column names left unqualified.
+    """
+    query = Query(model, alias_cols=False)
+    compiler = query.get_compiler(connection=connection)
+    sql, params = [], []
+    for expression in expressions:
+        if isinstance(expression, str):
+            expression = F(expression)
+        expression_sql, expression_params = compiler.compile(
+            expression.resolve_expression(query)
+        )
+        sql.append(expression_sql)
+        params.extend(expression_params)
+    return ", ".join(sql), params
+
+
+def conflict_target(model, constraint):
+    """
+    Return the SQL and params for an ON CONFLICT clause that infers a unique
+    constraint, including expression and partial ones, e.g.
+    `(LOWER("first_name"), LOWER("last_name")) WHERE "date_of_birth" IS NULL`.
+    """
+    columns, params = compile_expressions(
+        model, constraint.expressions or constraint.fields
+    )
+    target = f"({columns})"
+    if constraint.condition is not None:
+        query = Query(model, alias_cols=False)
+        compiler = query.get_compiler(connection=connection)
+        where = query.build_where(constraint.condition)
+        sql, condition_params = where.as_sql(compiler, connection)
+        target = f"{target} WHERE {sql}"
+        params.extend(condition_params)
+    return target, params
+
+
+def has_null_key(constraint, instance):
+    """
+    Return whether any column of a unique constraint is NULL for `instance`, in
+    which case the constraint can never conflict with it.
+    """
+    expressions = list(constraint.expressions) or [
+        F(name) for name in constraint.fields
+    ]
+    while expressions:
+        expression = expressions.pop()
+        if isinstance(expression, Coalesce):
+            continue
+        if isinstance(expression, F):
+            field = instance._meta.get_field(expression.name)
+            if getattr(instance, field.attname) is None:
+                return True
+        else:
+            expressions.extend(expression.get_source_expressions())
+    return False
+
+
+def get_constraints(model, *names):
+    """
+    Return the named constraints of `model`, in the order given.
+    """
+    constraints = {
+        constraint.name: constraint for constraint in model._meta.constraints
+    }
+    return [constraints[name] for name in names]
+
+
+def find_upsert_constraint(instance, constraints):
+    """
+    Return the first of the unique constraints that can match `instance`, or
+    None if its key is NULL for every one of them.
+    """
+    for constraint in constraints:
+        if not has_null_key(constraint, instance):
+            return constraint
+    return None
+
+
+def get_upsert_fields(model):
+    """
+    Return the fields an upsert writes, along with the SQL that updates them on
+    conflict. Every concrete field is written except the primary key, and only
+    `auto_now_add` fields keep their stored value, so an upsert replaces the
+    row like a PUT does.
+    """
+    quote_name = connection.ops.quote_name
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    updates = ", ".join(
+        f"{quote_name(field.column)} = EXCLUDED.{quote_name(field.column)}"
+        for field in fields
+        if not getattr(field, "auto_now_add", False)
+    )
+    return fields, updates
+
+
+def upsert(model, instances, constraint, batch_size):
+    """
+    Insert `instances`, updating the existing row wherever one conflicts on
+    `constraint`, and set the primary key of each instance.
+    """
+    meta = model._meta
+    quote_name = connection.ops.quote_name
+    fields, updates = get_upsert_fields(model)
+    columns = ", ".join(quote_name(field.column) for field in fields)
+    target, target_params = conflict_target(model, constraint)
+    row = f"({', '.join(['%s'] * len(fields))})"
+
+    with connection.cursor() as cursor:
+        for start in range(0, len(instances), batch_size):
+            end = start + batch_size
+            batch = instances[start:end]
+            params = [
+                field.get_db_prep_save(field.pre_save(instance, add=True), connection)
+                for instance in batch
+                for field in fields
+            ]
+            cursor.execute(
+                f"INSERT INTO {quote_name(meta.db_table)} ({columns}) "
+                f"VALUES {', '.join([row] * len(batch))} "
+                f"ON CONFLICT {target} DO UPDATE SET {updates} "
+                f"RETURNING {quote_name(meta.pk.column)}",
+                params + target_params,
+            )
+            # Rows come back in the order of the VALUES list
+            for instance, (pk,) in zip(batch, cursor.fetchall()):
+                instance.pk = pk
+                instance._state.adding = False
+
+
+def set_many_to_many(instances, related, replace, batch_size):
+    """
+    Write the many-to-many values given for each saved instance in `related`,
+    with one INSERT per field, first removing any existing values if `replace`.
+    """
+    if not instances:
+        return
+    for field in instances[0]._meta.many_to_many:
+        through = field.remote_field.through
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        written = [
+            (instance, values[field.name])
+            for instance, values in zip(instances, related)
+            if field.name in values
+        ]
+        if replace:
+            through.objects.filter(
+                **{f"{source}__in": [instance.pk for instance, _ in written]}
+            ).delete()
+        through.objects.bulk_create(
+            [
+                through(**{f"{source}_id": instance.pk, f"{target}_id": obj.pk})
+                for instance, objs in written
+                for obj in objs
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+
+
+class BulkWriteMixin:
+    """
+    Add a `bulk` route to a viewset, e.g. `/candidates/bulk/`, that takes a list
+    of items. POST creates every item, and PUT upserts them against the model's
+    unique constraints named in `upsert_constraints`.
+
+    A batch is validated in memory, with the objects its hyperlinks refer to
+    loaded in one query per related model, and written with batched INSERTs in
+    a single transaction. Either every item is written or none is.
+
+    Bulk writes do not send model signals, so the ballot snapshots and cached
+    responses they affect are updated explicitly.
+    """
+
+    # Tried in order for each item, and the first whose columns are all set
+    # is used, since NULLs never conflict
+    upsert_constraints = ()
+    bulk_batch_size = 1000
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request, *args, **kwargs):
+        return self.bulk_write(request, upsert=False)
+
+    @bulk.mapping.put
+    def bulk_upsert(self, request, *args, **kwargs):
+        if not self.upsert_constraints:
+            raise MethodNotAllowed(request.method)
+        return self.bulk_write(request, upsert=True)
+
+    def get_bulk_serializer(self, data):
+        related_objects = {}
+        context = self.get_serializer_context()
+        context["related_objects"] = related_objects
+        serializer = self.get_serializer(data=data, many=True, context=context)
+        if isinstance(data, list):
+            related_objects.update(resolve_related_objects(serializer.child, data))
+        return serializer
+
+    def clean_instance(self, instance):
+        """
+        Validate an unsaved instance beyond what the serializer checks, raising a
+        Django `ValidationError`. Bulk writes skip `save()`, so models whose
+        `save()` runs `full_clean()` should do the same here.
+        """
+
+    def validate_batch(self, instances, upsert):
+        """
+        Return `{position: ValidationError}` for the instances that are invalid
+        given the rest of the batch, e.g. through checks made in one query.
+        """
+        return {}
+
+    def build_instances(self, validated_data, upsert):
+        """
+        Return unsaved instances for a validated batch, along with the
+        many-to-many values of each, and raise on any invalid item.
+        """
+        model = self.get_queryset().model
+        many_to_many = {field.name for field in model._meta.many_to_many}
+        instances, related, errors = [], [], []
+        for data in validated_data:
+            data = dict(data)
+            related.append({name: data.pop(name) for name in many_to_many & set(data)})
+            instance = model(**data)
+            try:
+                self.clean_instance(instance)
+            except DjangoValidationError as exc:
+                errors.append(get_error_detail(exc))
+            else:
+                errors.append({})
+            instances.append(instance)
+        if not any(errors):
+            for position, exc in self.validate_batch(instances, upsert).items():
+                errors[position] = get_error_detail(exc)
+        if any(errors):
+            raise ValidationError(errors)
+        return instances, related
+
+    def get_upsert_constraint(self, instance):
+        constraints = get_constraints(type(instance), *self.upsert_constraints)
+        constraint = find_upsert_constraint(instance, constraints)
+        if constraint is not None:
+            return constraint
+        raise ValidationError(
+            {
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    f"{instance} cannot be matched to an existing row."
+                ]
+            }
+        )
+
+    def perform_bulk_create(self, instances):
+        self.get_queryset().model.objects.bulk_create(
+            instances, batch_size=self.bulk_batch_size
+        )
+
+    def perform_bulk_upsert(self, instances):
+        model = self.get_queryset().model
+        constraints, batches = {}, defaultdict(list)
+        for instance in instances:
+            constraint = self.get_upsert_constraint(instance)
+            constraints[constraint.name] = constraint
+            batches[constraint.name].append(instance)
+        for name, batch in batches.items():
+            upsert(model, batch, constraints[name], self.bulk_batch_size)
+
+    def bulk_write(self, request, upsert):
+        serializer = self.get_bulk_serializer(request.data)
+        serializer.is_valid(raise_exception=True)
+        instances, related = self.build_instances(serializer.validated_data, upsert)
+
+        try:
+            with transaction.atomic():
+                if upsert:
+                    self.perform_bulk_upsert(instances)
+                else:
+                    self.perform_bulk_create(instances)
+                set_many_to_many(
+                    instances, related, replace=upsert, batch_size=self.bulk_batch_size
+                )
+        except IntegrityError:
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        "The batch conflicts with existing rows or repeats an item."
+                    ]
+                }
+            )
+        except ProgrammingError as exc:
+            if getattr(exc.__cause__, "pgcode", None) != CARDINALITY_VIOLATION:
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: ["The batch repeats an item."]}
+            )
+        model = self.get_queryset().model
+        handle_bulk_write(model, instances)
+
+        # Respond with the rows as stored, in the order they were given
+        written = self.get_queryset().prefetch_related(
+            *(field.name for field in model._meta.many_to_many)
+        )
+        written = written.in_bulk([instance.pk for instance in instances])
+        serializer = self.get_serializer(
+            [written[instance.pk] for instance in instances], many=True
+        )
+        return Response(
+            serializer.data,
+            status=status.HTTP_200_OK if upsert else status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,148 @@
+import hashlib
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.http import parse_http_date_safe
+from rest_framework.renderers import BrowsableAPIRenderer
+
+from voterguide.api.conditional import VALIDATOR_HEADERS, evaluate_preconditions
+from voterguide.api.generations import KEY_PREFIX, get_cache, get_generation
+from voterguide.api.replicas import PIN_COOKIE, read_from_primary
+
+# Response headers replayed along with cached content
+CACHED_HEADERS = ("Content-Type",) + VALIDATOR_HEADERS
+
+
+class CachedResponse(HttpResponse):
+    """
+    A response replayed from the cache. Its content is already rendered, so
+    `render()` is a no-op, letting it stand in wherever a DRF `Response` would.
+    """
+
+    is_rendered = True
+
+    def render(self):
+        return self
+
+
+class CacheResponseMixin:
+    """
+    Cache rendered `list` and `retrieve` responses per resource.
+
+    Responses are keyed on the absolute URL including the query string, the
+    requested API version, the negotiated media type and whether the request is
+    authenticated. Writes invalidate a resource through
+    `voterguide.api.generations.invalidate()`, which is driven by model signals
+    in `voterguide.api.signals`.
+
+    Cache misses are rendered from the primary: a response read from a lagging
+    replica would otherwise be served until the next write. Clients pinned to
+    the primary by `voterguide.api.replicas` bypass the cache altogether.
+    """
+
+    # Defaults to the model name of the viewset's queryset, which matches the
+    # route basename.
+    cache_resource = None
+    cached_actions = ("list", "retrieve")
+
+    def get_cache_resource(self):
+        return self.cache_resource or self.queryset.model._meta.model_name
+
+    def get_cache_key(self, request):
+        resource = self.get_cache_resource()
+        vary = "|".join(
+            (
+                request.build_absolute_uri(),
+                str(request.version),
+                request.accepted_media_type,
+                str(request.user.is_authenticated),
+            )
+        )
+        digest = hashlib.md5(vary.encode(), usedforsecurity=False).hexdigest()
+        return f"{KEY_PREFIX}:{resource}:{get_generation(resource)}:{digest}"
+
+    def is_cacheable(self, request):
+        # The browsable API renders forms and the current user into each page.
+        return (
+            request.method == "GET"
+            and self.action in self.cached_actions
+            and not isinstance(request.accepted_renderer, BrowsableAPIRenderer)
+            and PIN_COOKIE not in request.COOKIES
+            # Disabled, in which case misses need not go to the primary
+            and settings.API_CACHE_TIMEOUT != 0
+        )
+
+    def dispatch_cached(self, handler, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        cached = get_cache().get(key)
+        if cached is not None:
+            return self.replay(request, cached)
+
+        with read_from_primary():
+            response = handler(request, *args, **kwargs)
+        return self.store(key, response)
+
+    async def adispatch_cached(self, handler, request, *args, **kwargs):
+        key = await sync_to_async(self.get_cache_key)(request)
+        cached = await get_cache().aget(key)
+        if cached is not None:
+            return self.replay(request, cached)
+
+        with read_from_primary():
+            response = await handler(request, *args, **kwargs)
+        return self.store(key, response)
+
+    def replay(self, request, cached):
+        """
+        Return the response for a request from its cached status, headers and
+        content.
+        """
+        status, headers, content = cached
+        response = CachedResponse(content, status=status)
+        for header, value in headers.items():
+            response[header] = value
+        # Validators are cached with the response, so conditional requests
+        # can be answered without touching the database.
+        if "ETag" in headers:
+            not_modified = evaluate_preconditions(
+                request,
+                headers["ETag"],
+                parse_http_date_safe(headers.get("Last-Modified")),
+            )
+            if not_modified is not None:
+                return not_modified
+        return response
+
+    def store(self, key, response):
+        """
+        Cache a successful response under `key` once it is rendered.
+        """
+        if response.status_code == 200:
+
+            def store(rendered):
+                headers = {
+                    header: rendered[header]
+                    for header in CACHED_HEADERS
+                    if header in rendered
+                }
+                get_cache().set(
+                    key,
+                    (rendered.status_code, headers, rendered.content),
+                    timeout=settings.API_CACHE_TIMEOUT,
+                )
+
+            response.add_post_render_callback(store)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # The handler for the request is looked up only after `initial()`, once
+        # authentication, versioning and content negotiation have run.
+        if self.is_cacheable(request):
+            method = request.method.lower()
+            setattr(self, method, partial(self.dispatch_cached, getattr(self, method)))
+            # The async handler of an async view, see `voterguide.api.asynchronous`
+            if handler := getattr(self, f"a{method}", None):
+                setattr(self, f"a{method}", partial(self.adispatch_cached, handler))
@@ -0,0 +1,170 @@
+import hashlib
+from calendar import timegm
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.db.models import Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from voterguide.api.generations import generation_time, get_generation
+from voterguide.api.replicas import replica_alias
+
+VALIDATOR_HEADERS = ("ETag", "Last-Modified")
+
+
+def evaluate_preconditions(request, etag, last_modified):
+    """
+    Return a 304 (or 412) response if the request's preconditions fail against
+    the given validators, or None if the full response should be sent.
+
+    `last_modified` is a POSIX timestamp, as used in the Last-Modified header.
+    """
+    validators = HttpResponse()
+    validators["ETag"] = etag
+    validators["Last-Modified"] = http_date(last_modified)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=validators
+    )
+    return None if response is validators else response
+
+
+class ConditionalGetMixin:
+    """
+    Emit ETag and Last-Modified headers on `list` and `retrieve`, and answer
+    If-None-Match / If-Modified-Since with a 304 before anything is serialized.
+
+    A detail is validated by its row's `last_updated`, read with one query by
+    primary key. A list is validated by the generation token of its resource,
+    which is replaced on every write to the resource or to a row it may render
+    (see `voterguide.api.signals`), so that rows added, deleted or leaving its
+    filters change its ETag without a COUNT(*), and validating a list costs no
+    query at all. Its Last-Modified is when the token was created. A detail with
+    expanded related rows is validated by both.
+
+    The token changes as soon as a write commits, while a replica may still
+    serve the rows from before it, so responses validated by the token are only
+    validated when read from the primary; `CacheResponseMixin` renders its
+    cache misses from there.
+    """
+
+    conditional_actions = ("list", "retrieve")
+
+    def get_validator_resource(self):
+        # The resource that `CacheResponseMixin` caches the responses under
+        return self.queryset.model._meta.model_name
+
+    def is_validated_by_generation(self):
+        # A row's own last_updated does not change with the related rows that
+        # are rendered inline with `?expand=`
+        expanded = getattr(self, "get_expanded_fields", set)()
+        return self.action != "retrieve" or bool(expanded)
+
+    def get_validators(self, request):
+        """
+        Return `(etag, last_modified)` for the current request, or `(None, None)`
+        if there is nothing to validate against, e.g. a detail that will 404.
+        """
+        if self.is_validated_by_generation() and replica_alias.get() is not None:
+            return None, None
+        last_updated = generation = None
+        if self.action == "retrieve":
+            last_updated = self.get_validator_queryset().aggregate(
+                last_updated=Max("last_updated")
+            )["last_updated"]
+            if last_updated is None:
+                return None, None
+        if self.is_validated_by_generation():
+            generation = get_generation(self.get_validator_resource())
+        return self.make_validators(request, last_updated, generation)
+
+    async def aget_validators(self, request):
+        """
+        Return the validators as `get_validators()`, using the async ORM.
+        """
+        if self.is_validated_by_generation() and replica_alias.get() is not None:
+            return None, None
+        last_updated = generation = None
+        if self.action == "retrieve":
+            aggregate = await self.get_validator_queryset().aaggregate(
+                last_updated=Max("last_updated")
+            )
+            last_updated = aggregate["last_updated"]
+            if last_updated is None:
+                return None, None
+        if self.is_validated_by_generation():
+            generation = await sync_to_async(get_generation)(
+                self.get_validator_resource()
+            )
+        return self.make_validators(request, last_updated, generation)
+
+    def get_validator_queryset(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset.order_by()
+
+    def make_validators(self, request, last_updated, generation):
+        modified = [last_updated] if last_updated else []
+        if generation:
+            modified.append(generation_time(generation))
+        # The representation also depends on the URL (host, query string and
+        # therefore page), the negotiated media type and the API version.
+        vary = "|".join(
+            (
+                request.build_absolute_uri(),
+                request.accepted_media_type,
+                str(request.version),
+                last_updated.isoformat() if last_updated else "",
+                generation or "",
+            )
+        )
+        etag = f'"{hashlib.md5(vary.encode(), usedforsecurity=False).hexdigest()}"'
+        return etag, timegm(max(modified).utctimetuple())
+
+    def dispatch_conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        not_modified = evaluate_preconditions(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    async def adispatch_conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = await self.aget_validators(request)
+        if etag is None:
+            return await handler(request, *args, **kwargs)
+
+        not_modified = evaluate_preconditions(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = await handler(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code == 200:
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in ("GET", "HEAD")
+            and self.action in self.conditional_actions
+        ):
+            method = request.method.lower()
+            setattr(
+                self, method, partial(self.dispatch_conditional, getattr(self, method))
+            )
+            # The async handler of an async view, see `voterguide.api.asynchronous`
+            if handler := getattr(self, f"a{method}", None):
+                setattr(
+                    self, f"a{method}", partial(self.adispatch_conditional, handler)
+                )
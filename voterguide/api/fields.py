@@ -0,0 +1,99 @@
+from urllib import parse
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.urls import Resolver404, get_script_prefix, resolve
+from django.utils.encoding import uri_to_iri
+from rest_framework import relations
+
+# Stands in for the lookup value when reversing a route once; it must satisfy
+# the router's `[^/.]+` lookup pattern and survive URL quoting unchanged.
+LOOKUP_PLACEHOLDER = "__lookup__"
+
+
+class TemplatedHyperlinkMixin:
+    """
+    Build hyperlinks by reversing each route once and substituting the lookup
+    value into the resulting URL, rather than calling `reverse()` and
+    `request.build_absolute_uri()` for every row.
+
+    Fields are instantiated per serializer, and a `ListSerializer` shares one
+    child across all of its rows, so templates are effectively cached per
+    request. Integer lookups are formatted into the template; any other lookup
+    value goes through the regular `reverse()` path so that quoting is preserved.
+
+    When the serializer context carries `related_objects`, hyperlinks are
+    resolved against those preloaded objects instead of one query per value.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._url_templates = {}
+        super().__init__(*args, **kwargs)
+
+    def get_url(self, obj, view_name, request, format):
+        # Unsaved objects will not yet have a valid URL.
+        if hasattr(obj, "pk") and obj.pk in (None, ""):
+            return None
+
+        lookup_value = getattr(obj, self.lookup_field)
+        if not isinstance(lookup_value, int):
+            return super().get_url(obj, view_name, request, format)
+
+        template = self.get_url_template(view_name, request, format)
+        if template is None:
+            return super().get_url(obj, view_name, request, format)
+        prefix, suffix = template
+        return f"{prefix}{lookup_value}{suffix}"
+
+    def get_url_template(self, view_name, request, format):
+        """
+        Return the `(prefix, suffix)` around the lookup value for a route, or
+        None if the placeholder does not appear verbatim in the reversed URL.
+        """
+        key = (view_name, id(request), format)
+        if key not in self._url_templates:
+            kwargs = {self.lookup_url_kwarg: LOOKUP_PLACEHOLDER}
+            url = self.reverse(view_name, kwargs=kwargs, request=request, format=format)
+            prefix, placeholder, suffix = url.rpartition(LOOKUP_PLACEHOLDER)
+            self._url_templates[key] = (prefix, suffix) if placeholder else None
+        return self._url_templates[key]
+
+    def get_lookup_value(self, data):
+        """
+        Return the lookup value in a hyperlink, or None if `data` does not resolve
+        to a detail route. Parses the URL the same way as `to_internal_value`.
+        """
+        if not isinstance(data, str):
+            return None
+        if data.startswith(("http:", "https:")):
+            data = parse.urlparse(data).path
+            prefix = get_script_prefix()
+            if data.startswith(prefix):
+                data = "/" + data.removeprefix(prefix)
+        try:
+            match = resolve(uri_to_iri(parse.unquote(data)))
+        except Resolver404:
+            return None
+        return match.kwargs.get(self.lookup_url_kwarg)
+
+    def get_object(self, view_name, view_args, view_kwargs):
+        # Preloaded by model and primary key, see `voterguide.api.bulk`
+        related_objects = self.context.get("related_objects")
+        if related_objects is None:
+            return super().get_object(view_name, view_args, view_kwargs)
+        objects = related_objects.get(self.get_queryset().model, {})
+        try:
+            return objects[int(view_kwargs[self.lookup_url_kwarg])]
+        except (KeyError, ValueError):
+            raise ObjectDoesNotExist
+
+
+class TemplatedHyperlinkedRelatedField(
+    TemplatedHyperlinkMixin, relations.HyperlinkedRelatedField
+):
+    pass
+
+
+class TemplatedHyperlinkedIdentityField(
+    TemplatedHyperlinkMixin, relations.HyperlinkedIdentityField
+):
+    pass
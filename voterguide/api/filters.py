@@ -0,0 +1,183 @@
+from datetime import timedelta
+from datetime import timezone as dt_timezone
+from functools import reduce
+from operator import add, or_
+
+from django.conf import settings
+from django.contrib.postgres.indexes import OpClass
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorExact,
+    TrigramWordSimilarity,
+)
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class ModifiedSinceFilter(BaseFilterBackend):
+    """
+    Restrict a list to rows whose `last_updated` is after `?modified_since=`,
+    given as an ISO 8601 datetime. Naive datetimes are taken to be in UTC.
+
+    When the parameter is present the list is paginated by `(last_updated, id)`
+    so that a client can page through every change in order. Rows modified in
+    the last `API_CHANGE_FEED_DELAY` seconds are left out: `last_updated` is set
+    when a row is saved, but the row is only visible once its transaction
+    commits, possibly after a client paged past later rows.
+    """
+
+    modified_since_param = "modified_since"
+    invalid_message = _("Enter a valid ISO 8601 date/time.")
+
+    def get_modified_since(self, request):
+        value = request.query_params.get(self.modified_since_param)
+        if value is None:
+            return None
+        try:
+            modified_since = parse_datetime(value)
+        except ValueError:
+            modified_since = None
+        if modified_since is None:
+            raise ValidationError({self.modified_since_param: [self.invalid_message]})
+        if timezone.is_naive(modified_since):
+            modified_since = timezone.make_aware(modified_since, dt_timezone.utc)
+        return modified_since
+
+    def filter_queryset(self, request, queryset, view):
+        modified_since = self.get_modified_since(request)
+        if modified_since is None:
+            return queryset
+        settled = timezone.now() - timedelta(seconds=settings.API_CHANGE_FEED_DELAY)
+        return queryset.filter(
+            last_updated__gt=modified_since, last_updated__lte=settled
+        )
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.modified_since_param,
+                "required": False,
+                "in": "query",
+                "description": "Only return rows modified after this date/time.",
+                "schema": {"type": "string", "format": "date-time"},
+            }
+        ]
+
+
+class FieldFilter(BaseFilterBackend):
+    """
+    Filter a list on exact matches of the model fields named in the view's
+    `filter_fields`, e.g. `?state=OR&election_date=2022-11-08`.
+
+    Values are converted with the model field, so invalid input is reported as a
+    400 rather than reaching the database. An empty value on a nullable field
+    matches NULL, e.g. `?district=` for seats without a district.
+    """
+
+    def get_filters(self, request, queryset, view):
+        filters = {}
+        errors = {}
+        for name in getattr(view, "filter_fields", ()):
+            if name not in request.query_params:
+                continue
+            value = request.query_params[name]
+            field = queryset.model._meta.get_field(name)
+            if value == "" and field.null:
+                filters[f"{name}__isnull"] = True
+                continue
+            try:
+                filters[name] = field.to_python(value)
+            except DjangoValidationError as exc:
+                errors[name] = exc.messages
+        if errors:
+            raise ValidationError(errors)
+        return filters
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset.filter(**self.get_filters(request, queryset, view))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "schema": {"type": "string"},
+            }
+            for name in getattr(view, "filter_fields", ())
+        ]
+
+
+class SearchFilter(BaseFilterBackend):
+    """
+    Restrict a list to rows matching `?search=`, through the model indexes named
+    in the view's `search_indexes`.
+
+    A full-text index on a `SearchVector` matches whole words, with the search
+    parsed as by a web search engine, e.g. `"exact phrase" -excluded`. A trigram
+    index (`gin_trgm_ops`) on a column matches words that are misspelt or only
+    partly typed. Queries repeat the expressions of the indexes, so that every
+    condition is served by one.
+
+    Rows are annotated with their `search_rank`, the sum of their full-text rank
+    and trigram similarities, and the list is paginated by it, most relevant
+    first, unless another ordering is requested.
+    """
+
+    search_param = "search"
+    rank_annotation = "search_rank"
+
+    def get_search(self, request):
+        return request.query_params.get(self.search_param, "").strip()
+
+    def get_match(self, search, index):
+        """
+        Return the condition matching `search` through `index`, and the rank of
+        a match.
+        """
+        (expression,) = index.expressions
+        if isinstance(expression, OpClass):
+            (column,) = expression.get_source_expressions()
+            return (
+                TrigramWordSimilar(column, search),
+                TrigramWordSimilarity(search, column),
+            )
+        query = SearchQuery(search, config=expression.config, search_type="websearch")
+        return SearchVectorExact(expression, query), SearchRank(expression, query)
+
+    def filter_queryset(self, request, queryset, view):
+        search = self.get_search(request)
+        names = getattr(view, "search_indexes", ())
+        if not search or not names:
+            return queryset
+
+        indexes = {index.name: index for index in queryset.model._meta.indexes}
+        matches, ranks = zip(*(self.get_match(search, indexes[name]) for name in names))
+        # As double precision, so that ranks survive a round trip through a
+        # pagination cursor unchanged
+        rank = Cast(reduce(add, ranks), FloatField())
+        return queryset.filter(reduce(or_, map(Q, matches))).annotate(
+            **{self.rank_annotation: rank}
+        )
+
+    def get_schema_operation_parameters(self, view):
+        if not getattr(view, "search_indexes", ()):
+            return []
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Only return rows matching these words, most "
+                "relevant first.",
+                "schema": {"type": "string"},
+            }
+        ]
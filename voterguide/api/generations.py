@@ -0,0 +1,64 @@
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = "api"
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_generation_cache():
+    return caches[settings.API_GENERATION_CACHE_ALIAS]
+
+
+def generation_key(resource):
+    return f"{KEY_PREFIX}:generation:{resource}"
+
+
+def new_generation():
+    # Prefixed with its creation time, see `generation_time()`
+    return f"{time.time():.6f}-{uuid4().hex}"
+
+
+def generation_time(generation):
+    """
+    Return when a generation token was created, which is no earlier than the
+    last write to its resource, as a UTC datetime.
+    """
+    created, _, _ = generation.partition("-")
+    return datetime.fromtimestamp(float(created), timezone.utc)
+
+
+def get_generation(resource):
+    """
+    Return the current generation token for a resource, creating one if needed.
+
+    Cached responses and list validators are keyed on this token, so replacing
+    it invalidates every response cached for the resource without having to
+    enumerate their keys.
+    """
+    cache = get_generation_cache()
+    key = generation_key(resource)
+    generation = cache.get(key)
+    if generation is None:
+        generation = new_generation()
+        if not cache.add(key, generation, timeout=None):
+            # Another process created the token first
+            generation = cache.get(key, generation)
+    return generation
+
+
+def invalidate(*resources):
+    """
+    Discard every cached response for the given resources, and change the
+    validators of their lists.
+    """
+    get_generation_cache().set_many(
+        {generation_key(resource): new_generation() for resource in resources},
+        timeout=None,
+    )
@@ -0,0 +1,444 @@
+import csv
+import json
+from collections import defaultdict
+from io import StringIO
+from itertools import islice
+
+from django.core.exceptions import NON_FIELD_ERRORS, FieldDoesNotExist, ValidationError
+from django.db import DatabaseError, connection, models, transaction
+from django.db.models.functions import Lower
+
+from voterguide.api.bulk import (
+    compile_expressions,
+    conflict_target,
+    find_upsert_constraint,
+    get_constraints,
+    get_upsert_fields,
+    set_many_to_many,
+    upsert,
+)
+from voterguide.api.models import (
+    SEAT_IDENTITY,
+    Candidate,
+    Endorser,
+    Measure,
+    MeasureEndorsement,
+    Seat,
+    SeatEndorsement,
+)
+from voterguide.api.signals import handle_import
+
+FORMATS = ("csv", "ndjson")
+
+RESOURCES = {
+    "candidates": Candidate,
+    "endorsers": Endorser,
+    "measures": Measure,
+    "seats": Seat,
+    "measure-endorsements": MeasureEndorsement,
+    "seat-endorsements": SeatEndorsement,
+}
+
+# The values that identify a row of each model, matching its unique constraints,
+# as database expressions and as computed from an unsaved instance.
+NATURAL_KEYS = {
+    Candidate: (
+        (Lower("first_name"), Lower("last_name"), "date_of_birth"),
+        lambda c: (c.first_name.lower(), c.last_name.lower(), c.date_of_birth),
+    ),
+    Endorser: (("abbreviation",), lambda e: (e.abbreviation,)),
+    Measure: (
+        (Lower("name"), "election_date", "state"),
+        lambda m: (m.name.lower(), m.election_date, m.state),
+    ),
+    Seat: (tuple(SEAT_IDENTITY.values()), Seat.identity),
+    MeasureEndorsement: (
+        ("endorser", "election_date", "measure"),
+        lambda e: (e.endorser_id, e.election_date, e.measure_id),
+    ),
+    SeatEndorsement: (
+        ("endorser", "election_date", "seat"),
+        lambda e: (e.endorser_id, e.election_date, e.seat_id),
+    ),
+}
+
+# The unique constraints that rows are upserted on, tried in order for each row
+UPSERT_CONSTRAINTS = {
+    Candidate: get_constraints(
+        Candidate,
+        "candidate_unique_first_last_dob",
+        "candidate_unique_first_last_null_dob",
+    ),
+    # Endorser.abbreviation is unique=True, whose index ON CONFLICT infers from
+    # the column alone
+    Endorser: [
+        models.UniqueConstraint(fields=["abbreviation"], name="endorser_abbreviation")
+    ],
+    Measure: get_constraints(Measure, "measure_unique_name_date_state"),
+    Seat: get_constraints(Seat, "seat_unique_identity"),
+    MeasureEndorsement: get_constraints(
+        MeasureEndorsement,
+        "measure_endorsement_unique_endorser_election_date_measure",
+    ),
+    SeatEndorsement: get_constraints(
+        SeatEndorsement, "seat_endorsement_unique_endorser_election_date_seat"
+    ),
+}
+
+
+def natural_key(instance):
+    return NATURAL_KEYS[type(instance)][1](instance)
+
+
+def unflatten(row):
+    """
+    Nest the dotted columns of a CSV row, e.g. `seat.role` or
+    `candidates.0.first_name`, turning numbered keys into lists.
+
+    Empty nested columns are left out, so a reference whose columns are all
+    empty is omitted rather than failing to match. A list whose columns are all
+    empty is given as an empty list.
+    """
+    nested, lists = {}, set()
+    for key, value in row.items():
+        parts = key.split(".")
+        if len(parts) > 1 and parts[1].isdigit():
+            lists.add(parts[0])
+        *path, name = parts
+        if path and value == "":
+            continue
+        target = nested
+        for part in path:
+            target = target.setdefault(part, {})
+        target[name] = value
+    nested = listify(nested)
+    for name in lists:
+        nested.setdefault(name, [])
+    return nested
+
+
+def listify(value):
+    if not isinstance(value, dict):
+        return value
+    value = {key: listify(item) for key, item in value.items()}
+    if value and all(key.isdigit() for key in value):
+        return [value[key] for key in sorted(value, key=int)]
+    return value
+
+
+def read_rows(file, format):
+    """
+    Lazily parse a CSV or NDJSON file into `(line number, row)` pairs. A row
+    that cannot be parsed is passed on as None, to be rejected.
+    """
+    if format == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            # Cells beyond the header are collected under None
+            yield reader.line_num, None if None in row else unflatten(row)
+        return
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+class Importer:
+    """
+    Import rows of one model in chunks, each upserted in its own transaction, so
+    that re-running an import updates rows instead of duplicating them.
+
+    Rows refer to other rows by their natural keys, e.g. a candidate's seat by
+    its level, role, state and so on, and these are resolved against lookup
+    maps loaded with one query per related model. Invalid rows, and every row
+    of a chunk the database refuses, are passed to `reject` with their errors.
+    """
+
+    def __init__(self, model, chunk_size=1000, reject=None):
+        self.model = model
+        self.chunk_size = chunk_size
+        self.reject = reject or (lambda line_number, errors: None)
+        self.identities = {}
+        self.written = 0
+        self.rejected = 0
+
+    def get_identities(self, model):
+        """
+        Return `{natural key: pk}` for every stored row of `model`.
+        """
+        if model not in self.identities:
+            expressions, _ = NATURAL_KEYS[model]
+            rows = model.objects.values_list(*expressions, "pk").iterator()
+            self.identities[model] = {row[:-1]: row[-1] for row in rows}
+        return self.identities[model]
+
+    def resolve(self, model, reference):
+        """
+        Return the pk of the stored row of `model` that a reference identifies.
+        """
+        if model is Endorser and isinstance(reference, str):
+            reference = {"abbreviation": reference}
+        if not isinstance(reference, dict):
+            raise ValidationError(
+                f"Expected the identifying fields of a {model._meta.verbose_name}."
+            )
+        instance, _ = self.build(model, reference, partial=True)
+        try:
+            return self.get_identities(model)[natural_key(instance)]
+        except KeyError:
+            raise ValidationError(
+                f"No {model._meta.verbose_name} matches {json.dumps(reference)}."
+            )
+
+    def build(self, model, row, partial=False):
+        """
+        Return a validated, unsaved instance of `model` for a row, along with the
+        many-to-many values given in the row, so that a file without a
+        many-to-many column leaves the existing values alone. With `partial`,
+        only the given fields are validated.
+        """
+        values, errors, exclude, related = {}, {}, set(), {}
+        if partial:
+            exclude.update(field.name for field in model._meta.fields)
+        for name, value in row.items():
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                field = None
+            if field is None or field.auto_created or not field.editable:
+                errors[name] = ["Unknown field."]
+                continue
+            exclude.discard(name)
+            try:
+                if field.many_to_many:
+                    references = value if isinstance(value, list) else [value]
+                    related[name] = [
+                        field.related_model(pk=self.resolve(field.related_model, ref))
+                        for ref in references
+                    ]
+                elif field.is_relation:
+                    exclude.add(name)
+                    if value not in ("", None):
+                        value = self.resolve(field.related_model, value)
+                    values[field.attname] = value or None
+                elif value in ("", None) and field.null:
+                    values[name] = None
+                else:
+                    values[name] = value
+            except ValidationError as exc:
+                errors[name] = exc.messages
+
+        instance = model(**values)
+        # NULL stands for a value that is unknown rather than blank
+        exclude.update(
+            field.name
+            for field in model._meta.fields
+            if field.null and getattr(instance, field.attname) is None
+        )
+        try:
+            instance.full_clean(
+                exclude=exclude, validate_unique=False, validate_constraints=False
+            )
+        except ValidationError as exc:
+            errors = exc.update_error_dict(errors)
+        if errors:
+            raise ValidationError(errors)
+        return instance, related
+
+    def build_row(self, line_number, row):
+        if not isinstance(row, dict):
+            self.reject_rows(
+                [line_number], ["Each row must be an object of field values."]
+            )
+            return None
+        try:
+            instance, related = self.build(self.model, row)
+        except ValidationError as exc:
+            self.reject_rows([line_number], exc.message_dict)
+            return None
+        return line_number, instance, related
+
+    def reject_rows(self, line_numbers, errors):
+        if not isinstance(errors, dict):
+            errors = {NON_FIELD_ERRORS: errors}
+        for line_number in line_numbers:
+            self.reject(line_number, errors)
+        self.rejected += len(line_numbers)
+
+    def write(self, rows):
+        """
+        Upsert a chunk of built rows in one transaction.
+        """
+        # A later row replaces an earlier one with the same key, as it would if
+        # the two fell in different chunks
+        rows = list({natural_key(row[1]): row for row in rows}.values())
+        constraints, batches = {}, defaultdict(list)
+        for row in rows:
+            constraint = find_upsert_constraint(row[1], UPSERT_CONSTRAINTS[self.model])
+            constraints[constraint.name] = constraint
+            batches[constraint.name].append(row[1])
+        try:
+            with transaction.atomic():
+                for name, batch in batches.items():
+                    upsert(self.model, batch, constraints[name], self.chunk_size)
+                set_many_to_many(
+                    [row[1] for row in rows],
+                    [row[2] for row in rows],
+                    replace=True,
+                    batch_size=self.chunk_size,
+                )
+        except DatabaseError as exc:
+            self.reject_rows([row[0] for row in rows], [str(exc).strip()])
+            return
+        self.written += len(rows)
+        if self.model in self.identities:
+            self.identities[self.model].update(
+                (natural_key(row[1]), row[1].pk) for row in rows
+            )
+
+    def run(self, rows):
+        """
+        Import `(line number, row)` pairs, yielding the number of rows read after
+        each chunk is written.
+        """
+        rows = iter(rows)
+        read = 0
+        while chunk := list(islice(rows, self.chunk_size)):
+            read += len(chunk)
+            built = [self.build_row(*row) for row in chunk]
+            self.write([row for row in built if row is not None])
+            yield read
+        self.finish()
+
+    def finish(self):
+        if self.written:
+            handle_import(self.model)
+
+
+def copy_text(value):
+    """
+    Format a value for the text format of COPY.
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class CopyImporter(Importer):
+    """
+    Import rows by streaming each chunk into a temporary table with COPY, then
+    merging the whole file into the model's table with one INSERT ... ON
+    CONFLICT per unique constraint, which is far faster for a first load.
+
+    Temporary tables are never written to the WAL, so staging costs no more
+    than an unlogged table. Everything happens in one transaction, so if the
+    merge fails, every staged row is rejected and nothing is written.
+    """
+
+    stage = "import_stage"
+
+    def __init__(self, model, chunk_size=1000, reject=None):
+        super().__init__(model, chunk_size, reject)
+        self.fields, self.updates = get_upsert_fields(model)
+        self.constraints = UPSERT_CONSTRAINTS[model]
+        # Many-to-many values are set once the rows have primary keys
+        self.related = {}
+
+    def run(self, rows):
+        with transaction.atomic():
+            self.create_stage()
+            yield from super().run(rows)
+
+    def create_stage(self):
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(field.column) for field in self.fields)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {self.stage} ON COMMIT DROP AS "
+                f"SELECT {columns}, 0 AS import_line, 0 AS import_constraint "
+                f"FROM {quote_name(self.model._meta.db_table)} WITH NO DATA"
+            )
+
+    def write(self, rows):
+        """
+        Stage a chunk of built rows, with the line number and upsert constraint
+        of each.
+        """
+        buffer = StringIO()
+        for line_number, instance, related in rows:
+            constraint = find_upsert_constraint(instance, self.constraints)
+            values = [
+                field.get_db_prep_save(field.pre_save(instance, add=True), connection)
+                for field in self.fields
+            ]
+            values += [line_number, self.constraints.index(constraint)]
+            buffer.write("\t".join(map(copy_text, values)) + "\n")
+            if self.model._meta.many_to_many:
+                self.related[natural_key(instance)] = related
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {self.stage} FROM STDIN", buffer)
+
+    def merge(self, index, constraint):
+        """
+        Upsert the staged rows matched on one constraint, the last of each key
+        winning, and return the pk and natural key of every row written.
+        """
+        meta = self.model._meta
+        quote_name = connection.ops.quote_name
+        columns = ", ".join(quote_name(field.column) for field in self.fields)
+        key, key_params = compile_expressions(
+            self.model, constraint.expressions or constraint.fields
+        )
+        target, target_params = conflict_target(self.model, constraint)
+        returning, returning_params = compile_expressions(
+            self.model, NATURAL_KEYS[self.model][0]
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {quote_name(meta.db_table)} ({columns}) "
+                f"SELECT DISTINCT ON ({key}) {columns} FROM {self.stage} "
+                f"WHERE import_constraint = %s "
+                f"ORDER BY {key}, import_line DESC "
+                f"ON CONFLICT {target} DO UPDATE SET {self.updates} "
+                f"RETURNING {quote_name(meta.pk.column)}, {returning}",
+                key_params + [index] + key_params + target_params + returning_params,
+            )
+            return cursor.fetchall()
+
+    def finish(self):
+        try:
+            with transaction.atomic():
+                written = [
+                    row
+                    for index, constraint in enumerate(self.constraints)
+                    for row in self.merge(index, constraint)
+                ]
+                pks = {tuple(key): pk for pk, *key in written}
+                set_many_to_many(
+                    [self.model(pk=pks[key]) for key in self.related],
+                    list(self.related.values()),
+                    replace=True,
+                    batch_size=self.chunk_size,
+                )
+        except DatabaseError as exc:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT import_line FROM {self.stage} ORDER BY import_line"
+                )
+                line_numbers = [line_number for (line_number,) in cursor.fetchall()]
+            self.reject_rows(line_numbers, [str(exc).strip()])
+            return
+        self.written = len(written)
+        super().finish()
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from voterguide.api.benchmark import timed
+
+# CONN_MAX_AGE values compared, from a connection per request to a persistent one
+MODES = (("per request", 0), ("persistent", 60))
+
+
+class Command(BaseCommand):
+    help = (
+        "Time requests running a single query, connecting for every request and "
+        "reusing a persistent connection, against the configured database. Point "
+        "DATABASE_HOST and DATABASE_PORT at pgbouncer to measure it instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        conn_max_age = connection.settings_dict["CONN_MAX_AGE"]
+        opened = []
+
+        def count(sender, connection, **kwargs):
+            if connection.alias == options["database"]:
+                opened.append(connection)
+
+        def request():
+            # Connections are closed or kept by handlers of these signals, exactly
+            # as for a request served by a gunicorn worker
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            request_finished.send(sender=self.__class__)
+
+        connection_created.connect(count)
+        try:
+            for name, max_age in MODES:
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+                opened.clear()
+                seconds = timed(request, options["requests"])
+                self.stdout.write(
+                    f"{name} (CONN_MAX_AGE={max_age}): "
+                    f"{seconds * 1000:.2f} ms per request, "
+                    f"connections opened: {len(opened)}"
+                )
+        finally:
+            connection_created.disconnect(count)
+            connection.settings_dict["CONN_MAX_AGE"] = conn_max_age
+            connection.close()
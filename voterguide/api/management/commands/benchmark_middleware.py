@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from voterguide.api.benchmark import request_factory, timed
+
+
+def get_handler(middleware):
+    """
+    Return a handler running `middleware` around a view that does nothing, so
+    that only the middleware is timed.
+    """
+    handler = BaseHandler()
+    handler._get_response = lambda request: HttpResponse()
+    with override_settings(MIDDLEWARE=middleware):
+        handler.load_middleware()
+    return handler
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the middleware chain of each middleware profile for an anonymous "
+        "API request, against no middleware at all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20000)
+
+    def handle(self, *args, **options):
+        factory = request_factory()
+        url = reverse("endorser-list")
+        profiles = {**settings.MIDDLEWARE_PROFILES, "none": []}
+        for name, middleware in profiles.items():
+            handler = get_handler(middleware)
+            seconds = timed(
+                lambda: handler.get_response(factory.get(url)), options["repeat"]
+            )
+            self.stdout.write(
+                f"{name} ({len(middleware)} middleware): "
+                f"{seconds * 1_000_000:.1f} us per request"
+            )
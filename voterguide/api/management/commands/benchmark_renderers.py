@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from voterguide.api.benchmark import request_factory, rolled_back, seed, timed
+from voterguide.api.projection import get_projection
+from voterguide.api.renderers import ORJSONRenderer
+from voterguide.api.views import CandidateViewSet, SeatEndorsementViewSet
+
+LISTS = (
+    ("candidates", "candidate-list", CandidateViewSet),
+    ("seat endorsements", "seatendorsement-list", SeatEndorsementViewSet),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time serializing list payloads, with the serializer and from values(), "
+        "and rendering them with each JSON renderer, against seeded rows that are "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def get_view(self, viewset, url_name, rows):
+        request = request_factory().get(reverse(url_name), {"page_size": rows})
+        view = viewset(
+            action_map={"get": "list"}, args=(), kwargs={}, format_kwarg=None
+        )
+        view.request = view.initialize_request(request)
+        return view
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        renderers = {"json": JSONRenderer(), "orjson": ORJSONRenderer()}
+        with rolled_back():
+            seed(rows)
+            for name, url_name, viewset in LISTS:
+                view = self.get_view(viewset, url_name, rows)
+                queryset = view.filter_queryset(view.get_queryset())
+                page = list(queryset[:rows])
+
+                def serialize():
+                    return view.get_serializer(page, many=True).data
+
+                projection = get_projection(view.get_serializer())
+                values = list(
+                    queryset.prefetch_related(None).values(*projection.columns)[:rows]
+                )
+
+                def project():
+                    # Includes the query for many-to-many hyperlinks
+                    return projection.represent(values)
+
+                data = serialize()
+                timings = [
+                    f"serialize {timed(serialize, repeat) * 1000:.1f} ms",
+                    f"values {timed(project, repeat) * 1000:.1f} ms",
+                ]
+                for format, renderer in renderers.items():
+                    seconds = timed(lambda: renderer.render(data), repeat)
+                    timings.append(f"{format} {seconds * 1000:.1f} ms")
+                size = len(renderers["json"].render(data))
+                self.stdout.write(
+                    f"{len(page)} {name} ({size} bytes): {', '.join(timings)}"
+                )
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from voterguide.api.importer import (
+    FORMATS,
+    RESOURCES,
+    CopyImporter,
+    Importer,
+    read_rows,
+)
+
+EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import candidates, endorsers, measures, seats or endorsements from a CSV "
+        "or NDJSON file, updating the rows that are already stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("resource", choices=RESOURCES)
+        parser.add_argument("path", help="The file to import, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="The format of the file, by default taken from its extension.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="The number of rows validated and written at a time.",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help=(
+                "Stage the file with COPY and merge it in a single transaction, "
+                "which is much faster for a first load."
+            ),
+        )
+
+    def get_format(self, path, format):
+        if format:
+            return format
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in EXTENSIONS:
+            raise CommandError(f"Cannot tell the format of {path}, pass --format.")
+        return EXTENSIONS[extension]
+
+    def report_rejected(self, line_number, errors):
+        messages = "; ".join(
+            f"{field}: {' '.join(messages)}" for field, messages in errors.items()
+        )
+        self.stderr.write(f"Line {line_number} rejected: {messages}")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path == "-":
+            format = options["format"]
+            if not format:
+                raise CommandError("Pass --format when reading from stdin.")
+            file = nullcontext(sys.stdin)
+        else:
+            format = self.get_format(path, options["format"])
+            try:
+                file = open(path, newline="", encoding="utf-8")
+            except OSError as exc:
+                raise CommandError(exc)
+
+        importer_class = CopyImporter if options["copy"] else Importer
+        importer = importer_class(
+            RESOURCES[options["resource"]],
+            chunk_size=options["chunk_size"],
+            reject=self.report_rejected,
+        )
+        start = time.monotonic()
+        with file as file:
+            for read in importer.run(read_rows(file, format)):
+                if options["verbosity"] > 0:
+                    rate = read / max(time.monotonic() - start, 1e-6)
+                    self.stdout.write(
+                        f"{read} rows read: {importer.written} written, "
+                        f"{importer.rejected} rejected ({rate:.0f} rows/s)"
+                    )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {importer.written} {options['resource']}, "
+                f"rejected {importer.rejected}."
+            )
+        )
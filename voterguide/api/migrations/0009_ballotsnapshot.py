@@ -0,0 +1,38 @@
+# Generated by Django 4.2.3 on 2026-10-17 19:11
+
+from django.db import migrations, models
+import localflavor.us.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0008_seatendorsement_measureendorsement_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BallotSnapshot",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=500, primary_key=True, serialize=False),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                ("state", localflavor.us.models.USStateField(max_length=2)),
+                ("county", models.CharField(blank=True, max_length=200)),
+                ("city", models.CharField(blank=True, max_length=200)),
+                ("district", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("election_date", models.DateField()),
+                ("document", models.JSONField()),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["state", "election_date"],
+                        name="ballot_snapshot_state_date",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.3 on 2026-10-17 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0009_ballotsnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+                ("resource", models.CharField(max_length=50)),
+                ("object_id", models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="candidate",
+            index=models.Index(fields=["last_updated", "id"], name="candidate_updated"),
+        ),
+        migrations.AddIndex(
+            model_name="endorser",
+            index=models.Index(fields=["last_updated", "id"], name="endorser_updated"),
+        ),
+        migrations.AddIndex(
+            model_name="measure",
+            index=models.Index(fields=["last_updated", "id"], name="measure_updated"),
+        ),
+        migrations.AddIndex(
+            model_name="measureendorsement",
+            index=models.Index(
+                fields=["last_updated", "id"], name="measure_endorsement_updated"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seat",
+            index=models.Index(fields=["last_updated", "id"], name="seat_updated"),
+        ),
+        migrations.AddIndex(
+            model_name="seatendorsement",
+            index=models.Index(
+                fields=["last_updated", "id"], name="seat_endorsement_updated"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["resource", "last_updated", "id"],
+                name="tombstone_resource_updated",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(fields=["last_updated", "id"], name="tombstone_updated"),
+        ),
+    ]
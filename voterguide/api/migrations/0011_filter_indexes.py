@@ -0,0 +1,57 @@
+# Generated by Django 4.2.3 on 2026-10-17 19:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0010_tombstone_last_updated_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="candidate",
+            name="running_for_seat",
+            field=models.ForeignKey(
+                db_index=False,
+                help_text="The seat a candidate is running for.",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to="api.seat",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="candidate",
+            index=models.Index(
+                condition=models.Q(("running_for_seat__isnull", False)),
+                fields=["running_for_seat"],
+                name="candidate_running_for_seat",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="measure",
+            index=models.Index(
+                fields=["state", "election_date"], name="measure_state_date"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="measureendorsement",
+            index=models.Index(
+                fields=["election_date", "endorser"], name="measure_endorsement_date"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seat",
+            index=models.Index(
+                fields=["state", "level", "county", "city", "district"],
+                name="seat_jurisdiction",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seatendorsement",
+            index=models.Index(
+                fields=["election_date", "endorser"], name="seat_endorsement_date"
+            ),
+        ),
+    ]
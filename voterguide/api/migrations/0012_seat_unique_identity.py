@@ -0,0 +1,66 @@
+# Generated by Django 4.2.3 on 2026-10-17 19:30
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import migrations, models
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+
+
+def check_duplicate_seats(apps, schema_editor):
+    """
+    Refuse to add the index over seats that validate_unique() used to allow, such
+    as "Mayor" and "mayor" of the same city or two seats without a district,
+    listing them so that they can be merged or told apart before migrating again.
+    """
+    Seat = apps.get_model("api", "Seat")
+    Lower = django.db.models.functions.text.Lower
+    duplicates = (
+        Seat.objects.using(schema_editor.connection.alias)
+        .values(
+            "level",
+            "branch",
+            "body",
+            "state",
+            role_identity=Lower("role"),
+            district_identity=django.db.models.functions.comparison.Coalesce(
+                "district", models.Value(-1)
+            ),
+            county_identity=Lower("county"),
+            city_identity=Lower("city"),
+        )
+        .annotate(ids=ArrayAgg("id", ordering="id"), count=models.Count("id"))
+        .filter(count__gt=1)
+        .values_list("ids", flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Seats with these ids differ only in letter case, or share a NULL "
+            "district, and must be merged or told apart before "
+            "seat_unique_identity can be added: " + "; ".join(", ".join(map(str, ids)) for ids in duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0011_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_seats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="seat",
+            constraint=models.UniqueConstraint(
+                models.F("level"),
+                models.F("branch"),
+                django.db.models.functions.text.Lower("role"),
+                models.F("body"),
+                django.db.models.functions.comparison.Coalesce(
+                    "district", models.Value(-1)
+                ),
+                models.F("state"),
+                django.db.models.functions.text.Lower("county"),
+                django.db.models.functions.text.Lower("city"),
+                name="seat_unique_identity",
+            ),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.3 on 2026-10-17 20:16
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0012_seat_unique_identity"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="candidate",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "first_name", "middle_name", "last_name", config="simple"
+                ),
+                name="candidate_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="candidate",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    "first_name", name="gin_trgm_ops"
+                ),
+                name="candidate_first_name_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="candidate",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    "last_name", name="gin_trgm_ops"
+                ),
+                name="candidate_last_name_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="measure",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "name", config="english", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                name="measure_search",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="measure",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass("name", name="gin_trgm_ops"),
+                name="measure_name_trgm",
+            ),
+        ),
+    ]
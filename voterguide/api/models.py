@@ -1,7 +1,12 @@
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Q
-from django.db.models.functions import Lower
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce, Lower
 from django.utils.translation import gettext_lazy as _
 from localflavor.us.models import USStateField
 from localflavor.us.us_states import STATE_CHOICES
@@ -52,6 +57,8 @@ class Candidate(models.Model):
         "Seat",
         on_delete=models.SET_NULL,
         null=True,
+        # Indexed below, without the NULLs of candidates not currently running
+        db_index=False,
         help_text="The seat a candidate is running for.",
     )
     seat = models.ForeignKey(
@@ -89,6 +96,30 @@ class Candidate(models.Model):
                 name="candidate_unique_first_last_null_dob",
             ),
         ]
+        indexes = [
+            # Serves `?modified_since=` and keyset pagination by last_updated
+            models.Index(fields=["last_updated", "id"], name="candidate_updated"),
+            # Serves `?running_for_seat=` and the ballot's prefetch of candidates
+            models.Index(
+                fields=["running_for_seat"],
+                condition=Q(running_for_seat__isnull=False),
+                name="candidate_running_for_seat",
+            ),
+            # Serve `?search=`. Names are not stemmed, and misspelt or partial
+            # ones are matched by trigrams.
+            GinIndex(
+                SearchVector("first_name", "middle_name", "last_name", config="simple"),
+                name="candidate_search",
+            ),
+            GinIndex(
+                OpClass("first_name", name="gin_trgm_ops"),
+                name="candidate_first_name_trgm",
+            ),
+            GinIndex(
+                OpClass("last_name", name="gin_trgm_ops"),
+                name="candidate_last_name_trgm",
+            ),
+        ]
 
     def __str__(self):
         born = ""
@@ -108,6 +139,12 @@ class Endorser(models.Model):
     name = models.CharField(max_length=120)
     abbreviation = models.CharField(max_length=20, unique=True)
 
+    class Meta:
+        indexes = [
+            # Serves `?modified_since=` and keyset pagination by last_updated
+            models.Index(fields=["last_updated", "id"], name="endorser_updated"),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.abbreviation})"
 
@@ -141,6 +178,19 @@ class Measure(models.Model):
                 name="measure_state_valid",
             ),
         ]
+        indexes = [
+            # Serves `?modified_since=` and keyset pagination by last_updated
+            models.Index(fields=["last_updated", "id"], name="measure_updated"),
+            # Serves ballots and `?state=&election_date=`
+            models.Index(fields=["state", "election_date"], name="measure_state_date"),
+            # Serve `?search=`, ranking matches on the name above the description
+            GinIndex(
+                SearchVector("name", weight="A", config="english")
+                + SearchVector("description", weight="B", config="english"),
+                name="measure_search",
+            ),
+            GinIndex(OpClass("name", name="gin_trgm_ops"), name="measure_name_trgm"),
+        ]
 
     def __str__(self):
         return (
@@ -149,6 +199,69 @@ class Measure(models.Model):
         )
 
 
+# The values that identify a seat. Text is compared case-insensitively, and a
+# NULL district counts as a value of its own rather than never matching.
+SEAT_IDENTITY = {
+    "level": F("level"),
+    "branch": F("branch"),
+    "role": Lower("role"),
+    "body": F("body"),
+    "district": Coalesce("district", Value(-1)),
+    "state": F("state"),
+    "county": Lower("county"),
+    "city": Lower("city"),
+}
+
+
+class SeatQuerySet(models.QuerySet):
+    def with_identity(self):
+        return self.annotate(
+            **{f"identity_{name}": value for name, value in SEAT_IDENTITY.items()}
+        )
+
+    def find_duplicates(self, seats, existing=True):
+        """
+        Return the positions in `seats` of those whose identity repeats an earlier
+        seat in the list or, if `existing`, a stored seat other than themselves.
+
+        Stored seats are checked with a single query for the whole list, which
+        the `seat_unique_identity` index serves.
+        """
+        identities = [seat.identity() for seat in seats]
+        duplicates = set()
+        seen = set()
+        for position, identity in enumerate(identities):
+            if identity in seen:
+                duplicates.add(position)
+            seen.add(identity)
+        if not existing or not seats:
+            return duplicates
+
+        stored = (
+            self.with_identity()
+            .filter(
+                reduce(
+                    or_,
+                    (
+                        Q(
+                            **{
+                                f"identity_{name}": value
+                                for name, value in zip(SEAT_IDENTITY, identity)
+                            }
+                        )
+                        for identity in seen
+                    ),
+                )
+            )
+            .values_list("pk", *(f"identity_{name}" for name in SEAT_IDENTITY))
+        )
+        stored_pks = {tuple(identity): pk for pk, *identity in stored}
+        for position, (seat, identity) in enumerate(zip(seats, identities)):
+            if stored_pks.get(identity, seat.pk) != seat.pk:
+                duplicates.add(position)
+        return duplicates
+
+
 class Seat(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
@@ -162,6 +275,8 @@ class Seat(models.Model):
     city = models.CharField(max_length=200, blank=True)
     county = models.CharField(max_length=200, blank=True)
 
+    objects = SeatQuerySet.as_manager()
+
     class Meta:
         constraints = [
             # For federal seats where state is null, role and level must be unique
@@ -174,11 +289,24 @@ class Seat(models.Model):
                 condition=Q(state__isnull=True),
                 name="seat_unique_role_level_null_state",
             ),
+            models.UniqueConstraint(
+                *SEAT_IDENTITY.values(),
+                name="seat_unique_identity",
+            ),
             models.CheckConstraint(
                 check=models.Q(level__in=Level.values),
                 name="seat_level_valid",
             ),
         ]
+        indexes = [
+            # Serves `?modified_since=` and keyset pagination by last_updated
+            models.Index(fields=["last_updated", "id"], name="seat_updated"),
+            # Serves ballots and jurisdiction filters, most selective column last
+            models.Index(
+                fields=["state", "level", "county", "city", "district"],
+                name="seat_jurisdiction",
+            ),
+        ]
 
     def __str__(self):
         district_str = ""
@@ -198,18 +326,25 @@ class Seat(models.Model):
             f"{district_str}{city_str}{county_str}{state_str}"
         )
 
+    def identity(self):
+        """
+        Return the normalized values that identify this seat, as in SEAT_IDENTITY.
+        """
+        return (
+            self.level,
+            self.branch,
+            self.role.lower(),
+            self.body,
+            -1 if self.district is None else int(self.district),
+            self.state,
+            self.county.lower(),
+            self.city.lower(),
+        )
+
     def validate_unique(self, *args, **kwargs):
-        # Check that provided data represents a unique seat
-        if self.__class__.objects.filter(
-            level=self.level,
-            branch=self.branch,
-            role=self.role,
-            body=self.body,
-            district=self.district,
-            state=self.state,
-            county=self.county,
-            city=self.city,
-        ).exists():
+        # Check that provided data represents a unique seat. The database enforces
+        # this as well, so the check is only for a helpful error.
+        if Seat.objects.find_duplicates([self]):
             raise ValidationError(
                 f"Seat must be unique at the provided level of {self.level}"
             )
@@ -285,7 +420,8 @@ class Seat(models.Model):
         super().clean(*args, **kwargs)
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        # Constraints are left to the database, which saves a query for each
+        self.full_clean(validate_constraints=False)
         super().save(*args, **kwargs)
 
 
@@ -321,6 +457,17 @@ class MeasureEndorsement(AbstractEndorsement):
                 name="measure_endorsement_unique_endorser_election_date_measure",
             )
         ]
+        indexes = [
+            # Serves `?modified_since=` and keyset pagination by last_updated
+            models.Index(
+                fields=["last_updated", "id"], name="measure_endorsement_updated"
+            ),
+            # Serves ballots and `?election_date=`; lookups by endorser first are
+            # covered by the unique constraint
+            models.Index(
+                fields=["election_date", "endorser"], name="measure_endorsement_date"
+            ),
+        ]
 
     def __str__(self):
         recommends_str = " recommendation is unknown"
@@ -345,6 +492,17 @@ class SeatEndorsement(AbstractEndorsement):
                 name="seat_endorsement_unique_endorser_election_date_seat",
             )
         ]
+        indexes = [
+            # Serves `?modified_since=` and keyset pagination by last_updated
+            models.Index(
+                fields=["last_updated", "id"], name="seat_endorsement_updated"
+            ),
+            # Serves ballots and `?election_date=`; lookups by endorser first are
+            # covered by the unique constraint
+            models.Index(
+                fields=["election_date", "endorser"], name="seat_endorsement_date"
+            ),
+        ]
 
     def __str__(self):
         candidates_str = "no one"
@@ -354,3 +512,75 @@ class SeatEndorsement(AbstractEndorsement):
             f"{self.endorser.abbreviation} is endorsing {candidates_str} for {self.seat}"
             f" on {self.election_date.strftime('%B %-d, %Y')}"
         )
+
+
+class BallotSnapshot(models.Model):
+    """
+    A fully rendered ballot document, as returned by the ballot endpoint, stored
+    so that reading a ballot is a single primary key lookup.
+
+    Snapshots are deleted whenever a model they were rendered from changes, and
+    rendered again on their next read; see `voterguide.api.signals`. Hyperlinks
+    are stored relative to the site root.
+    """
+
+    key = models.CharField(max_length=500, primary_key=True)
+    created = models.DateTimeField(auto_now_add=True)
+    last_updated = models.DateTimeField(auto_now=True)
+    state = USStateField(choices=STATE_CHOICES)
+    county = models.CharField(max_length=200, blank=True)
+    city = models.CharField(max_length=200, blank=True)
+    district = models.PositiveSmallIntegerField(null=True, blank=True)
+    election_date = models.DateField()
+    document = models.JSONField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["state", "election_date"],
+                name="ballot_snapshot_state_date",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Ballot snapshot {self.key}"
+
+    @staticmethod
+    def make_key(state, election_date, county="", city="", district=None):
+        return "|".join(
+            (
+                state,
+                county.lower(),
+                city.lower(),
+                "" if district is None else str(district),
+                election_date.isoformat(),
+            )
+        )
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of a row from one of the API's resources, so that the
+    change feed can report deletions alongside modified rows.
+
+    `last_updated` is the time of deletion, which lets tombstones be filtered and
+    paginated exactly like the resources themselves.
+    """
+
+    created = models.DateTimeField(auto_now_add=True)
+    last_updated = models.DateTimeField(auto_now=True)
+    # The route basename of the deleted row's resource, e.g. "seatendorsement"
+    resource = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["resource", "last_updated", "id"],
+                name="tombstone_resource_updated",
+            ),
+            models.Index(fields=["last_updated", "id"], name="tombstone_updated"),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.resource} {self.object_id}"
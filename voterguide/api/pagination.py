@@ -0,0 +1,217 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+from voterguide.api.filters import ModifiedSinceFilter, SearchFilter
+
+Cursor = namedtuple("Cursor", ["ordering", "position", "reverse"])
+
+
+def flip(field):
+    """
+    Reverse the direction of an ordering field, e.g. `-id` for `id`.
+    """
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination that seeks directly to the page boundary using a
+    `WHERE (a, b) > (x, y)` style predicate over every ordering column.
+
+    DRF's `CursorPagination` only compares on the first ordering field and
+    falls back to an OFFSET to step over ties. Here the ordering always ends
+    in the primary key, so the position is unique and no page ever needs an
+    OFFSET or a COUNT(*), making page N as cheap as page 1.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering_query_param = "ordering"
+    # Orderings a client may request via `?ordering=`. Each one must end in a
+    # unique column so that a position identifies exactly one row. Columns may
+    # be descending, or annotations, such as the rank of a search.
+    ordering_options = {
+        "id": ("id",),
+        "last_updated": ("last_updated", "id"),
+        "rank": (f"-{SearchFilter.rank_annotation}", "id"),
+    }
+    default_ordering = "id"
+    invalid_cursor_message = _("Invalid cursor")
+    invalid_ordering_message = _("Invalid ordering")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Paginate as `paginate_queryset()`, reading the page with the async ORM.
+        """
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page([row async for row in queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the queryset of the requested page, or None if the request is
+        not paginated.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering_name, self.ordering = self.get_ordering(request, queryset, view)
+        self.queryset = queryset
+        self.cursor = self.decode_cursor(request)
+
+        reverse = self.cursor is not None and self.cursor.reverse
+        order_by = [flip(field) if reverse else field for field in self.ordering]
+        queryset = queryset.order_by(*order_by)
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.keyset_filter(self.cursor.position, reverse=reverse)
+            )
+
+        # Fetch one extra row to learn whether there is a following page.
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Keep the rows of the page from `results`, as read from the page queryset.
+        """
+        self.page = results[: self.page_size]
+        has_more = len(results) > self.page_size
+
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    def keyset_filter(self, position, reverse=False):
+        """
+        Build the row-value comparison `(f1, f2, ...) > (v1, v2, ...)` as an OR
+        of equality prefixes, which Postgres can satisfy with an index range scan.
+        """
+        clauses = []
+        for index, field in enumerate(self.ordering):
+            equal = {
+                name.lstrip("-"): position[i]
+                for i, name in enumerate(self.ordering[:index])
+            }
+            lookup = "lt" if field.startswith("-") != reverse else "gt"
+            clauses.append(
+                Q(**equal, **{f"{field.lstrip('-')}__{lookup}": position[index]})
+            )
+        return reduce(or_, clauses)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        else:
+            # Paging forward from an empty reversed page: restart from the cursor.
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(self.ordering_name, position, False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        else:
+            position = self.cursor.position
+        return self.encode_cursor(Cursor(self.ordering_name, position, True))
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Return the name and field tuple for the requested ordering, falling
+        back to the view's `pagination_ordering` and then to `default_ordering`.
+        A search (`?search=`) is ordered by rank, and a change feed request
+        (`?modified_since=`) by last_updated.
+        """
+        default = getattr(view, "pagination_ordering", self.default_ordering)
+        if SearchFilter.rank_annotation in queryset.query.annotations:
+            default = "rank"
+        if ModifiedSinceFilter.modified_since_param in request.query_params:
+            default = "last_updated"
+        name = request.query_params.get(self.ordering_query_param, default)
+        if name not in self.ordering_options:
+            raise NotFound(self.invalid_ordering_message)
+        # An annotation can only be ordered by when the queryset has it
+        try:
+            for field in self.ordering_options[name]:
+                self.get_field(queryset, field)
+        except FieldDoesNotExist:
+            raise NotFound(self.invalid_ordering_message)
+        return name, self.ordering_options[name]
+
+    def get_field(self, queryset, field):
+        """
+        Return the model field, or the output field of the annotation, that an
+        ordering field orders by.
+        """
+        name = field.lstrip("-")
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        return queryset.model._meta.get_field(name)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            tokens = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            ordering, raw_position, reverse = tokens["o"], tokens["p"], tokens["r"]
+            if ordering != self.ordering_name or len(raw_position) != len(
+                self.ordering
+            ):
+                raise ValueError(ordering)
+            position = tuple(
+                self.get_field(self.queryset, field).to_python(value)
+                for field, value in zip(self.ordering, raw_position)
+            )
+        except (TypeError, ValueError, KeyError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(ordering=ordering, position=position, reverse=bool(reverse))
+
+    def encode_cursor(self, cursor):
+        tokens = {
+            "o": cursor.ordering,
+            "p": [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in cursor.position
+            ],
+            "r": int(cursor.reverse),
+        }
+        payload = json.dumps(tokens, separators=(",", ":")).encode("ascii")
+        encoded = urlsafe_b64encode(payload).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        names = [field.lstrip("-") for field in ordering]
+        if isinstance(instance, dict):
+            return tuple(instance[name] for name in names)
+        return tuple(getattr(instance, name) for name in names)
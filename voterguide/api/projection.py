@@ -0,0 +1,213 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.response import Response
+
+from voterguide.api.fields import (
+    TemplatedHyperlinkedIdentityField,
+    TemplatedHyperlinkedRelatedField,
+)
+
+# Fields whose representation of a database value is the value itself
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+
+
+def get_url_template(field):
+    """
+    Return the `(prefix, suffix)` of a hyperlink field's URLs, formatted as in
+    `HyperlinkedRelatedField.to_representation()`, or None if the field cannot
+    be formatted from a primary key.
+    """
+    if field.lookup_field != "pk":
+        return None
+    format = field.context.get("format")
+    if format and field.format and field.format != format:
+        format = field.format
+    return field.get_url_template(field.view_name, field.context["request"], format)
+
+
+def hyperlink(template):
+    """
+    Return a function formatting the URL of a primary key from a URL template.
+    """
+    prefix, suffix = template
+    return lambda pk: f"{prefix}{pk}{suffix}"
+
+
+def hyperlink_many(template, related):
+    """
+    Return a function formatting the URLs of the rows related to a primary key
+    from a URL template and a mapping of primary keys to related ones.
+    """
+    url = hyperlink(template)
+    return lambda pk: [url(related_pk) for related_pk in related.get(pk, ())]
+
+
+class Projection:
+    """
+    Renders the rows of `queryset.values()` as a serializer would render the
+    corresponding model instances, without instantiating either.
+
+    Built by `get_projection()`, which declines any serializer field whose
+    representation is not a function of a single column. Many-to-many hyperlinks
+    are read from the through table with one query per list of rows.
+    """
+
+    def __init__(self, model, fields):
+        self.pk_column = model._meta.pk.attname
+        # Tuples of (name, column, convert, many_to_many field, URL template),
+        # in the order of the serializer's fields
+        self.fields = fields
+        columns = [self.pk_column, "last_updated"]
+        columns += [column for _, column, *_ in fields if column]
+        # The primary key and last_updated are always read, by many-to-many
+        # fields and by keyset pagination
+        self.columns = list(dict.fromkeys(columns))
+
+    def values(self, queryset):
+        """
+        Return `queryset.values()` with the columns of the serializer, and any
+        annotations, such as a search rank that pagination may order by.
+        """
+        return queryset.prefetch_related(None).values(
+            *self.columns, *queryset.query.annotation_select
+        )
+
+    def get_related_querysets(self, rows):
+        """
+        Return the `(primary key, related primary key)` pairs of each
+        many-to-many field for `rows`, as querysets by field name.
+        """
+        pks = [row[self.pk_column] for row in rows]
+        querysets = {}
+        for name, _, _, model_field, _ in self.fields:
+            if model_field is None or not pks:
+                continue
+            through = model_field.remote_field.through
+            source = through._meta.get_field(model_field.m2m_field_name())
+            target = through._meta.get_field(model_field.m2m_reverse_field_name())
+            querysets[name] = through.objects.filter(
+                **{f"{source.attname}__in": pks}
+            ).values_list(source.attname, target.attname)
+        return querysets
+
+    def represent(self, rows):
+        rows = list(rows)
+        related = {
+            name: list(queryset)
+            for name, queryset in self.get_related_querysets(rows).items()
+        }
+        return self.render(rows, related)
+
+    async def arepresent(self, rows):
+        """
+        Represent `rows` as `represent()`, reading related rows with the async ORM.
+        """
+        related = {
+            name: [pair async for pair in queryset]
+            for name, queryset in self.get_related_querysets(rows).items()
+        }
+        return self.render(rows, related)
+
+    def render(self, rows, related):
+        fields = []
+        for name, column, convert, model_field, template in self.fields:
+            if model_field is not None:
+                related_pks = {}
+                for pk, related_pk in related.get(name, ()):
+                    related_pks.setdefault(pk, []).append(related_pk)
+                column = self.pk_column
+                convert = hyperlink_many(template, related_pks)
+            fields.append((name, column, convert))
+
+        results = []
+        for row in rows:
+            result = {}
+            for name, column, convert in fields:
+                value = row[column]
+                result[name] = (
+                    value if convert is None or value is None else convert(value)
+                )
+            results.append(result)
+        return results
+
+
+def get_projection(serializer):
+    """
+    Return a `Projection` rendering the same rows as `serializer`, or None if
+    one of its fields is not supported.
+    """
+    meta = serializer.Meta.model._meta
+    fields = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, TemplatedHyperlinkedIdentityField):
+            if (template := get_url_template(field)) is None:
+                return None
+            fields.append((name, meta.pk.attname, hyperlink(template), None, None))
+            continue
+        if field.source == "*" or "." in field.source:
+            return None
+        try:
+            model_field = meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if isinstance(field, ManyRelatedField):
+            child = field.child_relation
+            if not (
+                isinstance(child, TemplatedHyperlinkedRelatedField)
+                and model_field.many_to_many
+                and model_field.concrete
+            ):
+                return None
+            if (template := get_url_template(child)) is None:
+                return None
+            fields.append((name, None, None, model_field, template))
+        elif isinstance(field, TemplatedHyperlinkedRelatedField):
+            if not model_field.many_to_one:
+                return None
+            if (template := get_url_template(field)) is None:
+                return None
+            fields.append((name, model_field.attname, hyperlink(template), None, None))
+        elif (
+            isinstance(field, (RelatedField, serializers.BaseSerializer))
+            or model_field.is_relation
+            or not model_field.concrete
+        ):
+            return None
+        else:
+            convert = (
+                None
+                if isinstance(field, PASSTHROUGH_FIELDS)
+                else field.to_representation
+            )
+            fields.append((name, model_field.attname, convert, None, None))
+    return Projection(serializer.Meta.model, fields)
+
+
+class ValuesListMixin:
+    """
+    Serve `list` from `queryset.values()` rather than model instances, with each
+    row rendered by a `Projection` of the viewset's serializer, which skips model
+    instantiation and the serializer's per-field attribute lookups.
+
+    Serializers with fields that a projection cannot render, such as expanded
+    related rows, are listed as usual.
+    """
+
+    def list(self, request, *args, **kwargs):
+        projection = get_projection(self.get_serializer())
+        if projection is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = projection.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(projection.represent(page))
+        return Response(projection.represent(queryset))
@@ -0,0 +1,79 @@
+import msgpack
+import orjson
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ContentNegotiation(DefaultContentNegotiation):
+    """
+    DRF only picks a renderer whose media type has parameters, such as
+    `application/json; encoder=orjson`, when the Accept header names them too,
+    which would refuse `?format=orjson` from a client accepting anything. An
+    explicit format is honored in that case.
+    """
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            format_param = self.settings.URL_FORMAT_OVERRIDE
+            format = format_suffix or request.query_params.get(format_param)
+            if not format:
+                raise
+            renderer = self.filter_renderers(renderers, format)[0]
+            return renderer, renderer.media_type
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renders the same JSON as `JSONRenderer` with orjson, a C encoder that is
+    several times faster on large lists. Chosen with `?format=orjson` or an
+    `Accept: application/json; encoder=orjson` header.
+
+    orjson encodes dicts (including the OrderedDicts serializers return), lists,
+    strings and numbers natively, and anything else is handed to DRF's encoder,
+    which covers Decimals, lazy translation strings and dates formatted as DRF
+    formats them. Indented output falls back to the stdlib encoder.
+    """
+
+    media_type = "application/json; encoder=orjson"
+    format = "orjson"
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        rendered = orjson.dumps(
+            data, default=JSONEncoder().default, option=self.options
+        )
+        # Escaped as by JSONRenderer, so the output is a strict JavaScript subset
+        return rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders MessagePack, which is smaller than JSON and much faster to decode,
+    for machine consumers such as sync workers. Chosen with
+    `Accept: application/msgpack`, which takes a version like JSON does, or
+    `?format=msgpack`.
+
+    Values are those JSON would carry: anything MessagePack has no type for
+    is converted by DRF's JSON encoder, e.g. Decimals become floats.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=JSONEncoder().default, datetime=False)
@@ -0,0 +1,109 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+# The replica alias that reads of the current request are routed to, if any
+replica_alias = ContextVar("replica_alias", default=None)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Set on a client that wrote, whose reads go to the primary until it expires
+PIN_COOKIE = "replica_pin"
+
+
+def get_replica_alias(request):
+    """
+    Return a replica alias for the reads of `request`, or None if they should
+    go to the primary: for writes, and for reads by a client that wrote within
+    the last `DATABASE_REPLICA_PIN_SECONDS`, so it reads its own writes even if
+    the replicas lag behind.
+    """
+    if (
+        not settings.DATABASE_REPLICAS
+        or request.method not in SAFE_METHODS
+        or PIN_COOKIE in request.COOKIES
+    ):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def pin_to_primary(request, response):
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            PIN_COOKIE,
+            "1",
+            max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Route the reads within the block to the primary, whichever database the
+    request reads from, e.g. to render something that outlives the request.
+    """
+    token = replica_alias.set(None)
+    try:
+        yield
+    finally:
+        replica_alias.reset(token)
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response):
+    """
+    Route the reads of safe requests to one of the `DATABASE_REPLICAS`, chosen
+    once per request so that its queries see a single replica's state, through
+    `ReplicaRouter`. Anything else reads from and writes to the primary.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            token = replica_alias.set(get_replica_alias(request))
+            try:
+                response = await get_response(request)
+            finally:
+                replica_alias.reset(token)
+            return pin_to_primary(request, response)
+
+    else:
+
+        def middleware(request):
+            token = replica_alias.set(get_replica_alias(request))
+            try:
+                response = get_response(request)
+            finally:
+                replica_alias.reset(token)
+            return pin_to_primary(request, response)
+
+    return middleware
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica chosen by `replica_middleware` for the current
+    request, and everything else to the primary, the "default" database.
+
+    Replicas are never migrated, since they replicate the primary's schema.
+    """
+
+    def db_for_read(self, model, **hints):
+        return replica_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every database holds the same rows
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
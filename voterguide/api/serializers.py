@@ -1,5 +1,10 @@
+from localflavor.us.us_states import STATE_CHOICES
 from rest_framework import serializers
 
+from voterguide.api.fields import (
+    TemplatedHyperlinkedIdentityField,
+    TemplatedHyperlinkedRelatedField,
+)
 from voterguide.api.models import (
     Candidate,
     Endorser,
@@ -7,14 +12,26 @@ from voterguide.api.models import (
     MeasureEndorsement,
     Seat,
     SeatEndorsement,
+    Tombstone,
 )
 
 
-class CandidateSerializer(serializers.HyperlinkedModelSerializer):
+class HyperlinkedModelSerializer(serializers.HyperlinkedModelSerializer):
+    """
+    A `HyperlinkedModelSerializer` whose hyperlinks are formatted from a URL
+    template resolved once per request instead of reversed for every row.
+    """
+
+    serializer_related_field = TemplatedHyperlinkedRelatedField
+    serializer_url_field = TemplatedHyperlinkedIdentityField
+
+
+class CandidateSerializer(HyperlinkedModelSerializer):
     class Meta:
         model = Candidate
         fields = [
             "id",
+            "last_updated",
             "first_name",
             "middle_name",
             "last_name",
@@ -26,22 +43,24 @@ class CandidateSerializer(serializers.HyperlinkedModelSerializer):
         ]
 
 
-class EndorserSerializer(serializers.HyperlinkedModelSerializer):
+class EndorserSerializer(HyperlinkedModelSerializer):
     class Meta:
         model = Endorser
         fields = [
             "id",
+            "last_updated",
             "name",
             "abbreviation",
             "url",
         ]
 
 
-class MeasureSerializer(serializers.HyperlinkedModelSerializer):
+class MeasureSerializer(HyperlinkedModelSerializer):
     class Meta:
         model = Measure
         fields = [
             "id",
+            "last_updated",
             "name",
             "description",
             "level",
@@ -53,11 +72,12 @@ class MeasureSerializer(serializers.HyperlinkedModelSerializer):
         ]
 
 
-class SeatSerializer(serializers.HyperlinkedModelSerializer):
+class SeatSerializer(HyperlinkedModelSerializer):
     class Meta:
         model = Seat
         fields = [
             "id",
+            "last_updated",
             "level",
             "branch",
             "role",
@@ -70,11 +90,12 @@ class SeatSerializer(serializers.HyperlinkedModelSerializer):
         ]
 
 
-class MeasureEndorsementSerializer(serializers.HyperlinkedModelSerializer):
+class MeasureEndorsementSerializer(HyperlinkedModelSerializer):
     class Meta:
         model = MeasureEndorsement
         fields = [
             "id",
+            "last_updated",
             "endorser",
             "election_date",
             "url",
@@ -84,11 +105,12 @@ class MeasureEndorsementSerializer(serializers.HyperlinkedModelSerializer):
         ]
 
 
-class SeatEndorsementSerializer(serializers.HyperlinkedModelSerializer):
+class SeatEndorsementSerializer(HyperlinkedModelSerializer):
     class Meta:
         model = SeatEndorsement
         fields = [
             "id",
+            "last_updated",
             "endorser",
             "election_date",
             "url",
@@ -96,3 +118,91 @@ class SeatEndorsementSerializer(serializers.HyperlinkedModelSerializer):
             "candidates",
             "url",
         ]
+
+
+class TombstoneSerializer(HyperlinkedModelSerializer):
+    class Meta:
+        model = Tombstone
+        fields = [
+            "id",
+            "last_updated",
+            "resource",
+            "object_id",
+            "url",
+        ]
+
+
+class BallotQuerySerializer(serializers.Serializer):
+    """
+    Validates the query parameters identifying a ballot.
+    """
+
+    state = serializers.ChoiceField(choices=STATE_CHOICES)
+    election_date = serializers.DateField()
+    county = serializers.CharField(required=False, default="")
+    city = serializers.CharField(required=False, default="")
+    district = serializers.IntegerField(required=False, default=None, min_value=0)
+
+
+class BallotSeatEndorsementSerializer(HyperlinkedModelSerializer):
+    endorser = EndorserSerializer()
+
+    class Meta:
+        model = SeatEndorsement
+        fields = [
+            "id",
+            "endorser",
+            "url",
+            "candidates",
+        ]
+
+
+class BallotMeasureEndorsementSerializer(HyperlinkedModelSerializer):
+    endorser = EndorserSerializer()
+
+    class Meta:
+        model = MeasureEndorsement
+        fields = [
+            "id",
+            "endorser",
+            "url",
+            "recommendation",
+        ]
+
+
+class BallotSeatSerializer(SeatSerializer):
+    candidates = CandidateSerializer(many=True, source="running_candidates")
+    incumbents = CandidateSerializer(many=True)
+    endorsements = BallotSeatEndorsementSerializer(
+        many=True, source="ballot_endorsements"
+    )
+
+    class Meta(SeatSerializer.Meta):
+        fields = SeatSerializer.Meta.fields + [
+            "candidates",
+            "incumbents",
+            "endorsements",
+        ]
+
+
+class BallotMeasureSerializer(MeasureSerializer):
+    endorsements = BallotMeasureEndorsementSerializer(
+        many=True, source="ballot_endorsements"
+    )
+
+    class Meta(MeasureSerializer.Meta):
+        fields = MeasureSerializer.Meta.fields + ["endorsements"]
+
+
+class BallotSerializer(serializers.Serializer):
+    """
+    Renders the mapping returned by `voterguide.api.ballot.get_ballot()`.
+    """
+
+    state = serializers.CharField()
+    county = serializers.CharField()
+    city = serializers.CharField()
+    district = serializers.IntegerField(allow_null=True)
+    election_date = serializers.DateField()
+    seats = BallotSeatSerializer(many=True, read_only=True)
+    measures = BallotMeasureSerializer(many=True, read_only=True)
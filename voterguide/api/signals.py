@@ -0,0 +1,224 @@
+from functools import partial, reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from voterguide.api import generations
+from voterguide.api.ballot import discard_ballot_snapshots
+from voterguide.api.models import (
+    Candidate,
+    Endorser,
+    Measure,
+    MeasureEndorsement,
+    Seat,
+    SeatEndorsement,
+    Tombstone,
+)
+
+# An empty Q() drops out of an OR, so "every snapshot" needs a real predicate.
+ALL_SNAPSHOTS = Q(pk__isnull=False)
+
+
+def state_query(state):
+    # Seats without a state, such as President, appear on every ballot
+    return Q(state=state) if state else ALL_SNAPSHOTS
+
+
+def seat_query(seat):
+    return state_query(seat.state) | Q(document__seats__contains=[{"id": seat.pk}])
+
+
+def candidate_query(candidate):
+    return candidates_query([candidate])
+
+
+def candidates_query(candidates):
+    seat_ids = {
+        pk
+        for candidate in candidates
+        for pk in (candidate.running_for_seat_id, candidate.seat_id)
+        if pk
+    }
+    states = (
+        Seat.objects.filter(pk__in=seat_ids).values_list("state", flat=True).distinct()
+    )
+    return reduce(
+        or_,
+        [state_query(state) for state in states],
+        # Snapshots that still list a candidate under a previous seat
+        reduce(
+            or_,
+            [
+                Q(document__seats__contains=[{"candidates": [{"id": candidate.pk}]}])
+                | Q(document__seats__contains=[{"incumbents": [{"id": candidate.pk}]}])
+                for candidate in candidates
+            ],
+        ),
+    )
+
+
+def measure_query(measure):
+    return Q(state=measure.state, election_date=measure.election_date) | Q(
+        document__measures__contains=[{"id": measure.pk}]
+    )
+
+
+def seat_endorsement_query(endorsement):
+    return (
+        Q(election_date=endorsement.election_date) & state_query(endorsement.seat.state)
+    ) | Q(document__seats__contains=[{"endorsements": [{"id": endorsement.pk}]}])
+
+
+def measure_endorsement_query(endorsement):
+    return Q(
+        election_date=endorsement.election_date, state=endorsement.measure.state
+    ) | Q(document__measures__contains=[{"endorsements": [{"id": endorsement.pk}]}])
+
+
+def endorser_query(endorser):
+    endorsement = {"endorsements": [{"endorser": {"id": endorser.pk}}]}
+    return Q(document__seats__contains=[endorsement]) | Q(
+        document__measures__contains=[endorsement]
+    )
+
+
+SNAPSHOT_QUERIES = {
+    Candidate: candidate_query,
+    Endorser: endorser_query,
+    Measure: measure_query,
+    MeasureEndorsement: measure_endorsement_query,
+    Seat: seat_query,
+    SeatEndorsement: seat_endorsement_query,
+}
+
+
+# Queries covering a whole batch where that saves a query per instance
+BULK_SNAPSHOT_QUERIES = {
+    Candidate: candidates_query,
+}
+
+
+# API resources whose cached responses may render each model, either directly,
+# inline with `?expand=`, or through a relation that is updated without signals
+# (e.g. SET_NULL). Their list validators change with them too.
+CACHED_RESOURCES = {
+    Candidate: ("candidate", "seatendorsement", "ballot"),
+    Endorser: ("endorser", "seatendorsement", "measureendorsement", "ballot"),
+    Measure: ("measure", "measureendorsement", "ballot"),
+    MeasureEndorsement: ("measureendorsement", "ballot"),
+    Seat: ("seat", "candidate", "seatendorsement", "ballot"),
+    SeatEndorsement: ("seatendorsement", "ballot"),
+}
+
+
+def schedule_discard(query):
+    """
+    Discard the matching ballot snapshots once the current transaction commits,
+    so that rolled back writes never reach a snapshot. Each is rendered again on
+    its next read, rather than all of them within the write request.
+    """
+    transaction.on_commit(partial(discard_ballot_snapshots, query))
+
+
+def schedule_invalidation(resources):
+    """
+    Invalidate cached responses once the current transaction commits.
+
+    Must be scheduled after any snapshot discard, and waits for the commit so
+    that a concurrent read cannot cache pre-commit data under the new generation.
+    """
+    transaction.on_commit(partial(generations.invalidate, *resources))
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def handle_model_change(sender, instance, **kwargs):
+    if sender not in SNAPSHOT_QUERIES or kwargs.get("raw", False):
+        return
+    schedule_discard(SNAPSHOT_QUERIES[sender](instance))
+    schedule_invalidation(CACHED_RESOURCES[sender])
+
+
+def handle_bulk_write(model, instances):
+    """
+    Stand in for `handle_model_change` after a bulk write of saved instances,
+    since `bulk_create()` and raw upserts do not send model signals.
+    """
+    if not instances:
+        return
+    if model in BULK_SNAPSHOT_QUERIES:
+        query = BULK_SNAPSHOT_QUERIES[model](instances)
+    else:
+        query = reduce(or_, map(SNAPSHOT_QUERIES[model], instances))
+    schedule_discard(query)
+    schedule_invalidation(CACHED_RESOURCES[model])
+
+
+def handle_import(model):
+    """
+    Stand in for `handle_model_change` after an import, whose rows may touch any
+    ballot, by discarding every snapshot once instead of once per row.
+    """
+    schedule_discard(ALL_SNAPSHOTS)
+    schedule_invalidation(CACHED_RESOURCES[model])
+
+
+@receiver(m2m_changed, sender=SeatEndorsement.candidates.through)
+def handle_candidates_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        schedule_discard(seat_endorsement_query(instance))
+    elif pk_set:
+        endorsements = SeatEndorsement.objects.filter(pk__in=pk_set)
+        schedule_discard(reduce(or_, map(seat_endorsement_query, endorsements)))
+    else:
+        # A reverse clear does not report which endorsements were affected
+        schedule_discard(ALL_SNAPSHOTS)
+    schedule_invalidation(CACHED_RESOURCES[SeatEndorsement])
+
+
+@receiver(post_delete)
+def record_tombstone(sender, instance, **kwargs):
+    if sender not in CACHED_RESOURCES:
+        return
+    Tombstone.objects.create(resource=sender._meta.model_name, object_id=instance.pk)
+    schedule_invalidation(["tombstone"])
+
+
+# The writes below happen without saving the affected rows, so their
+# last_updated is bumped explicitly to surface them in the change feed.
+
+
+@receiver(pre_delete, sender=Seat)
+def touch_candidates_of_deleted_seat(sender, instance, **kwargs):
+    # Candidate.running_for_seat and Candidate.seat are SET_NULL
+    Candidate.objects.filter(Q(running_for_seat=instance) | Q(seat=instance)).update(
+        last_updated=timezone.now()
+    )
+
+
+@receiver(pre_delete, sender=Candidate)
+def touch_endorsements_of_deleted_candidate(sender, instance, **kwargs):
+    SeatEndorsement.objects.filter(candidates=instance).update(
+        last_updated=timezone.now()
+    )
+
+
+@receiver(m2m_changed, sender=SeatEndorsement.candidates.through)
+def touch_endorsements_on_candidates_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("pre_add", "pre_remove", "pre_clear"):
+        return
+    if not reverse:
+        endorsements = SeatEndorsement.objects.filter(pk=instance.pk)
+    elif action == "pre_clear":
+        endorsements = SeatEndorsement.objects.filter(candidates=instance)
+    else:
+        endorsements = SeatEndorsement.objects.filter(pk__in=pk_set)
+    endorsements.update(last_updated=timezone.now())
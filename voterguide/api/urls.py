@@ -4,10 +4,12 @@ from rest_framework.routers import DefaultRouter
 from voterguide.api import views
 
 router = DefaultRouter()
+router.register(r"ballot", views.BallotViewSet, basename="ballot")
 router.register(r"candidates", views.CandidateViewSet, basename="candidate")
 router.register(r"endorsers", views.EndorserViewSet, basename="endorser")
 router.register(r"measures", views.MeasureViewSet, basename="measure")
 router.register(r"seats", views.SeatViewSet, basename="seat")
+router.register(r"tombstones", views.TombstoneViewSet, basename="tombstone")
 router.register(
     r"measure-endorsements",
     views.MeasureEndorsementViewSet,
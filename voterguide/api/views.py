@@ -1,5 +1,14 @@
+from django.core.exceptions import ValidationError
 from rest_framework import viewsets
+from rest_framework.response import Response
 
+from voterguide.api.asynchronous import AsyncReadMixin
+from voterguide.api.ballot import absolutize_hyperlinks, get_ballot_document
+from voterguide.api.bulk import BulkWriteMixin
+from voterguide.api.cache import CacheResponseMixin
+from voterguide.api.conditional import ConditionalGetMixin
+from voterguide.api.export import ExportMixin
+from voterguide.api.fieldsets import SparseFieldsetMixin
 from voterguide.api.models import (
     Candidate,
     Endorser,
@@ -7,66 +16,249 @@ from voterguide.api.models import (
     MeasureEndorsement,
     Seat,
     SeatEndorsement,
+    Tombstone,
 )
+from voterguide.api.projection import ValuesListMixin
 from voterguide.api.serializers import (
+    BallotQuerySerializer,
+    BallotSerializer,
     CandidateSerializer,
     EndorserSerializer,
     MeasureEndorsementSerializer,
     MeasureSerializer,
     SeatEndorsementSerializer,
     SeatSerializer,
+    TombstoneSerializer,
 )
 
 
-class CandidateViewSet(viewsets.ModelViewSet):
+class CandidateViewSet(
+    BulkWriteMixin,
+    CacheResponseMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     This viewset provides `list`, `create`, `retrieve`, `update` and `destroy` actions.
+
+    Accepts optional `party`, `running_for_seat` and `seat` query parameters.
+    Candidates can be searched by name with `?search=`, most relevant first.
+    Batches can be created or upserted on name and date of birth at `bulk/`.
+    Every row can be streamed as NDJSON or CSV from `export/`.
+    Rows can be trimmed to some of their fields with `?fields=` or `?exclude=`.
+    Seats can be rendered inline with `?expand=running_for_seat,seat`.
     """
 
     queryset = Candidate.objects.all()
     serializer_class = CandidateSerializer
+    filter_fields = ("party", "running_for_seat", "seat")
+    search_indexes = (
+        "candidate_search",
+        "candidate_first_name_trgm",
+        "candidate_last_name_trgm",
+    )
+    upsert_constraints = (
+        "candidate_unique_first_last_dob",
+        "candidate_unique_first_last_null_dob",
+    )
+    expandable_fields = {"running_for_seat": SeatSerializer, "seat": SeatSerializer}
 
 
-class EndorserViewSet(viewsets.ModelViewSet):
+class EndorserViewSet(
+    CacheResponseMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     This viewset provides `list`, `create`, `retrieve`, `update` and `destroy` actions.
+
+    Accepts an optional `abbreviation` query parameter.
+    Every row can be streamed as NDJSON or CSV from `export/`.
+    Rows can be trimmed to some of their fields with `?fields=` or `?exclude=`.
     """
 
     queryset = Endorser.objects.all()
     serializer_class = EndorserSerializer
+    filter_fields = ("abbreviation",)
 
 
-class MeasureViewSet(viewsets.ModelViewSet):
+class MeasureViewSet(
+    CacheResponseMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     This viewset provides `list`, `create`, `retrieve`, `update` and `destroy` actions.
+
+    Accepts optional `state`, `election_date`, `level`, `county` and `city` query
+    parameters.
+    Measures can be searched by name and description with `?search=`, most
+    relevant first.
+    Every row can be streamed as NDJSON or CSV from `export/`.
+    Rows can be trimmed to some of their fields with `?fields=` or `?exclude=`.
     """
 
     queryset = Measure.objects.all()
     serializer_class = MeasureSerializer
+    filter_fields = ("state", "election_date", "level", "county", "city")
+    search_indexes = ("measure_search", "measure_name_trgm")
 
 
-class SeatViewSet(viewsets.ModelViewSet):
+class SeatViewSet(
+    BulkWriteMixin,
+    CacheResponseMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     This viewset provides `list`, `create`, `retrieve`, `update` and `destroy` actions.
+
+    Accepts optional `state`, `level`, `county`, `city`, `district`, `branch` and
+    `body` query parameters. Batches can be created or upserted on the seat's
+    identity at `bulk/`.
+    Every row can be streamed as NDJSON or CSV from `export/`.
+    Rows can be trimmed to some of their fields with `?fields=` or `?exclude=`.
     """
 
     queryset = Seat.objects.all()
     serializer_class = SeatSerializer
+    filter_fields = ("state", "level", "county", "city", "district", "branch", "body")
+
+    upsert_constraints = ("seat_unique_identity",)
+
+    def clean_instance(self, instance):
+        # As in Seat.save(), with uniqueness checked for the whole batch instead
+        instance.full_clean(validate_unique=False, validate_constraints=False)
 
+    def validate_batch(self, instances, upsert):
+        # An upsert is expected to match stored seats, but not to repeat itself
+        duplicates = Seat.objects.find_duplicates(instances, existing=not upsert)
+        return {
+            position: ValidationError(
+                f"Seat must be unique at the provided level of {instances[position].level}"
+            )
+            for position in duplicates
+        }
 
-class MeasureEndorsementViewSet(viewsets.ModelViewSet):
+
+class MeasureEndorsementViewSet(
+    BulkWriteMixin,
+    CacheResponseMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     This viewset provides `list`, `create`, `retrieve`, `update` and `destroy` actions.
+
+    Accepts optional `election_date`, `endorser`, `measure` and `recommendation`
+    query parameters. Batches can be created or upserted on endorser, election
+    date and measure at `bulk/`.
+    Every row can be streamed as NDJSON or CSV from `export/`.
+    Rows can be trimmed to some of their fields with `?fields=` or `?exclude=`.
+    The endorser and measure can be rendered inline with `?expand=endorser,measure`.
     """
 
     queryset = MeasureEndorsement.objects.all()
     serializer_class = MeasureEndorsementSerializer
+    filter_fields = ("election_date", "endorser", "measure", "recommendation")
+    upsert_constraints = ("measure_endorsement_unique_endorser_election_date_measure",)
+    expandable_fields = {"endorser": EndorserSerializer, "measure": MeasureSerializer}
 
 
-class SeatEndorsementViewSet(viewsets.ModelViewSet):
+class SeatEndorsementViewSet(
+    BulkWriteMixin,
+    CacheResponseMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     This viewset provides `list`, `create`, `retrieve`, `update` and `destroy` actions.
+
+    Accepts optional `election_date`, `endorser` and `seat` query parameters.
+    Batches can be created or upserted on endorser, election date and seat at
+    `bulk/`.
+    Every row can be streamed as NDJSON or CSV from `export/`.
+    Rows can be trimmed to some of their fields with `?fields=` or `?exclude=`.
+    Related rows can be rendered inline with `?expand=endorser,seat,candidates`.
     """
 
     queryset = SeatEndorsement.objects.all()
     serializer_class = SeatEndorsementSerializer
+    filter_fields = ("election_date", "endorser", "seat")
+    upsert_constraints = ("seat_endorsement_unique_endorser_election_date_seat",)
+    expandable_fields = {
+        "endorser": EndorserSerializer,
+        "seat": SeatSerializer,
+        "candidates": CandidateSerializer,
+    }
+
+
+class TombstoneViewSet(
+    CacheResponseMixin,
+    ConditionalGetMixin,
+    ExportMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin,
+    AsyncReadMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    """
+    This viewset provides `list` and `retrieve` actions for the deletions of rows
+    from the other resources. Combined with `?modified_since=` on each resource,
+    it lets a client mirror the API incrementally.
+
+    Accepts an optional `resource` query parameter, e.g. `?resource=candidate`.
+    Every row can be streamed as NDJSON or CSV from `export/`.
+    Rows can be trimmed to some of their fields with `?fields=` or `?exclude=`.
+    """
+
+    queryset = Tombstone.objects.all()
+    serializer_class = TombstoneSerializer
+    filter_fields = ("resource",)
+
+
+class BallotViewSet(CacheResponseMixin, viewsets.GenericViewSet):
+    """
+    This viewset provides a read-only `list` action that assembles the full voter
+    guide for a jurisdiction: every contested seat with its candidates, incumbents
+    and endorsements, and every measure with its endorsements.
+
+    Requires `state` and `election_date` query parameters, and optionally accepts
+    `county`, `city` and `district`. Ballots are served from their materialized
+    snapshot, which is built on first read and discarded by model signals.
+    """
+
+    serializer_class = BallotSerializer
+    pagination_class = None
+    cache_resource = "ballot"
+
+    def list(self, request, *args, **kwargs):
+        query = BallotQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        document = get_ballot_document(**query.validated_data)
+        base_url = request.build_absolute_uri("/")[:-1]
+        return Response(absolutize_hyperlinks(document, base_url))
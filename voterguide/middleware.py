@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+from django.middleware import csrf
+
+
+def is_sessionless(request):
+    """
+    Return whether a request can skip the session machinery: it carries no
+    session cookie, so it is anonymous or authenticated by other means, and is
+    not for one of the `SESSION_PATHS` that start sessions, such as the admin.
+    """
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES and not (
+        request.path_info.startswith(tuple(settings.SESSION_PATHS))
+    )
+
+
+class SessionlessMixin:
+    """
+    Pass sessionless requests straight on to the rest of the middleware chain.
+    """
+
+    def __call__(self, request):
+        if is_sessionless(request):
+            # A coroutine when the chain is async, which the caller awaits
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SessionlessMixin, sessions.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(SessionlessMixin, csrf.CsrfViewMiddleware):
+    # Without a session cookie there are no ambient credentials to protect
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_sessionless(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(SessionlessMixin, auth.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(SessionlessMixin, messages.MessageMiddleware):
+    pass
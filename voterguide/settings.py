@@ -37,24 +37,46 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # local
     "voterguide.accounts",
     "voterguide.api",
     # 3rd party
     "rest_framework",
-    "debug_toolbar",
+    "rest_framework.authtoken",
 ]
 
-MIDDLEWARE = [
-    "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
-    "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
-]
+MIDDLEWARE_PROFILES = {
+    "default": [
+        "django.middleware.security.SecurityMiddleware",
+        # First, so that session and user lookups are routed too
+        "voterguide.api.replicas.replica_middleware",
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.middleware.common.CommonMiddleware",
+        "django.middleware.csrf.CsrfViewMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+        "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    ],
+    # For production API traffic, chosen with MIDDLEWARE_PROFILE=lean: sessions,
+    # CSRF, authentication and messages are skipped for requests without a session
+    # cookie outside of SESSION_PATHS, such as those of anonymous API clients.
+    # See `manage.py benchmark_middleware` for the overhead of each profile.
+    "lean": [
+        "django.middleware.security.SecurityMiddleware",
+        "voterguide.api.replicas.replica_middleware",
+        "voterguide.middleware.SessionMiddleware",
+        "django.middleware.common.CommonMiddleware",
+        "voterguide.middleware.CsrfViewMiddleware",
+        "voterguide.middleware.AuthenticationMiddleware",
+        "voterguide.middleware.MessageMiddleware",
+        "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    ],
+}
+MIDDLEWARE = MIDDLEWARE_PROFILES[os.getenv("MIDDLEWARE_PROFILE", "default")]
+
+# Paths that always run the full middleware chain, since they start sessions
+SESSION_PATHS = ["/admin/"]
 
 ROOT_URLCONF = "voterguide.urls"
 
@@ -88,11 +110,91 @@ DATABASES = {
         "PASSWORD": os.getenv("DATABASE_PASSWORD"),
         "HOST": os.getenv("DATABASE_HOST", "127.0.0.1"),
         "PORT": os.getenv("DATABASE_PORT", "5432"),
+        # Each worker thread keeps its connection for this many seconds instead of
+        # connecting for every request; 0 closes it at the end of each request, as
+        # async views need, since they are not tied to a reusable thread.
+        # See `manage.py benchmark_connections` for the difference it makes.
+        "CONN_MAX_AGE": int(os.getenv("DATABASE_CONN_MAX_AGE", 60)),
         "CONN_HEALTH_CHECKS": os.getenv("DATABASE_CONN_HEALTH_CHECKS", True),
+        # Required behind a pooler in transaction mode such as pgbouncer, which
+        # cannot keep the server-side cursors of exports open across transactions
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv(
+            "DATABASE_DISABLE_SERVER_SIDE_CURSORS", False
+        ),
         "ATOMIC_REQUESTS": os.getenv("DATABASE_ATOMIC_REQUESTS", True),
     }
 }
 
+# Read replicas of the default database, as comma-separated `host` or `host:port`
+# entries. Each becomes a database alias with the default database's other settings,
+# and the reads of safe requests are routed to one of them.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(os.getenv("DATABASE_REPLICA_HOSTS", "").split(","), 1):
+    if replica:
+        host, _, port = replica.partition(":")
+        DATABASES[f"replica_{number}"] = {
+            **DATABASES["default"],
+            "HOST": host,
+            "PORT": port or DATABASES["default"]["PORT"],
+            # Otherwise every request would open a transaction on every replica
+            "ATOMIC_REQUESTS": False,
+            "TEST": {"MIRROR": "default"},
+        }
+        DATABASE_REPLICAS.append(f"replica_{number}")
+
+DATABASE_ROUTERS = ["voterguide.api.replicas.ReplicaRouter"]
+
+# Seconds for which a client that wrote reads from the default database rather than
+# a replica, so it sees its own writes. Should exceed the replicas' replication lag,
+# which also delays cached responses catching up with writes from other clients.
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv("DATABASE_REPLICA_PIN_SECONDS", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+# The local-memory default is private to each process, so deployments running more
+# than one worker should point this at a shared backend such as Redis or Memcached
+# for invalidations to reach every worker; gunicorn.conf.py refuses to start more
+# than one worker without one.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    },
+    # Generation tokens and credential revisions, kept apart from rendered responses
+    # so that culling a full response cache never evicts them. On Redis both share
+    # the server; a volatile-* maxmemory-policy never evicts the tokens, which are
+    # stored without a timeout.
+    "generations": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "generations"),
+    },
+}
+
+# Serve reads from async views, for deployments behind an ASGI server such as the
+# `asgi_api` compose service. See `voterguide.api.asynchronous`.
+API_ASYNC_VIEWS = os.getenv("API_ASYNC_VIEWS", False)
+
+# Cache used for rendered API responses, and how long (in seconds) they are kept.
+API_CACHE_ALIAS = os.getenv("API_CACHE_ALIAS", "default")
+# Cache holding the generation tokens that responses are keyed on.
+API_GENERATION_CACHE_ALIAS = os.getenv("API_GENERATION_CACHE_ALIAS", "generations")
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", 300))
+
+# How long (in seconds) rows are left out of `?modified_since=` change feeds after
+# they are saved, so that clients only page past committed rows. Should exceed the
+# longest write transaction, including imports.
+API_CHANGE_FEED_DELAY = int(os.getenv("API_CHANGE_FEED_DELAY", 60))
+
+# How long (in seconds) each process keeps the user of an API token. Processes that
+# do not share the cache only notice a deactivated user once this has passed.
+API_TOKEN_CACHE_TIMEOUT = int(os.getenv("API_TOKEN_CACHE_TIMEOUT", 30))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -140,18 +242,53 @@ AUTH_USER_MODEL = "accounts.CustomUser"
 
 # DRF settings
 REST_FRAMEWORK = {
+    # Tokens spare API clients the password hashing of basic authentication on
+    # every request
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "rest_framework.authentication.SessionAuthentication",
+        "voterguide.accounts.authentication.CachedTokenAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ],
     # TODO: Consider using a vendor media type, in which case, the renderers will
     # need to inherit from JSONRenderer and specify a custom `media_type`
     "DEFAULT_VERSIONING_CLASS": "rest_framework.versioning.AcceptHeaderVersioning",
+    # JSON is rendered with the stdlib unless a client asks for orjson, with
+    # `?format=orjson` or `Accept: application/json; encoder=orjson`. Listed
+    # first, since it only ever matches an Accept header naming the encoder.
+    "DEFAULT_RENDERER_CLASSES": [
+        "voterguide.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.JSONRenderer",
+        "voterguide.api.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "rest_framework.parsers.JSONParser",
+        "voterguide.api.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_CONTENT_NEGOTIATION_CLASS": "voterguide.api.renderers.ContentNegotiation",
+    # Keyset pagination never issues OFFSET or COUNT(*) queries, so deep pages cost
+    # the same as the first one.
+    "DEFAULT_PAGINATION_CLASS": "voterguide.api.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.getenv("API_PAGE_SIZE", 100)),
+    "DEFAULT_FILTER_BACKENDS": [
+        "voterguide.api.filters.FieldFilter",
+        "voterguide.api.filters.ModifiedSinceFilter",
+        "voterguide.api.filters.SearchFilter",
+    ],
 }
 
 # Django debug toolbar
 if DEBUG:
     import socket
 
+    INSTALLED_APPS = [*INSTALLED_APPS, "debug_toolbar"]
+    MIDDLEWARE = [*MIDDLEWARE, "debug_toolbar.middleware.DebugToolbarMiddleware"]
+
     hostname, _, ips = socket.gethostbyname_ex(socket.gethostname())
     INTERNAL_IPS = [ip[: ip.rfind(".")] + ".1" for ip in ips] + [
         "127.0.0.1",